@@ -0,0 +1,61 @@
+"""
+Benchmark: SentimentAnalyzer.analyze_batch throughput by worker count.
+
+Usage:
+    python benchmarks/bench_batch.py [--messages N] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sentiment import SentimentAnalyzer
+
+
+SAMPLE_MESSAGES = [
+    "Hello",
+    "thanks",
+    "I am so happy and excited!",
+    "This is terrible and awful!",
+    "The weather is cloudy today.",
+    "Your service disappoints me, it used to be better",
+    "I'm feeling great! It's my birthday",
+    "What is 25 + 17?",
+    "I'm stressed about work and I can't sleep, everything feels overwhelming lately",
+]
+
+
+def make_corpus(count, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(SAMPLE_MESSAGES) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=50000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    analyzer = SentimentAnalyzer()
+    messages = make_corpus(args.messages)
+    baseline = None
+
+    print(f"{args.messages} messages, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>9} {'msgs/s':>10} {'scaling':>8}")
+    for workers in args.workers:
+        start = time.perf_counter()
+        results = analyzer.analyze_batch(messages, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = (elapsed, results)
+        else:
+            assert results == baseline[1], "parallel results differ from single-process results"
+        print(f"{workers:>8} {elapsed:>9.2f} {args.messages / elapsed:>10.0f} {baseline[0] / elapsed:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: memory of a list of per-turn dicts vs the columnar ConversationHistory.
+
+Measured with tracemalloc. Messages and replies come from a small pool, so
+the strings themselves are shared and the numbers show per-turn overhead;
+real transcripts add the same string payload to both layouts.
+
+Usage:
+    python benchmarks/bench_history.py [--turns 10000 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from history import ConversationHistory
+from sentiment import SentimentAnalyzer
+
+
+MESSAGES = [
+    "hi", "I love this!", "This is terrible", "What time is it?", "thanks",
+    "I'm feeling great today", "not bad at all", "I hate waiting", "ok", "What is 2 + 2?",
+]
+
+
+def scored_pool():
+    analyzer = SentimentAnalyzer(cache_entries=0)
+    return [(message, f"reply to {message}") + analyzer.score_message(message) for message in MESSAGES]
+
+
+def measure(build, turns, pool):
+    rng = random.Random(0)
+    picks = [rng.randrange(len(pool)) for _ in range(turns)]
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    store = build(picks, pool)
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del store
+    return size
+
+
+def build_dicts(picks, pool):
+    # The pre-columnar layout: one dict per turn plus its own scores dict
+    history = []
+    for pick in picks:
+        user, bot, label, scores = pool[pick]
+        history.append({"user": user, "bot": bot, "sentiment": label, "scores": dict(scores)})
+    return history
+
+
+def build_columnar(picks, pool):
+    history = ConversationHistory()
+    for pick in picks:
+        user, bot, label, scores = pool[pick]
+        history.append(user, bot, label, scores)
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--turns', type=int, nargs='+', default=[10000, 1000000])
+    args = parser.parse_args()
+
+    pool = scored_pool()
+    print(f"{'turns':>9} {'list of dicts':>15} {'columnar':>12} {'bytes/turn':>17} {'ratio':>7}")
+    for turns in args.turns:
+        dicts = measure(build_dicts, turns, pool)
+        columnar = measure(build_columnar, turns, pool)
+        print(f"{turns:>9} {dicts / 2**20:>12.1f} MiB {columnar / 2**20:>8.1f} MiB "
+              f"{dicts / turns:>7.0f} -> {columnar / turns:<6.1f} {dicts / columnar:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
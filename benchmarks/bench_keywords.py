@@ -0,0 +1,46 @@
+"""
+Benchmark: compiled KeywordMatcher vs the original any()-cascade keyword extraction.
+
+Usage:
+    python benchmarks/bench_keywords.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from keywords import KeywordMatcher
+from tests.test_keywords import legacy_extract_keywords
+
+
+BASE_MESSAGE = "Hi, my name is Alice and I'm feeling a bit stressed about work, what time is it? "
+
+
+def make_message(length):
+    """Repeat a realistic chat sentence until it reaches the given length."""
+    repeats = length // len(BASE_MESSAGE) + 1
+    return (BASE_MESSAGE * repeats)[:length]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="timing repeats per size")
+    args = parser.parse_args()
+
+    matcher = KeywordMatcher()
+
+    print(f"{'chars':>8} {'legacy us':>12} {'matcher us':>12} {'speedup':>9}")
+    for length in [16, 64, 256, 1024, 4096, 16384]:
+        message = make_message(length)
+        assert matcher.match(message) == legacy_extract_keywords(message)
+
+        number = max(1, 20000 // length)
+        legacy = min(timeit.repeat(lambda: legacy_extract_keywords(message), number=number, repeat=args.repeat)) / number
+        compiled = min(timeit.repeat(lambda: matcher.match(message), number=number, repeat=args.repeat)) / number
+        print(f"{length:>8} {legacy * 1e6:>12.1f} {compiled * 1e6:>12.1f} {legacy / compiled:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: turn log throughput and response-path cost by fsync policy.
+
+For each policy ("none", "batch", "turn") the log is written to a fresh
+file in a temporary directory (or --dir, to measure a particular disk):
+
+- append: turns appended per second until close() has written and
+  synced everything
+- process_turn: mean time per turn of a Chatbot writing to the log,
+  next to the same chatbot without a log (the disk is off the response
+  path; the difference is the enqueue plus the GIL time of the writer
+  thread encoding turns)
+- restore: time to reopen the log and rebuild the session from it
+
+Usage:
+    python benchmarks/bench_log.py [--turns N] [--dir PATH]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chatbot import Chatbot
+from sentiment import score_message
+from turnlog import TurnLog, FSYNC_POLICIES
+
+
+MESSAGES = [
+    "hi", "I love this!", "This is terrible", "What time is it?", "thanks",
+    "I'm feeling great today", "not bad at all", "I hate waiting", "ok", "What is 2 + 2?",
+]
+
+
+def append_rate(path, fsync, turns):
+    pool = [(message, f"reply to {message}") + score_message(message) for message in MESSAGES]
+    start = time.perf_counter()
+    with TurnLog(path, fsync=fsync) as log:
+        for i in range(turns):
+            log.append(*pool[i % len(pool)])
+    return turns / (time.perf_counter() - start)
+
+
+def turn_time(turns, log=None):
+    chatbot = Chatbot(response_cache=False, log=log)
+    start = time.perf_counter()
+    for i in range(turns):
+        chatbot.process_turn(MESSAGES[i % len(MESSAGES)])
+    elapsed = time.perf_counter() - start
+    if log is not None:
+        log.close()
+    return elapsed / turns
+
+
+def restore_time(path):
+    start = time.perf_counter()
+    with TurnLog(path) as log:
+        Chatbot(response_cache=False, log=log)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--turns', type=int, default=5000, help="turns written per measurement")
+    parser.add_argument('--dir', default=None, help="directory for the log files (default: a temporary one)")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(dir=args.dir)
+    try:
+        for message in MESSAGES:
+            score_message(message)  # Warm the score cache and VADER
+        baseline = turn_time(args.turns)
+        print(f"{args.turns} turns per measurement, logs in {directory}")
+        print(f"{'fsync':<8}{'append turns/s':>16}{'process_turn us':>18}{'no log us':>12}{'restore s':>12}")
+        for fsync in FSYNC_POLICIES:
+            path = os.path.join(directory, f"append-{fsync}.jsonl")
+            rate = append_rate(path, fsync, args.turns)
+            path = os.path.join(directory, f"session-{fsync}.jsonl")
+            seconds = turn_time(args.turns, TurnLog(path, fsync=fsync))
+            print(f"{fsync:<8}{rate:>16.0f}{seconds * 1e6:>18.1f}{baseline * 1e6:>12.1f}{restore_time(path):>12.3f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: remembering facts in plain lists vs MemoryStore.
+
+A session mentions `size` distinct facts, then keeps mentioning facts
+drawn from them (half repeats, half new ones). For each store the mean
+time per mention is reported: the lists scan every stored fact per
+mention (the original `item not in list` check), MemoryStore looks the
+fact up in a dict. most_common(10) is timed on the filled store.
+
+Usage:
+    python benchmarks/bench_memory.py [--sizes 1000 10000 100000] [--mentions N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from memory import MemoryStore
+
+
+class ListMemory:
+    """The original memory lists: append once, drop the oldest past the limit."""
+
+    def __init__(self, limit=None):
+        self.items = []
+        self.limit = limit
+
+    def add(self, item):
+        if item in self.items:
+            return
+        self.items.append(item)
+        if self.limit is not None and len(self.items) > self.limit:
+            del self.items[0]
+
+
+def mention_time(store, size, mentions):
+    for i in range(size):
+        store.add(f"topic {i}")
+    rng = random.Random(0)
+    facts = [f"topic {rng.randrange(size)}" if rng.random() < 0.5 else f"new topic {i}" for i in range(mentions)]
+    start = time.perf_counter()
+    for fact in facts:
+        store.add(fact)
+    return (time.perf_counter() - start) / mentions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help="distinct facts already stored")
+    parser.add_argument('--mentions', type=int, default=2000, help="timed mentions per size")
+    args = parser.parse_args()
+
+    print(f"{'facts':>8}{'list us':>12}{'store us':>12}{'speedup':>10}{'top10 us':>11}")
+    for size in args.sizes:
+        listed = mention_time(ListMemory(), size, args.mentions)
+        store = MemoryStore()
+        stored = mention_time(store, size, args.mentions)
+        start = time.perf_counter()
+        for _ in range(100):
+            store.most_common(10)
+        top = (time.perf_counter() - start) / 100
+        print(f"{size:>8}{listed * 1e6:>12.2f}{stored * 1e6:>12.2f}{listed / stored:>9.0f}x{top * 1e6:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: turns per second with sessions sharded over worker processes.
+
+The same seeded synthetic sessions are played once in this process (one
+SessionManager, one core) and then through ShardedSessions with each
+worker count. Every round sends the next turn of every session at once
+(one turn per session in flight, the way independent clients talk to the
+server) and waits for all replies before the next round. Aggregate
+turns/s should grow with the workers up to the number of cores; the
+cores this machine has are printed first.
+
+Usage:
+    python benchmarks/bench_shards.py [--workers 1 2 4 8] [--sessions N] [--turns N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from replay import synthetic_sessions
+from sessions import SessionManager
+from shards import ShardedSessions
+
+
+def rounds(sessions):
+    """(session id, message) pairs of every round, in round order."""
+    longest = max(len(messages) for messages in sessions)
+    return [[(f"session-{index}", messages[turn]) for index, messages in enumerate(sessions) if turn < len(messages)]
+            for turn in range(longest)]
+
+
+def in_process(plan):
+    manager = SessionManager(max_sessions=len(plan[0]))
+    start = time.perf_counter()
+    for turns in plan:
+        for session_id, message in turns:
+            manager.get(session_id).process_turn(message)
+    return time.perf_counter() - start
+
+
+def sharded(plan, workers):
+    with ShardedSessions(workers, max_sessions=len(plan[0])) as pool:
+        pool.stats()  # Wait until every worker has started
+        start = time.perf_counter()
+        for turns in plan:
+            futures = [pool.submit_turn(session_id, message) for session_id, message in turns]
+            for future in futures:
+                future.result()
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help="worker counts to time")
+    parser.add_argument('--sessions', type=int, default=200, help="concurrent sessions")
+    parser.add_argument('--turns', type=int, default=20, help="turns per session")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    plan = rounds(synthetic_sessions(args.sessions, args.turns, seed=args.seed))
+    total = sum(len(turns) for turns in plan)
+    print(f"{total} turns of {args.sessions} sessions, {os.cpu_count()} CPUs")
+
+    baseline = total / in_process(plan)
+    print(f"{'workers':>10}{'turns/s':>12}{'speedup':>10}")
+    print(f"{'in-proc':>10}{baseline:>12.0f}{1:>9.2f}x")
+    for workers in args.workers:
+        rate = total / sharded(plan, workers)
+        print(f"{workers:>10}{rate:>12.0f}{rate / baseline:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: per-worker memory with private lexicon dicts vs the shared memory-mapped lexicon.
+
+Starts N scoring workers per mode and keeps them all alive while they
+report their memory, so shared pages are split between them. RSS counts
+shared pages in full in every worker; PSS divides them between the
+processes mapping them, and USS is the memory private to the worker.
+Memory is read from /proc (Linux); elsewhere only peak RSS is shown.
+
+Usage:
+    python benchmarks/bench_shared_lexicon.py [--workers N] [--messages M]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+
+def process_memory():
+    """Return RSS, PSS and USS of this process in KiB (None when unavailable)."""
+    memory = {'rss': None, 'pss': None, 'uss': None}
+    try:
+        kib = {}
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if value.strip().endswith('kB'):
+                    kib[key] = int(value.split()[0])
+        memory['rss'] = kib['Rss']
+        memory['pss'] = kib['Pss']
+        memory['uss'] = kib['Private_Clean'] + kib['Private_Dirty']
+    except (OSError, KeyError, ValueError):
+        import resource
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory['rss'] = peak // 1024 if sys.platform == 'darwin' else peak
+    return memory
+
+
+def run_worker(shared, messages):
+    """Worker body: score a corpus, then report memory before and after loading the lexicon."""
+    from bench_vectorized import make_corpus
+    from sentiment import SentimentAnalyzer
+
+    corpus = make_corpus(messages, seed=os.getpid())
+    analyzer = SentimentAnalyzer(cache_entries=0, shared_lexicon=shared)
+    before = process_memory()
+    analyzer.analyze_batch(corpus)
+
+    # Report only once every worker has loaded its lexicon, so PSS reflects
+    # all of them sharing the mapped pages
+    print("ready", flush=True)
+    sys.stdin.readline()
+    print(json.dumps({'before': before, 'after': process_memory()}), flush=True)
+
+
+def measure(shared, workers, messages, env):
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, '--worker', 'shared' if shared else 'private', '--messages', str(messages)],
+            cwd=ROOT, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.stdout.readline()
+    for proc in procs:
+        proc.stdin.write("\n")
+        proc.stdin.flush()
+    reports = [json.loads(proc.stdout.readline()) for proc in procs]
+    for proc in procs:
+        proc.stdin.close()
+        proc.wait()
+    return reports
+
+
+def average(reports, phase, key):
+    values = [report[phase][key] for report in reports if report[phase][key] is not None]
+    return sum(values) / len(values) / 1024 if values else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--worker', choices=('private', 'shared'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        run_worker(args.worker == 'shared', args.messages)
+        return
+
+    env = dict(os.environ)
+    env['SENTIMENT_SHARED_LEXICON'] = os.path.join(tempfile.mkdtemp(), 'vader_lexicon.map')
+
+    # Build the shared file up front so the workers only map it
+    from lexicon import load_shared_lexicons, default_snapshot_path
+    load_shared_lexicons(env['SENTIMENT_SHARED_LEXICON'], default_snapshot_path())
+
+    print(f"{args.workers} workers, {args.messages} messages each; MiB per worker (mean)")
+    print(f"{'lexicon':<10} {'phase':<16} {'RSS':>8} {'PSS':>8} {'USS':>8}")
+    for shared in (False, True):
+        reports = measure(shared, args.workers, args.messages, env)
+        name = 'shared' if shared else 'private'
+        for phase, label in (('before', 'before loading'), ('after', 'after scoring')):
+            print(f"{name:<10} {label:<16} {average(reports, phase, 'rss'):>8.1f} "
+                  f"{average(reports, phase, 'pss'):>8.1f} {average(reports, phase, 'uss'):>8.1f}")
+
+    os.remove(env['SENTIMENT_SHARED_LEXICON'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: cold-start time of `import sentiment`, the first score and `python chatbot.py`.
+
+Each case runs in a fresh interpreter. The first score is measured with
+the lexicon snapshot disabled, cold (snapshot just deleted) and warm.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def run_python(args, env, stdin=None):
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + args, cwd=ROOT, env=env, input=stdin,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, text=True)
+    return time.perf_counter() - start
+
+
+def timed(label, runs, args, env, stdin=None, before_each=None):
+    samples = []
+    for _ in range(runs):
+        if before_each:
+            before_each()
+        samples.append(run_python(args, env, stdin))
+    print(f"{label:<42} {statistics.median(samples) * 1000:>8.1f} ms  (min {min(samples) * 1000:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    snapshot = os.path.join(tempfile.mkdtemp(), 'vader_lexicon.json')
+    env = dict(os.environ)
+    # Measure with normal bytecode caching, as an installed deployment would run
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['SENTIMENT_LEXICON_SNAPSHOT'] = snapshot
+    no_snapshot_env = dict(env, SENTIMENT_LEXICON_SNAPSHOT='off')
+
+    def remove_snapshot():
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+
+    score = "import sentiment; sentiment.analyze_message('I love this!')"
+
+    # Warm the bytecode cache once so every case starts from the same state
+    run_python(['-c', score], env)
+
+    print(f"{'case':<42} {'median':>11}")
+    timed("python -c pass (interpreter baseline)", args.runs, ['-c', 'pass'], env)
+    timed("import sentiment", args.runs, ['-c', 'import sentiment'], env)
+    timed("import + first score (no snapshot)", args.runs, ['-c', score], no_snapshot_env)
+    timed("import + first score (snapshot rebuilt)", args.runs, ['-c', score], env, before_each=remove_snapshot)
+    timed("import + first score (snapshot warm)", args.runs, ['-c', score], env)
+    timed("python chatbot.py (exit immediately)", args.runs, ['chatbot.py'], env, stdin="exit\n")
+    timed("python chatbot.py (one turn, snapshot warm)", args.runs, ['chatbot.py'], env, stdin="hello\nexit\n")
+
+    remove_snapshot()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Benchmark suite: per-call latency of the chatbot.py and sentiment.py hot paths.
+
+Every case is timed call by call (after one warm-up call) until its time
+budget is spent, and reported as p50/p95/p99 in microseconds. Cases cover
+message sizes and history lengths; --json saves a run, --compare prints
+the p50 change against a saved run and exits with status 1 when a case got
+slower than --threshold.
+
+Usage:
+    python benchmarks/bench_suite.py [--json run.json] [--compare baseline.json]
+                                     [--turns 10 1000 100000] [--sizes 16 256 4096]
+                                     [--budget 0.5] [--filter NAME] [--quick]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chatbot import Chatbot
+from sentiment import SentimentAnalyzer, ScoreCache
+from utils import format_conversation_summary
+
+
+BASE_MESSAGE = "Hi, my name is Alice and I'm feeling a bit stressed about work, what time is it? "
+
+# Messages that reach each branch of generate_response
+INTENT_MESSAGES = {
+    "greeting": "hello",
+    "calc": "what is 12 plus 7",
+    "time": "What's the time now?",
+    "question": "How do computers learn languages?",
+    "fallback": "The garden looks lovely in spring",
+}
+
+# Earlier turns the history is built from
+HISTORY_MESSAGES = [
+    "I love hiking in the mountains", "Work has been really stressful lately", "What is 15 times 4?",
+    "My dog Max is sick", "I'm excited about my trip to Japan next month", "This weather is terrible",
+    "Can you recommend a good book?", "I just finished a great movie", "I feel lonely sometimes",
+    "My sister's birthday is tomorrow", "I'm learning to play the guitar", "The traffic was awful today",
+]
+
+PERCENTILES = (50, 95, 99)
+
+# VADER's cost grows faster than linearly with text length, and analyze_overall
+# scores the joined transcript: 1k turns already take over a second per call
+OVERALL_MAX_TURNS = 1000
+
+
+def make_message(length):
+    """Repeat a realistic chat sentence until it reaches the given length."""
+    repeats = length // len(BASE_MESSAGE) + 1
+    return (BASE_MESSAGE * repeats)[:length]
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def measure(func, budget, min_samples=5, max_samples=100000):
+    """Time func() call by call; returns the sorted durations in nanoseconds."""
+    func()
+    samples = []
+    clock = time.perf_counter_ns
+    deadline = clock() + budget * 1e9
+    while len(samples) < max_samples and (len(samples) < min_samples or clock() < deadline):
+        start = clock()
+        func()
+        samples.append(clock() - start)
+    samples.sort()
+    return samples
+
+
+def seeded_chatbot(turns, analyzer, response_cache=False):
+    """A Chatbot whose history already holds `turns` turns (reply cache off unless given)."""
+    chatbot = Chatbot(response_cache=response_cache)
+    pool = [(message, "Tell me more.") + analyzer.score_message(message) for message in HISTORY_MESSAGES]
+    for turn in range(turns):
+        message, reply, label, scores = pool[turn % len(pool)]
+        chatbot.conversation_history.append(message, reply, label, scores)
+        chatbot.turn_count += 1
+        chatbot.sentiment_counts[label] = chatbot.sentiment_counts.get(label, 0) + 1
+        chatbot.overall_sentiment.add(message, scores)
+        chatbot.mood_tracker.add(label, scores['compound'])
+    return chatbot
+
+
+def cases(sizes, turns):
+    """Yield (name, params, func) for every benchmark case."""
+    # Uncached, so every call really scores the message
+    analyzer = SentimentAnalyzer(cache_entries=0)
+    sized = Chatbot(response_cache=False)
+
+    for size in sizes:
+        message = make_message(size)
+        yield "chatbot.extract_keywords", {"chars": size}, lambda m=message: sized._extract_keywords(m)
+        yield "chatbot.match_intents", {"chars": size}, lambda m=message: sized._match_intents(m)
+        yield "sentiment.analyze_message", {"chars": size}, lambda m=message: analyzer.analyze_message(m)
+
+    for count in turns:
+        chatbot = seeded_chatbot(count, analyzer)
+        history = chatbot.conversation_history
+        cached = seeded_chatbot(count, analyzer, response_cache=ScoreCache())
+        for intent, message in INTENT_MESSAGES.items():
+            yield f"chatbot.generate_response[{intent}]", {"turns": count}, \
+                lambda m=message, c=chatbot: c.generate_response(m)
+            # The same message again, answered from the reply cache where the intent allows it
+            yield f"chatbot.generate_response[{intent},cached]", {"turns": count}, \
+                lambda m=message, c=cached: c.generate_response(m)
+        messages = [entry["user"] for entry in history]
+        labels = [entry["sentiment"] for entry in history]
+        if count <= OVERALL_MAX_TURNS:
+            yield "sentiment.analyze_overall", {"turns": count}, lambda m=messages: analyzer.analyze_overall(m)
+        else:
+            print(f"(skipping sentiment.analyze_overall(turns={count}): above {OVERALL_MAX_TURNS} turns)")
+        yield "sentiment.get_mood_trend", {"turns": count}, lambda l=labels: analyzer.get_mood_trend(l)
+        yield "utils.format_conversation_summary", {"turns": count}, \
+            lambda h=history, c=chatbot: format_conversation_summary(h, "Positive", "stable", total_messages=c.turn_count)
+
+
+def case_key(result):
+    params = ",".join(f"{key}={value}" for key, value in sorted(result["params"].items()))
+    return f"{result['name']}({params})"
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print p50 changes against a saved run; returns the keys that regressed."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {case_key(result): result for result in json.load(f)["results"]}
+
+    regressed = []
+    print(f"\n{'case':<58} {'base p50':>10} {'p50':>10} {'change':>8}")
+    for result in results:
+        key = case_key(result)
+        if key not in baseline:
+            continue
+        before, after = baseline[key]["p50_us"], result["p50_us"]
+        ratio = after / before if before else float("inf")
+        flag = ""
+        if ratio > threshold:
+            regressed.append(key)
+            flag = "  SLOWER"
+        print(f"{key:<58} {before:>10.1f} {after:>10.1f} {ratio:>7.2f}x{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--turns', type=int, nargs='+', default=[10, 1000, 100000], help="history lengths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[16, 256, 4096], help="message sizes in characters")
+    parser.add_argument('--budget', type=float, default=0.5, help="seconds spent timing each case")
+    parser.add_argument('--filter', help="only run cases whose name contains this")
+    parser.add_argument('--quick', action='store_true', help="shortcut for --turns 10 1000 --budget 0.1")
+    parser.add_argument('--json', metavar='PATH', help="write the results as JSON")
+    parser.add_argument('--compare', metavar='PATH', help="compare p50s against a saved JSON run")
+    parser.add_argument('--threshold', type=float, default=1.25, help="p50 ratio counted as a regression")
+    args = parser.parse_args()
+    if args.quick:
+        args.turns, args.budget = [turns for turns in args.turns if turns <= 1000], 0.1
+
+    results = []
+    print(f"{'case':<58} {'samples':>8} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10}")
+    for name, params, func in cases(args.sizes, args.turns):
+        if args.filter and args.filter not in name:
+            continue
+        samples = measure(func, args.budget)
+        result = {"name": name, "params": params, "samples": len(samples),
+                  "mean_us": sum(samples) / len(samples) / 1e3,
+                  "min_us": samples[0] / 1e3, "max_us": samples[-1] / 1e3}
+        for p in PERCENTILES:
+            result[f"p{p}_us"] = percentile(samples, p) / 1e3
+        results.append(result)
+        print(f"{case_key(result):<58} {len(samples):>8} {result['p50_us']:>10.1f} "
+              f"{result['p95_us']:>10.1f} {result['p99_us']:>10.1f}", flush=True)
+
+    if args.json:
+        run = {
+            "meta": {
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "budget": args.budget,
+            },
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        print(f"\nWrote {len(results)} results to {args.json}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: memory allocated and time spent per message on the reply path (clean_input + generate_response).
+
+Each message of a mixed script is cleaned and answered by a Chatbot with the
+reply cache off, so every stage runs. tracemalloc reports the peak memory
+allocated while one message is handled (transient strings, lists and dicts
+included), a profile hook counts the str.lower/split/strip calls made for
+it, and timing runs separately without tracing. Run it on two revisions to
+compare them.
+
+Usage:
+    python benchmarks/bench_turn.py [--rounds N] [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chatbot import Chatbot
+from utils import clean_input
+
+
+SCRIPT = [
+    "  Hello there!  ", "My name is Alice", "I'm feeling a bit stressed about work today",
+    "What is 12 plus 7?", "What's the time now?", "How do computers learn languages?",
+    "I like long walks, and sunsets", "I am a teacher at the local school", "You are very helpful",
+    "It's my birthday today, I'm turning 30", "The garden looks lovely in spring", "who are you?",
+    "Last experience was better", "Sorry about that", "thanks a lot", "ok", "bye",
+]
+
+
+STRING_METHODS = ('lower', 'split', 'strip')
+
+
+def new_chatbot():
+    try:
+        return Chatbot(response_cache=False)
+    except TypeError:
+        return Chatbot()  # Revisions without a reply cache
+
+
+def per_message_peaks(rounds):
+    """Peak bytes allocated while handling each message, over `rounds` passes of the script."""
+    chatbot = new_chatbot()
+    for message in SCRIPT:
+        chatbot.generate_response(clean_input(message))  # Warm up caches and lazy imports
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(rounds):
+            for message in SCRIPT:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                chatbot.generate_response(clean_input(message))
+                peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def string_calls():
+    """str.lower/split/strip calls made for one pass of the script."""
+    chatbot = new_chatbot()
+    for message in SCRIPT:
+        chatbot.generate_response(clean_input(message))
+
+    counts = Counter()
+
+    def profile(frame, event, arg):
+        if event == 'c_call' and isinstance(getattr(arg, '__self__', None), str) and arg.__name__ in STRING_METHODS:
+            counts[arg.__name__] += 1
+
+    sys.setprofile(profile)
+    try:
+        for message in SCRIPT:
+            chatbot.generate_response(clean_input(message))
+    finally:
+        sys.setprofile(None)
+    return counts
+
+
+def per_message_time(rounds, repeat):
+    """Best mean seconds per message over `repeat` timed passes."""
+    best = float("inf")
+    for _ in range(repeat):
+        chatbot = new_chatbot()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for message in SCRIPT:
+                chatbot.generate_response(clean_input(message))
+        best = min(best, (time.perf_counter() - start) / (rounds * len(SCRIPT)))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=50, help="passes over the script per measurement")
+    parser.add_argument('--repeat', type=int, default=5, help="timing repeats (the best is reported)")
+    args = parser.parse_args()
+
+    peaks = per_message_peaks(args.rounds)
+    seconds = per_message_time(args.rounds, args.repeat)
+    print(f"messages per pass      {len(SCRIPT)}")
+    print(f"peak bytes / message   mean {statistics.mean(peaks):.0f}  median {statistics.median(peaks):.0f}  "
+          f"max {max(peaks)}")
+    calls = string_calls()
+    print("str calls / message    " + "  ".join(f"{name} {calls[name] / len(SCRIPT):.1f}" for name in STRING_METHODS))
+    print(f"time / message         {seconds * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: NumPy-vectorized VADER engine vs stock VADER on a reference corpus.
+
+Reports agreement with stock polarity_scores (exact matches and largest
+difference per score) and messages per second for both paths.
+
+Usage:
+    python benchmarks/bench_vectorized.py [--messages N] [--seed S]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from sentiment import SentimentAnalyzer
+from vader_numpy import VectorizedVader
+
+
+# Sentences from the VADER README/demo covering every rule
+VADER_EXAMPLES = [
+    "VADER is smart, handsome, and funny.",
+    "VADER is smart, handsome, and funny!",
+    "VADER is very smart, handsome, and funny.",
+    "VADER is VERY SMART, handsome, and FUNNY.",
+    "VADER is VERY SMART, handsome, and FUNNY!!!",
+    "VADER is VERY SMART, uber handsome, and FRIGGIN FUNNY!!!",
+    "VADER is not smart, handsome, nor funny.",
+    "The book was good.",
+    "At least it isn't a horrible book.",
+    "The book was only kind of good.",
+    "The plot was good, but the characters are uncompelling and the dialog is not great.",
+    "Today SUX!",
+    "Today only kinda sux! But I'll get by, lol",
+    "Make sure you :) or :D today!",
+    "Catch utf-8 emoji such as 💘 and 💋 and 😁",
+    "Not bad at all",
+    "Sentiment analysis has never been good.",
+    "Sentiment analysis has never been this good!",
+    "Most automated sentiment analysis tools are shit.",
+    "With VADER, sentiment analysis is the shit!",
+    "Other sentiment analysis tools can be quite bad.",
+    "On the other hand, VADER is quite bad ass",
+    "VADER is such a badass!",
+    "Without a doubt, excellent idea.",
+    "Roger Dodger is one of the most compelling variations on this theme.",
+    "Roger Dodger is at least compelling as a variation on the theme.",
+    "Roger Dodger is one of the least compelling variations on this theme.",
+    "Not such a badass after all.",
+    "Without a doubt, an excellent idea.",
+]
+
+OPENERS = ["", "Hi, ", "Honestly ", "Well, ", "OMG ", "Ugh, ", "So ", "To be fair, "]
+SUBJECTS = ["the service", "this bot", "my day", "the movie", "work", "the food", "my exam", "you"]
+VERBS = ["is", "was", "has been", "is not", "was never", "is kind of", "is really", "isn't"]
+ADJECTIVES = ["good", "great", "AWESOME", "bad", "terrible", "okay", "fine", "horrible",
+              "amazing", "slow", "helpful", "useless", "the bomb", "sort of nice"]
+TAILS = ["", ".", "!", "!!", "?", "??", " :)", " :(", " 😁", " 💔", " lol", " but I love it",
+         " but it could be better", ", no doubt", " at least"]
+
+
+def make_corpus(count, seed):
+    """Chat-style reference corpus: templated messages plus the VADER examples."""
+    rng = random.Random(seed)
+    corpus = list(VADER_EXAMPLES)
+    while len(corpus) < count:
+        corpus.append(
+            rng.choice(OPENERS) + rng.choice(SUBJECTS) + " " + rng.choice(VERBS) + " " +
+            rng.choice(ADJECTIVES) + rng.choice(TAILS)
+        )
+    return corpus[:count]
+
+
+def compare(reference, results):
+    mismatches = 0
+    max_diff = {key: 0.0 for key in ('compound', 'pos', 'neu', 'neg')}
+    for expected, actual in zip(reference, results):
+        if expected != actual:
+            mismatches += 1
+        for key in max_diff:
+            max_diff[key] = max(max_diff[key], abs(expected[key] - actual[key]))
+    return mismatches, max_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.messages, args.seed)
+    stock = SentimentIntensityAnalyzer()
+
+    start = time.perf_counter()
+    reference = [stock.polarity_scores(message) for message in corpus]
+    stock_rate = len(corpus) / (time.perf_counter() - start)
+
+    print(f"{len(corpus)} messages (seed {args.seed})")
+    print(f"{'engine':<28} {'msgs/s':>10} {'speedup':>8} {'mismatches':>11} {'max |d compound|':>17}")
+    print(f"{'stock VADER':<28} {stock_rate:>10.0f} {1.0:>7.1f}x {0:>11} {0.0:>17.4f}")
+
+    for exact_but in (True, False):
+        engine = VectorizedVader(stock.lexicon, stock.emojis, exact_but=exact_but)
+        start = time.perf_counter()
+        results = []
+        for offset in range(0, len(corpus), 5000):
+            results.extend(engine.polarity_scores_batch(corpus[offset:offset + 5000]))
+        rate = len(corpus) / (time.perf_counter() - start)
+
+        mismatches, max_diff = compare(reference, results)
+        name = "numpy" + ("" if exact_but else " (exact_but=False)")
+        print(f"{name:<28} {rate:>10.0f} {rate / stock_rate:>7.1f}x {mismatches:>11} {max_diff['compound']:>17.4f}")
+        assert max_diff['compound'] <= (VectorizedVader.COMPOUND_TOLERANCE if not exact_but else 0.0)
+
+    # End to end through SentimentAnalyzer (labels + scores)
+    analyzer = SentimentAnalyzer(cache_entries=0)
+    for engine in ("vader", "numpy"):
+        start = time.perf_counter()
+        analyzer.analyze_batch(corpus, engine=engine)
+        rate = len(corpus) / (time.perf_counter() - start)
+        print(f"{'analyze_batch engine=' + engine:<28} {rate:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+# Bounded arithmetic evaluator used by Chatbot._handle_calculation
+import math
+import re
+
+
+# Limits that bound the work done for one message
+MAX_TOKENS = 200           # numbers, operators and parentheses
+MAX_DEPTH = 32             # nested parentheses and unary signs
+MAX_NUMBER_DIGITS = 50     # digits in one operand
+MAX_RESULT_DIGITS = 100    # no result (or intermediate value) may reach 10**100
+
+# Natural-language operators and the symbol each stands for
+WORD_OPERATORS = {
+    'plus': '+',
+    'minus': '-',
+    'times': '*',
+    'divided by': '/',
+}
+
+_MAX_RESULT = 10 ** MAX_RESULT_DIGITS
+
+_WORD_OPERATOR = re.compile(r'(?<=\s)(' + '|'.join(WORD_OPERATORS) + r')(?=\s)')
+_NON_ARITHMETIC = re.compile(r'[^0-9+\-*/().\s]+|\.(?!\d)')
+_TOKEN = re.compile(r'\s*(?:(\d+\.\d*|\.\d+|\d+)|(\*\*|//|[-+*/()]))')
+
+# "what is ..." marks the calculation being asked for
+_QUESTION = re.compile(r'\bwhat is\b', re.IGNORECASE)
+
+_OPERATORS = frozenset(('+', '-', '*', '/', '//', '**'))
+
+_BINARY = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': lambda a, b: a / b,
+    '//': lambda a, b: a // b,
+}
+
+
+def extract_expression(text):
+    """The arithmetic in text: word operators become symbols; words and full stops are dropped."""
+    text = _WORD_OPERATOR.sub(lambda match: WORD_OPERATORS[match.group(1)], text.lower())
+    return _NON_ARITHMETIC.sub('', text).strip()
+
+
+def tokenize(expression):
+    """Split expression into numbers and operator strings.
+
+    Raises ValueError for anything that is not a number, operator or
+    parenthesis, and OverflowError past MAX_TOKENS or MAX_NUMBER_DIGITS.
+    """
+    expression = expression.strip()
+    tokens = []
+    position = 0
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if match is None:
+            raise ValueError(f"Unexpected character at {position}: {expression[position]!r}")
+        if len(tokens) == MAX_TOKENS:
+            raise OverflowError(f"More than {MAX_TOKENS} tokens")
+        number, operator = match.groups()
+        if number is not None:
+            tokens.append(_number(number))
+        else:
+            tokens.append(operator)
+        position = match.end()
+    return tokens
+
+
+def _number(text):
+    if len(text) - ('.' in text) > MAX_NUMBER_DIGITS:
+        raise OverflowError(f"Operand longer than {MAX_NUMBER_DIGITS} digits")
+    if '.' in text:
+        return float(text)
+    if text[0] == '0' and text.strip('0'):
+        # Python rejects 07 as well
+        raise ValueError(f"Leading zeros in {text!r}")
+    return int(text)
+
+
+def _checked(value):
+    if isinstance(value, complex):
+        raise ValueError("Complex result")
+    if isinstance(value, float) and not math.isfinite(value) or abs(value) >= _MAX_RESULT:
+        raise OverflowError(f"Result of {MAX_RESULT_DIGITS} digits or more")
+    return value
+
+
+def _power(base, exponent):
+    # Refuse before computing: the size of base ** exponent is known up front
+    if base and exponent * math.log10(abs(base)) >= MAX_RESULT_DIGITS:
+        raise OverflowError(f"Result of {MAX_RESULT_DIGITS} digits or more")
+    return _checked(base ** exponent)
+
+
+class _Parser:
+    """Recursive-descent evaluator for Python's + - * / // ** and parentheses.
+
+    Grammar (same precedence and associativity as Python):
+        expr   := term (('+' | '-') term)*
+        term   := factor (('*' | '/' | '//') factor)*
+        factor := ('+' | '-') factor | power
+        power  := atom ['**' factor]
+        atom   := NUMBER | '(' expr ')'
+    """
+
+    __slots__ = ('tokens', 'position', 'depth')
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+        self.depth = 0
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self):
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def _enter(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise OverflowError(f"Nested deeper than {MAX_DEPTH}")
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Empty expression")
+        value = self._expr()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unexpected {self._peek()!r}")
+        return value
+
+    def _expr(self):
+        value = self._term()
+        while self._peek() in ('+', '-'):
+            operator = self._take()
+            value = _checked(_BINARY[operator](value, self._term()))
+        return value
+
+    def _term(self):
+        value = self._factor()
+        while self._peek() in ('*', '/', '//'):
+            operator = self._take()
+            value = _checked(_BINARY[operator](value, self._factor()))
+        return value
+
+    def _factor(self):
+        if self._peek() in ('+', '-'):
+            sign = self._take()
+            self._enter()
+            value = self._factor()
+            self.depth -= 1
+            return -value if sign == '-' else value
+        return self._power()
+
+    def _power(self):
+        base = self._atom()
+        if self._peek() == '**':
+            self._take()
+            self._enter()
+            exponent = self._factor()
+            self.depth -= 1
+            return _power(base, exponent)
+        return base
+
+    def _atom(self):
+        token = self._take()
+        if token == '(':
+            self._enter()
+            value = self._expr()
+            self.depth -= 1
+            if self._take() != ')':
+                raise ValueError("Unbalanced parentheses")
+            return value
+        if token is None or isinstance(token, str):
+            raise ValueError(f"Expected a number, got {token!r}")
+        return token
+
+
+def split_expressions(tokens):
+    """Split tokens where one operand directly follows another ("20 / 4 8 - 2")."""
+    expressions = []
+    start = 0
+    for index in range(1, len(tokens)):
+        previous, token = tokens[index - 1], tokens[index]
+        if (previous == ')' or not isinstance(previous, str)) and (token == '(' or not isinstance(token, str)):
+            expressions.append(tokens[start:index])
+            start = index
+    expressions.append(tokens[start:])
+    return expressions
+
+
+def evaluate(expression):
+    """Value of an arithmetic expression (numbers, + - * / // **, parentheses).
+
+    Results follow Python's arithmetic (int unless a float or / is involved).
+    Raises ValueError when expression is not arithmetic, ZeroDivisionError,
+    and OverflowError when a limit above is exceeded; the work done is
+    bounded by those limits whatever the input.
+    """
+    return _Parser(tokenize(expression)).parse()
+
+
+def calculate(text):
+    """Reply to the arithmetic in a message, or None when it holds none.
+
+    A message with several calculations ("I'm 25, what is 3 plus 4") gets
+    the answer to the first one that has an operator and parses. The text
+    after "what is" is tried first, so "Room 101 - what is 2 + 2" answers
+    2 + 2 rather than 101 - 2 + 2.
+    """
+    question = _QUESTION.search(text)
+    if question is not None:
+        reply = _calculate(text[question.end():])
+        if reply is not None:
+            return reply
+    return _calculate(text)
+
+
+def _calculate(text):
+    expression = extract_expression(text)
+    if not expression:
+        return None
+    try:
+        expressions = split_expressions(tokenize(expression))
+        if len(expressions) > 1:
+            expressions = [tokens for tokens in expressions if any(token in _OPERATORS for token in tokens)]
+        for tokens in expressions:
+            try:
+                result = _Parser(tokens).parse()
+            except ValueError:
+                continue
+            return f"The answer is {result}."
+    except ZeroDivisionError:
+        return "I can't divide by zero!"
+    except OverflowError:
+        return "That number is too big for me to work out."
+    except ValueError:
+        pass
+    return None
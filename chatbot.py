@@ -1,116 +1,142 @@
 
-import sys
+import argparse
 import re
+import sys
 from datetime import datetime
-from sentiment import analyze_message, analyze_overall, get_mood_trend
-from utils import clean_input, format_conversation_summary
+from sentiment import score_message, get_analyzer, OverallSentiment, MoodTrendTracker, ScoreCache
+from history import ConversationHistory
+from memory import MemoryStore
+from utils import clean_input, stable_hash, write_conversation_summary
+from calculator import calculate
+from turn import Turn
+from keywords import extract_keywords, scan_message, INTENTS, INTENT_BITS, INTENT_MASK, SUBCHECK_BITS, FLAG_BITS
+
+
+# Size of the process-wide reply cache shared by every Chatbot
+DEFAULT_RESPONSE_CACHE_ENTRIES = 4096
+
+# Longer messages are rarely repeated word for word and are never cached,
+# which also bounds the memory of one cache entry
+MAX_CACHED_INPUT = 256
+
+RESPONSE_CACHE = ScoreCache(DEFAULT_RESPONSE_CACHE_ENTRIES)
+
+# Turns kept in memory when the session is written to a turn log and no
+# history_limit is given; the final summary reads older turns from the log
+DEFAULT_LOG_WINDOW = 200
+
+# Replies when nothing more specific applies (after the name prefix)
+_FALLBACK_REPLIES = (
+    "I see. That's interesting. Can you tell me more about that?",
+    "I understand. How does that make you feel?",
+    "Thank you for sharing that. What else is on your mind?",
+    "I'm listening. Please continue, I'd like to hear more.",
+    "That's helpful to know. Is there something specific you'd like to discuss or ask about?",
+)
+
+# Likes and characteristics remembered by _extract_and_store_info
+_LIKE_PATTERN = re.compile(r'i (like|love) (.+?)(?:\.|$|,|and)')
+_TRAIT_PATTERN = re.compile(r"i (am|'m) (.+?)(?:\.|$|,|and)")
+
+# Words that carry no topic of their own
+_FILLER_WORDS = frozenset(['i', 'am', 'is', 'the', 'a', 'an', 'and', 'or', 'but', 'to', 'for', 'of', 'in', 'on', 'at', 'by'])
 
 
 class Chatbot:
-    def __init__(self, tier2_enabled=True):
-        
-        self.conversation_history = []
+    def __init__(self, tier2_enabled=True, overall_mode="incremental", history_limit=None, memory_limit=None, metrics=None,
+                 response_cache=True, log=None):
+        
+        # Optional turnlog.TurnLog: every turn is also written to disk, off the
+        # response path, and only the latest history_limit turns (default
+        # DEFAULT_LOG_WINDOW) stay in memory. A log that already holds turns
+        # continues that session
+        self.log = log
+        if log is not None and history_limit is None:
+            history_limit = DEFAULT_LOG_WINDOW
+        
+        # Columnar turn store; history_limit keeps only the last N turns (a ring
+        # buffer). Counts, overall sentiment and mood trend cover every turn regardless
+        self.history_limit = history_limit
+        self.conversation_history = ConversationHistory(maxlen=history_limit)
+        self.turn_count = 0
+        self.sentiment_counts = {}  # Label -> number of turns, over all turns
+        self.overall_sentiment = OverallSentiment(mode=overall_mode)  # Updated as each turn is scored
+        self.mood_tracker = MoodTrendTracker()  # Live mood trend, O(1) per turn
         self.tier2_enabled = tier2_enabled
         self.greeting_count = 0
         self.user_info = {}  # Store user information from conversation
-        self.discussed_topics = []  # Track topics discussed in conversation
-        self.conversation_memory = {}  # Store important facts from conversation
+        # memory_limit caps discussed_topics and each conversation_memory store
+        # to N distinct items, evicting the least often (then least recently)
+        # mentioned; the stores read like lists in order of first mention
+        self.memory_limit = memory_limit
+        self.discussed_topics = MemoryStore(memory_limit)  # Track topics discussed in conversation
+        self.conversation_memory = {}  # Store important facts from conversation (name -> MemoryStore)
+        # Branch of _generate_contextual_response that produced the last reply
+        self.last_intent = None
+        
+        # Replies that depend only on the message, the user's name and whether
+        # the session has history are cached: True shares RESPONSE_CACHE with
+        # every other Chatbot in the process, False turns caching off, or pass
+        # a sentiment.ScoreCache
+        if response_cache is True:
+            response_cache = RESPONSE_CACHE
+        self.response_cache = response_cache or None
+        self._reply_cacheable = False
+        
+        if log is not None and len(log):
+            self._restore_from_log()
+        
+        # Optional metrics.Metrics: times the pipeline stages of this chatbot;
+        # without it no timing code runs at all
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.instrument_chatbot(self)
+    
+    def _restore_from_log(self):
+        """Rebuild the session state from the turns already in the log.
+        
+        Counts, overall sentiment, mood trend and the remembered facts are
+        replayed from every logged turn (without generating replies again);
+        only the last history_limit turns are loaded into memory.
+        """
+        log = self.log
+        history = self.conversation_history
+        window_start = max(0, len(log) - history.maxlen)
+        for turn_id, record in enumerate(log.records()):
+            user_input, message_sentiment, scores = record['user'], record['sentiment'], record['scores']
+            turn = Turn(user_input)
+            self._extract_and_store_info(turn)
+            self.last_intent = record.get('intent')
+            if self.last_intent == 'greeting':
+                self.greeting_count += 1
+            elif self.last_intent == 'name':
+                # Logs written before names were recorded only have the message
+                name = record.get('name')
+                self.user_info['name'] = name if name is not None else self._match_intents(turn.text, turn.lower)[2]
+            if turn_id >= window_start:
+                history.append(user_input, record['bot'], message_sentiment, scores)
+            self._count_turn(user_input, message_sentiment, scores)
+    
+    def _score_message(self, user_input):
+        """Label and VADER scores of one message (shared analyzer and score cache)."""
+        return score_message(user_input)
     
     def _extract_keywords(self, text):
         """Extract important keywords and topics from user input."""
-        text_lower = text.lower()
-        keywords = {
-            'name': None,
-            'feeling': None,
-            'topic': None,
-            'is_question': text_lower.strip().endswith('?') or any(word in text_lower for word in ['what', 'who', 'where', 'when', 'why', 'how']),
-            'is_apology': any(word in text_lower for word in ['sorry', 'apologize', 'apology', 'forgive']),
-            'is_greeting': any(word in text_lower for word in ['hello', 'hi', 'hey', 'greetings', 'good morning', 'good afternoon', 'good evening', 'morning', 'afternoon', 'evening']),
-            'is_goodbye': any(word in text_lower for word in ['bye', 'goodbye', 'see you', 'farewell', 'later']),
-            'is_thanks': any(word in text_lower for word in ['thank', 'thanks', 'appreciate', 'grateful']),
-            'is_birthday': any(phrase in text_lower for phrase in ['birthday', 'my birthday', "it's my birthday", 'today is my birthday', 'turning', 'years old today', 'born today']),
-            'is_special_event': any(phrase in text_lower for phrase in ['anniversary', 'graduation', 'wedding', 'promotion', 'new job', 'got engaged']),
-            'is_reciprocal_question': any(phrase in text_lower for phrase in ['and you', 'what about you', 'how about you', 'you?', 'and yourself']),
-            'is_complaint': any(word in text_lower for word in ['disappoint', 'disappointing', 'bad', 'terrible', 'awful', 'horrible', 'worst', 'hate', 'sucks', 'useless', 'stupid', 'dumb', 'waste', 'poor', 'pathetic']),
-            'is_criticism': any(phrase in text_lower for phrase in ['your service', 'you are bad', "you're bad", 'you are terrible', "you're terrible", 'you are awful', "you're awful", 'you are horrible', "you're horrible", 'you are worst', "you're worst", 'you suck', 'this bot', 'this chatbot', 'not helpful', 'not working', 'does not work', "doesn't work"]),
-            'is_positive_feedback': any(phrase in text_lower for phrase in ['you are good', "you're good", 'you are great', "you're great", 'you are excellent', "you're excellent", 'you are amazing', "you're amazing", 'you are wonderful', "you're wonderful", 'you are awesome', "you're awesome", 'you are very good', "you're very good", 'you are the best', "you're the best", 'you are helpful', "you're helpful", 'you are perfect', "you're perfect"]),
-            'is_comparison': any(phrase in text_lower for phrase in ['was better', 'was worse', 'used to be', 'better than', 'worse than', 'not as good', 'not as bad', 'improved', 'got worse', 'declined', 'better before', 'worse before']),
-            'is_experience_feedback': any(phrase in text_lower for phrase in ['experience was', 'last experience', 'previous experience', 'this experience', 'my experience', 'the experience']),
-            'is_profanity': any(re.search(r'\b' + re.escape(word) + r'\b', text_lower) for word in ['fuck', 'damn', 'hell', 'shit', 'asshole', 'bitch', 'bastard', 'crap', 'piss', 'dick', 'cock', 'pussy', 'motherfucker', 'fucking', 'fucked']),
-            'is_offensive': any(phrase in text_lower for phrase in ['fuck you', 'fuck off', 'go to hell', 'screw you', 'shut up', 'shut your', 'kill yourself', 'die']),
-            'needs_time': any(word in text_lower for word in ['time', 'what time', 'current time', 'clock']),
-            'needs_date': any(phrase in text_lower for phrase in ['what date', 'what\'s the date', 'what is the date', 'what day is it', 'what day is today', 'date today', 'today\'s date', 'current date']) or (('date' in text_lower or 'day is it' in text_lower) and any(q_word in text_lower for q_word in ['what', 'when', 'which'])),
-            'needs_calc': bool(re.search(r'\d+\s*[+\-*/]\s*\d+', text)) or any(word in text_lower for word in ['calculate', 'what is', 'equals', '=']),
-        }
-        
-        # Extract feelings/emotions FIRST (before name extraction to avoid conflicts)
-        feeling_words = ['happy', 'sad', 'angry', 'excited', 'worried', 'anxious', 
-                        'stressed', 'tired', 'energetic', 'confused', 'frustrated',
-                        'grateful', 'proud', 'disappointed', 'relieved', 'upset', 'mad',
-                        'depressed', 'down', 'unhappy', 'great', 'wonderful', 'amazing',
-                        'fine', 'okay', 'ok', 'terrible', 'awful', 'horrible']
-        for word in feeling_words:
-            if word in text_lower:
-                keywords['feeling'] = word
-                break
-        
-        # Try to extract name - but ONLY if no feeling was detected
-        # Also use more specific patterns that are less likely to match emotions
-        if not keywords['feeling']:
-            # Extended blacklist of words that should never be treated as names
-            name_blacklist = [
-                'feeling', 'doing', 'going', 'here', 'there', 'sorry', 'fine', 'good', 'bad',
-                'happy', 'sad', 'angry', 'excited', 'worried', 'anxious', 'stressed', 'tired',
-                'energetic', 'confused', 'frustrated', 'grateful', 'proud', 'disappointed',
-                'relieved', 'upset', 'mad', 'depressed', 'down', 'unhappy', 'great', 'wonderful',
-                'amazing', 'okay', 'ok', 'terrible', 'awful', 'horrible', 'feeling', 'being',
-                'working', 'studying', 'learning', 'trying', 'thinking', 'wondering'
-            ]
-            
-            # More specific name patterns (prefer these)
-            specific_name_patterns = [
-                r"my name is (\w+)",
-                r"call me (\w+)",
-                r"name's (\w+)",
-                r"i go by (\w+)",
-                r"people call me (\w+)"
-            ]
-            
-            for pattern in specific_name_patterns:
-                match = re.search(pattern, text_lower)
-                if match:
-                    potential_name = match.group(1).lower()
-                    if potential_name not in name_blacklist and len(potential_name) > 1:
-                        keywords['name'] = potential_name.capitalize()
-                        break
-            
-            # Less specific patterns (only if no specific pattern matched and still no feeling)
-            if not keywords['name']:
-                less_specific_patterns = [
-                    r"i'm (\w+)",
-                    r"i am (\w+)"
-                ]
-                for pattern in less_specific_patterns:
-                    match = re.search(pattern, text_lower)
-                    if match:
-                        potential_name = match.group(1).lower()
-                        # Be very strict with these patterns - check if it's clearly a name
-                        if (potential_name not in name_blacklist and 
-                            len(potential_name) > 2 and  # Names are usually longer
-                            not any(char.isdigit() for char in potential_name) and  # No numbers
-                            potential_name[0].isalpha()):  # Starts with letter
-                            keywords['name'] = potential_name.capitalize()
-                            break
-        
-        return keywords
-    
-    def _handle_time_question(self, user_input):
-        """Handle time-related questions."""
+        return extract_keywords(text)
+    
+    def _match_intents(self, text, text_lower=None):
+        """Intent mask, feeling and name of the text (one scan; see keywords.KeywordMatcher.scan)."""
+        return scan_message(text.lower() if text_lower is None else text_lower)
+    
+    def _handle_time_question(self, turn):
+        """Handle time-related questions (turn is the message's Turn)."""
+        self._reply_cacheable = False  # Depends on the clock
         now = datetime.now()
         time_str = now.strftime("%I:%M %p")  # 12-hour format with AM/PM
         date_str = now.strftime("%A, %B %d, %Y")  # Day, Month Day, Year
         
-        user_lower = user_input.lower()
+        user_lower = turn.lower
         
         # Check if it's actually asking for time/date (not just mentioning it)
         is_time_question = any(phrase in user_lower for phrase in ['what time', 'current time', 'time now', 'time is it', 'what\'s the time'])
@@ -136,457 +162,416 @@ class Chatbot:
         return f"The current time is {time_str} and today's date is {date_str}."
     
     def _handle_calculation(self, user_input):
-        """Handle mathematical calculations in natural language or mathematical notation."""
-        try:
-            user_lower = user_input.lower()
-            
-            # Handle natural language calculations
-            # Pattern: "what is X plus/minus/times/divided by Y"
-            natural_patterns = [
-                (r'what is (\d+)\s+plus\s+(\d+)', lambda m: int(m.group(1)) + int(m.group(2))),
-                (r'what is (\d+)\s+(\+)\s+(\d+)', lambda m: int(m.group(1)) + int(m.group(3))),
-                (r'(\d+)\s+plus\s+(\d+)', lambda m: int(m.group(1)) + int(m.group(2))),
-                (r'what is (\d+)\s+minus\s+(\d+)', lambda m: int(m.group(1)) - int(m.group(2))),
-                (r'what is (\d+)\s+(\-)\s+(\d+)', lambda m: int(m.group(1)) - int(m.group(3))),
-                (r'(\d+)\s+minus\s+(\d+)', lambda m: int(m.group(1)) - int(m.group(2))),
-                (r'what is (\d+)\s+times\s+(\d+)', lambda m: int(m.group(1)) * int(m.group(2))),
-                (r'what is (\d+)\s+(\*)\s+(\d+)', lambda m: int(m.group(1)) * int(m.group(3))),
-                (r'(\d+)\s+times\s+(\d+)', lambda m: int(m.group(1)) * int(m.group(2))),
-                (r'what is (\d+)\s+divided by\s+(\d+)', lambda m: int(m.group(1)) / int(m.group(2)) if int(m.group(2)) != 0 else None),
-                (r'what is (\d+)\s+(\/)\s+(\d+)', lambda m: int(m.group(1)) / int(m.group(3)) if int(m.group(3)) != 0 else None),
-                (r'(\d+)\s+divided by\s+(\d+)', lambda m: int(m.group(1)) / int(m.group(2)) if int(m.group(2)) != 0 else None),
-            ]
-            
-            for pattern, func in natural_patterns:
-                match = re.search(pattern, user_lower)
-                if match:
-                    result = func(match)
-                    if result is None:
-                        return "I can't divide by zero!"
-                    return f"The answer is {result}."
-            
-            # Handle direct mathematical expressions (e.g., "5 + 3", "10 * 2")
-            # Extract mathematical expression - keep numbers, operators, and parentheses
-            expression = re.sub(r'[^0-9+\-*/().\s]', '', user_input)
-            expression = expression.strip()
-            
-            # Safety: only allow basic math operations
-            if expression and re.match(r'^[\d+\-*/().\s]+$', expression):
-                # Evaluate safely
-                result = eval(expression)
-                return f"The answer is {result}."
-            
-            return None
-        except ZeroDivisionError:
-            return "I can't divide by zero!"
-        except Exception:
-            return None
-    
-    def _get_conversation_context(self, lookback=5):
-        """Get recent conversation context for better responses."""
-        if len(self.conversation_history) == 0:
-            return []
-        
-        # Get last N exchanges for context
-        recent = self.conversation_history[-lookback:]
-        return recent
-    
-    def _extract_topics_from_history(self, user_input):
-        """Extract and match topics from conversation history."""
-        user_lower = user_input.lower()
-        matched_topics = []
-        
-        # Check if user is referring to something mentioned before
-        for entry in self.conversation_history[-10:]:  # Check last 10 messages
-            prev_user_msg = entry['user'].lower()
-            prev_bot_msg = entry['bot'].lower()
-            
-            # Extract key nouns and topics from previous messages
-            # Simple keyword matching for now
-            prev_words = set(prev_user_msg.split() + prev_bot_msg.split())
-            current_words = set(user_lower.split())
-            
-            # Find common meaningful words (excluding common words)
-            common_words = prev_words.intersection(current_words)
-            stop_words = {'i', 'am', 'is', 'the', 'a', 'an', 'and', 'or', 'but', 'to', 'for', 'of', 'in', 'on', 'at', 'by', 'it', 'this', 'that', 'what', 'how', 'why', 'when', 'where', 'who'}
-            meaningful_common = common_words - stop_words
-            
-            if meaningful_common:
-                matched_topics.append({
-                    'keywords': list(meaningful_common),
-                    'previous_message': entry['user'],
-                    'context': entry
-                })
-        
-        return matched_topics
-    
-    def _find_relevant_context(self, user_input):
-        """Find relevant context from conversation history based on current input."""
-        user_lower = user_input.lower()
-        context = self._get_conversation_context(lookback=8)
-        
-        relevant_info = {
-            'recent_topics': [],
-            'mentioned_before': [],
-            'user_info_mentioned': []
-        }
+        """Handle mathematical calculations in natural language or mathematical notation.
         
-        # Check for references to previous topics
-        for entry in context:
-            prev_msg = entry['user'].lower()
-            
-            # Check if user is asking about something mentioned before
-            if any(word in user_lower for word in prev_msg.split() if len(word) > 3):
-                relevant_info['mentioned_before'].append(entry)
-            
-            # Extract topics from previous messages
-            if len(prev_msg.split()) > 3:
-                # Simple topic extraction - get key nouns
-                words = [w for w in prev_msg.split() if w not in ['i', 'am', 'is', 'the', 'a', 'an', 'and', 'or', 'but', 'to', 'for', 'of', 'in', 'on', 'at', 'by']]
-                if words:
-                    relevant_info['recent_topics'].extend(words[:3])
-        
-        return relevant_info
-    
-    def _build_contextual_response(self, user_input, keywords, relevant_context):
-        """Build a response that references previous conversation only when necessary."""
-        user_lower = user_input.lower()
+        "what is 12 plus 7", "(2 + 3) * 4", "1.5 divided by 3": see calculator.py
+        for the supported forms and the limits that bound the work per message.
+        """
+        return calculate(user_input)
+    
+    def _name_prefix(self):
+        """Prefix that addresses the user by name once it is known."""
         user_name = self.user_info.get('name', '')
-        name_prefix = f"{user_name}, " if user_name else ""
-        
-        # Only reference previous conversation for explicit follow-up questions with pronouns
-        # Don't constantly repeat what was said before
-        if keywords['is_question'] and any(pronoun in user_lower for pronoun in ['it', 'that', 'this', 'they']):
-            # User is asking a follow-up question - acknowledge naturally without repeating
-            return f"{name_prefix}I'd be happy to help with that. Could you clarify what specifically you'd like to know?"
-        
-        return None
+        return f"{user_name}, " if user_name else ""
     
-    def _extract_and_store_info(self, user_input):
-        """Extract and store important information from user input."""
-        user_lower = user_input.lower()
+    def _extract_and_store_info(self, turn):
+        """Extract and store important information from user input (a Turn)."""
+        user_lower = turn.lower
         
         # Extract and store facts (simple pattern matching)
         # Store preferences, facts, etc.
         if 'i like' in user_lower or 'i love' in user_lower:
             # Extract what they like
-            match = re.search(r'i (like|love) (.+?)(?:\.|$|,|and)', user_lower)
+            match = _LIKE_PATTERN.search(user_lower)
             if match:
                 item = match.group(2).strip()
                 if 'likes' not in self.conversation_memory:
-                    self.conversation_memory['likes'] = []
-                if item not in self.conversation_memory['likes']:
-                    self.conversation_memory['likes'].append(item)
+                    self.conversation_memory['likes'] = MemoryStore(self.memory_limit)
+                self.conversation_memory['likes'].add(item)
         
         if 'i am' in user_lower or "i'm" in user_lower:
             # Extract characteristics
-            match = re.search(r"i (am|'m) (.+?)(?:\.|$|,|and)", user_lower)
+            match = _TRAIT_PATTERN.search(user_lower)
             if match:
                 char = match.group(2).strip()
                 if char not in ['feeling', 'doing', 'going', 'here', 'there', 'sorry', 'fine', 'good', 'bad']:
                     if 'characteristics' not in self.conversation_memory:
-                        self.conversation_memory['characteristics'] = []
-                    if char not in self.conversation_memory['characteristics']:
-                        self.conversation_memory['characteristics'].append(char)
+                        self.conversation_memory['characteristics'] = MemoryStore(self.memory_limit)
+                    self.conversation_memory['characteristics'].add(char)
         
         # Store topics discussed
-        if len(user_input.split()) > 2:
+        if len(turn.tokens) > 2:
             # Extract key nouns as topics
-            words = [w for w in user_input.split() if w.lower() not in ['i', 'am', 'is', 'the', 'a', 'an', 'and', 'or', 'but', 'to', 'for', 'of', 'in', 'on', 'at', 'by']]
+            words = [word for word, lower in zip(turn.tokens, turn.lower_tokens) if lower not in _FILLER_WORDS]
             if words:
                 topic = ' '.join(words[:3])
-                if topic not in self.discussed_topics:
-                    self.discussed_topics.append(topic)
+                self.discussed_topics.add(topic)
     
-    def _generate_contextual_response(self, user_input, keywords):
-        """Generate a ChatGPT-like response that actually addresses what the user said."""
-        user_lower = user_input.lower().strip()
-        user_name = self.user_info.get('name', '')
-        name_prefix = f"{user_name}, " if user_name else ""
-        
+    def _generate_contextual_response(self, turn):
+        """Generate a ChatGPT-like response that actually addresses what the user said.
+        
+        turn is the Turn of the message with its keyword scan done.
+        turn.intents is the mask from keywords.scan_message: one bit per reply
+        intent that may answer (lowest bit = highest priority) plus the
+        sub-check and flag bits. Only the set intent bits are visited, so the cost
+        does not grow with the number of registered intents; a handler
+        returns None to let the next candidate answer.
+        """
         # Extract and store information from current input
-        self._extract_and_store_info(user_input)
-        
-        # Get relevant context from conversation history
-        relevant_context = self._find_relevant_context(user_input)
-        
-        # Try to build contextual response first
-        contextual_response = self._build_contextual_response(user_input, keywords, relevant_context)
-        if contextual_response:
-            return contextual_response
-        
-        # 0.1. Handle greetings FIRST (before everything else to avoid conflicts)
-        if keywords['is_greeting']:
-            self.greeting_count += 1
-            # Determine time of day for appropriate greeting
-            now = datetime.now()
-            hour = now.hour
-            if 5 <= hour < 12:
-                time_greeting = "Good morning"
-            elif 12 <= hour < 17:
-                time_greeting = "Good afternoon"
-            elif 17 <= hour < 21:
-                time_greeting = "Good evening"
-            else:
-                time_greeting = "Hello"
-            
-            if self.greeting_count == 1:
-                return f"{time_greeting}! I'm a sentiment analysis chatbot. I can chat with you, answer questions, tell you the time, do calculations, and analyze emotions in your messages. How can I help you today?"
+        self._extract_and_store_info(turn)
+        
+        handlers = _INTENT_HANDLERS
+        pending = turn.intents & INTENT_MASK
+        while pending:
+            bit = pending & -pending
+            pending ^= bit
+            intent, handler = handlers[bit]
+            self.last_intent = intent
+            response = handler(self, turn)
+            if response is not None:
+                return response
+        
+        return self._reply_statement(turn)
+    
+    # Reply handlers, one per intent (registered in _INTENT_HANDLERS below).
+    # Each gets the Turn (text, lower, keywords, intents) and returns the
+    # reply or None to fall through.
+    
+    def _reply_follow_up(self, turn):
+        # Only reference previous conversation for explicit follow-up questions with pronouns
+        # Don't constantly repeat what was said before
+        if turn.intents & _PRONOUN:
+            # User is asking a follow-up question - acknowledge naturally without repeating
+            return f"{self._name_prefix()}I'd be happy to help with that. Could you clarify what specifically you'd like to know?"
+        return None
+    
+    def _reply_greeting(self, turn):
+        # Handle greetings FIRST (before everything else to avoid conflicts)
+        self._reply_cacheable = False  # Counts greetings and depends on the clock
+        self.greeting_count += 1
+        # Determine time of day for appropriate greeting
+        now = datetime.now()
+        hour = now.hour
+        if 5 <= hour < 12:
+            time_greeting = "Good morning"
+        elif 12 <= hour < 17:
+            time_greeting = "Good afternoon"
+        elif 17 <= hour < 21:
+            time_greeting = "Good evening"
+        else:
+            time_greeting = "Hello"
+        
+        if self.greeting_count == 1:
+            return f"{time_greeting}! I'm a sentiment analysis chatbot. I can chat with you, answer questions, tell you the time, do calculations, and analyze emotions in your messages. How can I help you today?"
+        else:
+            return f"{self._name_prefix()}{time_greeting}! Nice to see you again. What would you like to talk about?"
+    
+    def _reply_profanity(self, turn):
+        name_prefix = self._name_prefix()
+        # Directed at the bot: "you"/"your"/"fuck you"/"screw you" all contain "you";
+        # "fuck off" and "shut up" are offensive phrases themselves
+        if turn.intents & (_YOU | _OFFENSIVE):
+            # Professional response to offensive language directed at bot
+            return f"{name_prefix}I understand you might be frustrated. I'm here to help, not to upset you. Is there something specific that's bothering you? I'd like to assist you in a more constructive way."
+        else:
+            # General profanity - acknowledge but redirect
+            return f"{name_prefix}I can sense you're feeling strongly about something. Would you like to talk about what's on your mind? I'm here to listen and help if I can."
+    
+    def _reply_positive_feedback(self, turn):
+        return f"{self._name_prefix()}Thank you so much! That really means a lot to me. I'm glad I could help and that you're having a positive experience. Is there anything else you'd like to talk about or ask?"
+    
+    def _reply_complaint(self, turn):
+        # Only answer complaints about the service/bot that are actually negative
+        is_about_service = turn.intents & _SERVICE_WORD
+        has_negative_word = turn.intents & _NEGATIVE_WORD
+        if (is_about_service or turn.intents & _CRITICISM) and has_negative_word:
+            # Genuine response to service criticism
+            return f"{self._name_prefix()}I'm truly sorry to hear that you're disappointed with my service. Your feedback is important to me, and I want to help improve your experience. Could you tell me specifically what's not working well for you? I'd like to understand better so I can assist you more effectively."
+        # If it's a general complaint (not about service), let it fall through to feeling handler
+        return None
+    
+    def _reply_feeling(self, turn):
+        # Handle emotional statements (before name extraction to avoid conflicts)
+        feeling = turn.feeling
+        name_prefix = self._name_prefix()
+        
+        if feeling in ['happy', 'excited', 'great', 'wonderful', 'amazing', 'grateful', 'proud', 'relieved']:
+            return f"{name_prefix}That's wonderful that you're feeling {feeling}! I'm glad to hear that. What's making you feel this way? I'd love to hear more."
+        elif feeling in ['sad', 'unhappy', 'depressed', 'down', 'disappointed']:
+            return f"{name_prefix}I'm sorry to hear you're feeling {feeling}. That must be difficult. Would you like to talk about what's causing these feelings? I'm here to listen."
+        elif feeling in ['worried', 'anxious', 'stressed', 'frustrated']:
+            return f"{name_prefix}It sounds like you're feeling {feeling}. That can be really challenging. What's on your mind? I'm here to listen and help if I can."
+        elif feeling in ['tired', 'confused']:
+            return f"{name_prefix}I understand feeling {feeling}. Sometimes it helps to talk things through. What's going on? I'm here to help."
+        return None
+    
+    def _reply_name(self, turn):
+        # Handle name extraction and storage (only if no feeling was detected)
+        self._reply_cacheable = False  # Changes the session state
+        self.user_info['name'] = turn.name
+        return f"Nice to meet you, {turn.name}! I'll remember that. How are you doing today?"
+    
+    def _reply_time(self, turn):
+        # Handle time/date questions - ACTUALLY ANSWER THEM
+        return self._handle_time_question(turn)
+    
+    def _reply_calc(self, turn):
+        # Handle calculations - ACTUALLY CALCULATE
+        return self._handle_calculation(turn.text) or None
+    
+    def _reply_apology(self, turn):
+        # Handle apologies - SAY SORRY BACK (like ChatGPT)
+        if turn.intents & _SORRY:
+            return f"{self._name_prefix()}No worries at all! There's nothing to apologize for. What's on your mind?"
+        return f"{self._name_prefix()}That's okay, no need to apologize. How can I help you?"
+    
+    def _reply_birthday(self, turn):
+        # Extract age if mentioned
+        age_match = re.search(r'(\d+)\s*(?:years?\s*old|turning)', turn.lower)
+        age_text = ""
+        if age_match:
+            age = age_match.group(1)
+            # Determine ordinal suffix
+            if age.endswith('1') and age != '11':
+                suffix = 'st'
+            elif age.endswith('2') and age != '12':
+                suffix = 'nd'
+            elif age.endswith('3') and age != '13':
+                suffix = 'rd'
             else:
-                return f"{name_prefix}{time_greeting}! Nice to see you again. What would you like to talk about?"
+                suffix = 'th'
+            age_text = f" Happy {age}{suffix} birthday!"
         
-        # 0.3. Handle profanity and offensive language (after greetings)
-        if keywords['is_profanity'] or keywords['is_offensive']:
-            # Check if it's directed at the bot or just general profanity
-            directed_at_bot = any(phrase in user_lower for phrase in ['fuck you', 'fuck off', 'you', 'your', 'screw you', 'shut up'])
-            
-            if directed_at_bot or keywords['is_offensive']:
-                # Professional response to offensive language directed at bot
-                return f"{name_prefix}I understand you might be frustrated. I'm here to help, not to upset you. Is there something specific that's bothering you? I'd like to assist you in a more constructive way."
+        return f"{self._name_prefix()}Happy Birthday! 🎉🎂🎈 That's wonderful!{age_text} I hope you have an amazing day filled with joy and celebration. How are you planning to celebrate? I'd love to hear about it!"
+    
+    def _reply_special_event(self, turn):
+        name_prefix = self._name_prefix()
+        if 'anniversary' in turn.lower:
+            return f"{name_prefix}Congratulations on your anniversary! 🎉 That's a special milestone. How long have you been celebrating? I'd love to hear about it!"
+        elif 'graduation' in turn.lower:
+            return f"{name_prefix}Congratulations on your graduation! 🎓 That's a huge achievement! What did you study? I'm so happy for you!"
+        elif 'wedding' in turn.lower or 'engaged' in turn.lower:
+            return f"{name_prefix}Congratulations! 💍 That's such exciting news! Whether it's a wedding or engagement, that's a beautiful milestone. Tell me more about it!"
+        elif 'promotion' in turn.lower or 'new job' in turn.lower:
+            return f"{name_prefix}Congratulations on your promotion/new job! 🎉 That's fantastic news! I'm so happy for you. How are you feeling about it?"
+        else:
+            return f"{name_prefix}That's wonderful news! Congratulations! 🎉 I'm so happy for you. Tell me more about it!"
+    
+    def _reply_goodbye(self, turn):
+        return f"{self._name_prefix()}Goodbye! It was nice talking with you. Take care!"
+    
+    def _reply_thanks(self, turn):
+        return f"{self._name_prefix()}You're very welcome! I'm glad I could help. Is there anything else you'd like to know?"
+    
+    def _reply_reciprocal_question(self, turn):
+        # Handle reciprocal questions like "and you?", "what about you?" - CHECK BEFORE QUESTIONS
+        # Check if user mentioned they're doing well/good/fine
+        if turn.intents & _STATUS_WORD:
+            return f"{self._name_prefix()}That's great to hear! I'm doing well, thank you for asking! I'm here and ready to help. Is there anything you'd like to talk about or ask?"
+        else:
+            # User asked "and you?" but didn't mention their status
+            return f"{self._name_prefix()}I'm doing great, thank you for asking! I'm here and ready to help. How are you doing today?"
+    
+    def _reply_comparison(self, turn):
+        # Handle comparative statements and experience feedback
+        name_prefix = self._name_prefix()
+        # Check if it's a positive comparison (better) or negative (worse)
+        is_positive_comparison = turn.intents & _BETTER_WORD
+        is_negative_comparison = turn.intents & _WORSE_WORD
+        
+        if turn.intents & _EXPERIENCE_FEEDBACK:
+            if is_positive_comparison:
+                return f"{name_prefix}I'm glad to hear that your previous experience was positive! I appreciate you sharing that. Is there something specific from that experience that you'd like me to help recreate or improve upon?"
+            elif is_negative_comparison:
+                return f"{name_prefix}I understand your concern about the experience. I'm sorry if things haven't been as good as before. Could you tell me more about what made the previous experience better? I'd like to learn from that and improve."
             else:
-                # General profanity - acknowledge but redirect
-                return f"{name_prefix}I can sense you're feeling strongly about something. Would you like to talk about what's on your mind? I'm here to listen and help if I can."
-        
-        # 0.4. Handle positive feedback FIRST (before complaints to catch positive comments)
-        if keywords['is_positive_feedback']:
-            return f"{name_prefix}Thank you so much! That really means a lot to me. I'm glad I could help and that you're having a positive experience. Is there anything else you'd like to talk about or ask?"
-        
-        # 0.5. Handle complaints and criticism (but only if it's actually negative)
-        if keywords['is_complaint'] or keywords['is_criticism']:
-            # Check if it's specifically about the service/bot
-            service_keywords = ['service', 'bot', 'chatbot', 'you', 'this']
-            is_about_service = any(keyword in user_lower for keyword in service_keywords)
-            
-            # Make sure it's actually negative - check for negative words
-            has_negative_word = any(word in user_lower for word in ['bad', 'terrible', 'awful', 'horrible', 'worst', 'disappoint', 'suck', 'not helpful', 'not working', 'does not work', "doesn't work"])
-            
-            if (is_about_service or keywords['is_criticism']) and has_negative_word:
-                # Genuine response to service criticism
-                return f"{name_prefix}I'm truly sorry to hear that you're disappointed with my service. Your feedback is important to me, and I want to help improve your experience. Could you tell me specifically what's not working well for you? I'd like to understand better so I can assist you more effectively."
-            # If it's a general complaint (not about service), let it fall through to feeling handler
-        
-        # 1. Handle emotional statements (before name extraction to avoid conflicts)
-        if keywords['feeling']:
-            feeling = keywords['feeling']
-            
-            if feeling in ['happy', 'excited', 'great', 'wonderful', 'amazing', 'grateful', 'proud', 'relieved']:
-                return f"{name_prefix}That's wonderful that you're feeling {feeling}! I'm glad to hear that. What's making you feel this way? I'd love to hear more."
-            elif feeling in ['sad', 'unhappy', 'depressed', 'down', 'disappointed']:
-                return f"{name_prefix}I'm sorry to hear you're feeling {feeling}. That must be difficult. Would you like to talk about what's causing these feelings? I'm here to listen."
-            elif feeling in ['worried', 'anxious', 'stressed', 'frustrated']:
-                return f"{name_prefix}It sounds like you're feeling {feeling}. That can be really challenging. What's on your mind? I'm here to listen and help if I can."
-            elif feeling in ['tired', 'confused']:
-                return f"{name_prefix}I understand feeling {feeling}. Sometimes it helps to talk things through. What's going on? I'm here to help."
-        
-        # 2. Handle name extraction and storage (only if no feeling was detected)
-        if keywords['name']:
-            self.user_info['name'] = keywords['name']
-            return f"Nice to meet you, {keywords['name']}! I'll remember that. How are you doing today?"
-        
-        # 3. Handle time/date questions - ACTUALLY ANSWER THEM
-        if keywords['needs_time'] or keywords['needs_date']:
-            return self._handle_time_question(user_input)
-        
-        # 4. Handle calculations - ACTUALLY CALCULATE
-        if keywords['needs_calc']:
-            calc_result = self._handle_calculation(user_input)
-            if calc_result:
-                return calc_result
-        
-        # 5. Handle apologies - SAY SORRY BACK (like ChatGPT)
-        if keywords['is_apology']:
-            if 'sorry' in user_lower:
-                return f"{name_prefix}No worries at all! There's nothing to apologize for. What's on your mind?"
-            return f"{name_prefix}That's okay, no need to apologize. How can I help you?"
-        
-        # 6. Handle birthdays and special events
-        if keywords['is_birthday']:
-            # Extract age if mentioned
-            age_match = re.search(r'(\d+)\s*(?:years?\s*old|turning)', user_lower)
-            age_text = ""
-            if age_match:
-                age = age_match.group(1)
-                # Determine ordinal suffix
-                if age.endswith('1') and age != '11':
-                    suffix = 'st'
-                elif age.endswith('2') and age != '12':
-                    suffix = 'nd'
-                elif age.endswith('3') and age != '13':
-                    suffix = 'rd'
-                else:
-                    suffix = 'th'
-                age_text = f" Happy {age}{suffix} birthday!"
-            
-            return f"{name_prefix}Happy Birthday! 🎉🎂🎈 That's wonderful!{age_text} I hope you have an amazing day filled with joy and celebration. How are you planning to celebrate? I'd love to hear about it!"
-        
-        if keywords['is_special_event']:
-            if 'anniversary' in user_lower:
-                return f"{name_prefix}Congratulations on your anniversary! 🎉 That's a special milestone. How long have you been celebrating? I'd love to hear about it!"
-            elif 'graduation' in user_lower:
-                return f"{name_prefix}Congratulations on your graduation! 🎓 That's a huge achievement! What did you study? I'm so happy for you!"
-            elif 'wedding' in user_lower or 'engaged' in user_lower:
-                return f"{name_prefix}Congratulations! 💍 That's such exciting news! Whether it's a wedding or engagement, that's a beautiful milestone. Tell me more about it!"
-            elif 'promotion' in user_lower or 'new job' in user_lower:
-                return f"{name_prefix}Congratulations on your promotion/new job! 🎉 That's fantastic news! I'm so happy for you. How are you feeling about it?"
+                # Neutral experience feedback
+                return f"{name_prefix}Thank you for sharing your experience. I'd like to understand better - what aspects of the experience would you like to discuss? I'm here to help improve things."
+        else:
+            if is_positive_comparison:
+                return f"{name_prefix}That's great to hear! I'm glad things are better now. What specifically made it better? I'd love to understand what's working well."
+            elif is_negative_comparison:
+                return f"{name_prefix}I understand your concern. I'm sorry things aren't as good as they were. Could you tell me more about what changed or what's different now? I'd like to help improve the situation."
             else:
-                return f"{name_prefix}That's wonderful news! Congratulations! 🎉 I'm so happy for you. Tell me more about it!"
-        
-        # 7. Handle goodbyes
-        if keywords['is_goodbye']:
-            return f"{name_prefix}Goodbye! It was nice talking with you. Take care!"
-        
-        # 8. Handle thanks
-        if keywords['is_thanks']:
-            return f"{name_prefix}You're very welcome! I'm glad I could help. Is there anything else you'd like to know?"
+                return f"{name_prefix}I see you're making a comparison. Could you tell me more about what you're comparing? I'd like to understand better so I can help."
+    
+    def _reply_question(self, turn):
+        # Handle questions - ANSWER THEM PROPERLY WITH CONTEXT
+        name_prefix = self._name_prefix()
+        # Check for follow-up questions (using "it", "that", "this", etc.)
+        # Only acknowledge naturally without repeating previous messages
+        if turn.intents & (_PRONOUN | _THEM):
+            return f"{name_prefix}I'd be happy to help with that. Could you clarify what specifically you'd like to know?"
         
-        # 8.5. Handle reciprocal questions like "and you?", "what about you?" - CHECK BEFORE QUESTIONS
-        if keywords['is_reciprocal_question']:
-            # Check if user mentioned they're doing well/good/fine
-            if any(word in user_lower for word in ['good', 'great', 'fine', 'well', 'okay', 'ok', 'alright', 'excellent', 'wonderful', 'amazing', 'doing well', 'doing good']):
-                return f"{name_prefix}That's great to hear! I'm doing well, thank you for asking! I'm here and ready to help. Is there anything you'd like to talk about or ask?"
+        # What questions
+        if turn.intents & _WHAT:
+            if 'what time' in turn.lower or "what's the time" in turn.lower:
+                return self._handle_time_question(turn)
+            elif 'what date' in turn.lower or "what's the date" in turn.lower:
+                return self._handle_time_question(turn)
+            elif 'what is' in turn.lower or "what's" in turn.lower:
+                # Extract the topic
+                topic = re.sub(r"what is|what's", "", turn.lower).strip(' ?')
+                
+                if 'sentiment' in topic or 'feeling' in topic:
+                    return f"{name_prefix}Sentiment analysis is a technique that identifies and extracts emotional tone from text. I use VADER (Valence Aware Dictionary and sEntiment Reasoner) to analyze whether messages are positive, negative, or neutral. It's quite fascinating!"
+                elif 'your name' in topic or 'you called' in topic:
+                    return f"{name_prefix}I'm a sentiment analysis chatbot! I help analyze emotions in conversations and can answer various questions. What would you like to know?"
+                elif topic:
+                    return f"{name_prefix}You're asking about '{topic}'. That's interesting! Could you tell me more specifically what you'd like to know about it?"
+                else:
+                    return f"{name_prefix}I'm here to help! Could you be more specific about what you'd like to know?"
+            elif 'what do you' in turn.lower or 'what can you' in turn.lower:
+                return f"{name_prefix}I'm a sentiment analysis chatbot. I can: analyze emotions in your messages, answer questions, tell you the current time and date, perform calculations, have conversations, and track mood trends. What would you like to try?"
             else:
-                # User asked "and you?" but didn't mention their status
-                return f"{name_prefix}I'm doing great, thank you for asking! I'm here and ready to help. How are you doing today?"
+                # Reference what they asked
+                return f"{name_prefix}You asked: '{turn.text}'. Could you rephrase that or provide more context? I'd like to give you a better answer."
+        
+        # Who questions
+        elif turn.intents & _WHO:
+            if 'who are you' in turn.lower:
+                return f"{name_prefix}I'm a sentiment analysis chatbot designed to understand emotions in conversations. I use VADER to analyze sentiment and can help with various questions. How can I assist you?"
+            elif 'who is' in turn.lower or "who's" in turn.lower:
+                person = re.sub(r"who is|who's", "", turn.lower).strip(' ?')
+                if person:
+                    return f"{name_prefix}You're asking about '{person}'. I don't have specific information about individuals, but I'm here to chat and help with other questions!"
+                return f"{name_prefix}Could you tell me who specifically you're asking about?"
+            else:
+                return f"{name_prefix}Could you clarify your 'who' question? I'd like to help you better."
         
-        # 8.6. Handle comparative statements and experience feedback
-        if keywords['is_comparison'] or keywords['is_experience_feedback']:
-            # Check if it's a positive comparison (better) or negative (worse)
-            is_positive_comparison = any(word in user_lower for word in ['better', 'improved', 'good', 'great', 'excellent'])
-            is_negative_comparison = any(word in user_lower for word in ['worse', 'declined', 'not as good', 'bad', 'terrible'])
-            
-            if keywords['is_experience_feedback']:
-                if is_positive_comparison:
-                    return f"{name_prefix}I'm glad to hear that your previous experience was positive! I appreciate you sharing that. Is there something specific from that experience that you'd like me to help recreate or improve upon?"
-                elif is_negative_comparison:
-                    return f"{name_prefix}I understand your concern about the experience. I'm sorry if things haven't been as good as before. Could you tell me more about what made the previous experience better? I'd like to learn from that and improve."
-                else:
-                    # Neutral experience feedback
-                    return f"{name_prefix}Thank you for sharing your experience. I'd like to understand better - what aspects of the experience would you like to discuss? I'm here to help improve things."
-            elif keywords['is_comparison']:
-                if is_positive_comparison:
-                    return f"{name_prefix}That's great to hear! I'm glad things are better now. What specifically made it better? I'd love to understand what's working well."
-                elif is_negative_comparison:
-                    return f"{name_prefix}I understand your concern. I'm sorry things aren't as good as they were. Could you tell me more about what changed or what's different now? I'd like to help improve the situation."
-                else:
-                    return f"{name_prefix}I see you're making a comparison. Could you tell me more about what you're comparing? I'd like to understand better so I can help."
-        
-        # 9. Handle questions - ANSWER THEM PROPERLY WITH CONTEXT
-        if keywords['is_question']:
-            # Check for follow-up questions (using "it", "that", "this", etc.)
-            # Only acknowledge naturally without repeating previous messages
-            if any(pronoun in user_lower for pronoun in ['it', 'that', 'this', 'they', 'them']):
-                return f"{name_prefix}I'd be happy to help with that. Could you clarify what specifically you'd like to know?"
-            
-            # What questions
-            if 'what' in user_lower:
-                if 'what time' in user_lower or "what's the time" in user_lower:
-                    return self._handle_time_question(user_input)
-                elif 'what date' in user_lower or "what's the date" in user_lower:
-                    return self._handle_time_question(user_input)
-                elif 'what is' in user_lower or "what's" in user_lower:
-                    # Extract the topic
-                    topic = re.sub(r"what is|what's", "", user_lower).strip(' ?')
-                    
-                    if 'sentiment' in topic or 'feeling' in topic:
-                        return f"{name_prefix}Sentiment analysis is a technique that identifies and extracts emotional tone from text. I use VADER (Valence Aware Dictionary and sEntiment Reasoner) to analyze whether messages are positive, negative, or neutral. It's quite fascinating!"
-                    elif 'your name' in topic or 'you called' in topic:
-                        return f"{name_prefix}I'm a sentiment analysis chatbot! I help analyze emotions in conversations and can answer various questions. What would you like to know?"
-                    elif topic:
-                        return f"{name_prefix}You're asking about '{topic}'. That's interesting! Could you tell me more specifically what you'd like to know about it?"
-                    else:
-                        return f"{name_prefix}I'm here to help! Could you be more specific about what you'd like to know?"
-                elif 'what do you' in user_lower or 'what can you' in user_lower:
-                    return f"{name_prefix}I'm a sentiment analysis chatbot. I can: analyze emotions in your messages, answer questions, tell you the current time and date, perform calculations, have conversations, and track mood trends. What would you like to try?"
-                else:
-                    # Reference what they asked
-                    return f"{name_prefix}You asked: '{user_input}'. Could you rephrase that or provide more context? I'd like to give you a better answer."
-            
-            # Who questions
-            elif 'who' in user_lower:
-                if 'who are you' in user_lower:
-                    return f"{name_prefix}I'm a sentiment analysis chatbot designed to understand emotions in conversations. I use VADER to analyze sentiment and can help with various questions. How can I assist you?"
-                elif 'who is' in user_lower or "who's" in user_lower:
-                    person = re.sub(r"who is|who's", "", user_lower).strip(' ?')
-                    if person:
-                        return f"{name_prefix}You're asking about '{person}'. I don't have specific information about individuals, but I'm here to chat and help with other questions!"
-                    return f"{name_prefix}Could you tell me who specifically you're asking about?"
-                else:
-                    return f"{name_prefix}Could you clarify your 'who' question? I'd like to help you better."
-            
-            # How questions
-            elif 'how' in user_lower:
-                if 'how are you' in user_lower:
-                    return f"{name_prefix}I'm doing great, thank you for asking! I'm here and ready to help. How are you doing today?"
-                elif 'how does' in user_lower or 'how do' in user_lower:
-                    if 'sentiment' in user_lower or 'work' in user_lower:
-                        return f"{name_prefix}Sentiment analysis works by analyzing words, phrases, and their emotional context. I use VADER, which examines text for positive/negative words, punctuation, capitalization, and other linguistic cues to determine emotional tone. It's quite sophisticated!"
-                    else:
-                        topic = re.sub(r"how does|how do", "", user_lower).strip(' ?')
-                        if topic:
-                            return f"{name_prefix}You're asking how '{topic}' works. That's a good question! Could you provide more context so I can give you a better explanation?"
-                        return f"{name_prefix}I'd be happy to explain! What specifically would you like to know how it works?"
+        # How questions
+        elif turn.intents & _HOW:
+            if 'how are you' in turn.lower:
+                return f"{name_prefix}I'm doing great, thank you for asking! I'm here and ready to help. How are you doing today?"
+            elif 'how does' in turn.lower or 'how do' in turn.lower:
+                if 'sentiment' in turn.lower or 'work' in turn.lower:
+                    return f"{name_prefix}Sentiment analysis works by analyzing words, phrases, and their emotional context. I use VADER, which examines text for positive/negative words, punctuation, capitalization, and other linguistic cues to determine emotional tone. It's quite sophisticated!"
                 else:
-                    return f"{name_prefix}I'd be happy to help explain. Could you provide more details about what you're asking?"
-            
-            # Why questions
-            elif 'why' in user_lower:
-                topic = re.sub(r"why", "", user_lower).strip(' ?')
-                if topic:
-                    return f"{name_prefix}You're asking why '{topic}'. That's a thoughtful question! Could you provide more context so I can give you a meaningful answer?"
-                return f"{name_prefix}That's an interesting 'why' question. Could you tell me more about what specifically you're wondering about?"
-            
-            # Where questions
-            elif 'where' in user_lower:
-                location = re.sub(r"where", "", user_lower).strip(' ?')
-                if location:
-                    return f"{name_prefix}You're asking about where '{location}'. I don't have specific location information, but I'm here to help with other questions!"
-                return f"{name_prefix}Could you clarify what location you're asking about?"
-            
-            # When questions
-            elif 'when' in user_lower:
-                if 'when' in user_lower and ('time' in user_lower or 'now' in user_lower):
-                    return self._handle_time_question(user_input)
-                event = re.sub(r"when", "", user_lower).strip(' ?')
-                if event:
-                    return f"{name_prefix}You're asking when '{event}'. I don't have specific timing information, but I can tell you the current time and date if that helps!"
-                return f"{name_prefix}Could you clarify what you're asking about the timing of?"
-        
-        # 10. Handle statements - RESPOND NATURALLY WITHOUT CONSTANT REPETITION
+                    topic = re.sub(r"how does|how do", "", turn.lower).strip(' ?')
+                    if topic:
+                        return f"{name_prefix}You're asking how '{topic}' works. That's a good question! Could you provide more context so I can give you a better explanation?"
+                    return f"{name_prefix}I'd be happy to explain! What specifically would you like to know how it works?"
+            else:
+                return f"{name_prefix}I'd be happy to help explain. Could you provide more details about what you're asking?"
+        
+        # Why questions
+        elif turn.intents & _WHY:
+            topic = re.sub(r"why", "", turn.lower).strip(' ?')
+            if topic:
+                return f"{name_prefix}You're asking why '{topic}'. That's a thoughtful question! Could you provide more context so I can give you a meaningful answer?"
+            return f"{name_prefix}That's an interesting 'why' question. Could you tell me more about what specifically you're wondering about?"
+        
+        # Where questions
+        elif turn.intents & _WHERE:
+            location = re.sub(r"where", "", turn.lower).strip(' ?')
+            if location:
+                return f"{name_prefix}You're asking about where '{location}'. I don't have specific location information, but I'm here to help with other questions!"
+            return f"{name_prefix}Could you clarify what location you're asking about?"
+        
+        # When questions
+        elif turn.intents & _WHEN:
+            if 'time' in turn.lower or 'now' in turn.lower:
+                return self._handle_time_question(turn)
+            event = re.sub(r"when", "", turn.lower).strip(' ?')
+            if event:
+                return f"{name_prefix}You're asking when '{event}'. I don't have specific timing information, but I can tell you the current time and date if that helps!"
+            return f"{name_prefix}Could you clarify what you're asking about the timing of?"
+        
+        return None
+    
+    def _reply_statement(self, turn):
+        # Handle statements - RESPOND NATURALLY WITHOUT CONSTANT REPETITION
+        # (the default when no intent answered)
+        self.last_intent = "statement"
+        name_prefix = self._name_prefix()
         # Only reference previous context when user explicitly uses pronouns or asks follow-up questions
-        context = self._get_conversation_context()
+        has_context = len(self.conversation_history) > 0
+        word_count = len(turn.tokens)
         
         # Only check for explicit references (pronouns like "it", "that", "this" referring to previous topic)
-        if context and any(pronoun in user_lower for pronoun in ['it', 'that', 'this', 'they', 'them']) and len(user_input.split()) <= 5:
+        if has_context and turn.intents & (_PRONOUN | _THEM) and word_count <= 5:
             # User is likely referring to something specific from previous conversation
             # But don't repeat the whole previous message, just acknowledge naturally
             return f"{name_prefix}I understand. Can you tell me more about that?"
         
         # If user said something specific, acknowledge it naturally without repeating
-        if len(user_input.split()) > 2:
-            # Extract key phrases from what they said
-            meaningful_words = [w for w in user_input.split() if w.lower() not in ['i', 'am', 'is', 'the', 'a', 'an', 'and', 'or', 'but', 'to', 'for', 'of', 'in', 'on', 'at', 'by']]
-            if meaningful_words:
+        if word_count > 2:
+            # Any key phrase in what they said
+            if any(word not in _FILLER_WORDS for word in turn.lower_tokens):
                 # Just acknowledge naturally without repeating everything
                 return f"{name_prefix}I understand. That's interesting! Can you tell me more about that? How does that make you feel or what would you like to know about it?"
         
-        # 11. Default - engage naturally
-        responses = [
-            f"{name_prefix}I see. That's interesting. Can you tell me more about that?",
-            f"{name_prefix}I understand. How does that make you feel?",
-            f"{name_prefix}Thank you for sharing that. What else is on your mind?",
-            f"{name_prefix}I'm listening. Please continue, I'd like to hear more.",
-            f"{name_prefix}That's helpful to know. Is there something specific you'd like to discuss or ask about?"
-        ]
-        
-        response_index = hash(user_input) % len(responses)
-        return responses[response_index]
+        # Default - engage naturally
+        self.last_intent = "fallback"
+        # Stable across processes, so any worker picks the same reply
+        response_index = stable_hash(turn.text) % len(_FALLBACK_REPLIES)
+        return name_prefix + _FALLBACK_REPLIES[response_index]
     
     def generate_response(self, user_input):
-        """Generate a contextual response based on user input."""
-        keywords = self._extract_keywords(user_input)
-        return self._generate_contextual_response(user_input, keywords)
+        """Generate a contextual response based on user input (a string or its Turn).
+        
+        Replies are served from response_cache when the same message was
+        answered before for the same name and history state. A reply is only
+        cached when its handler neither read the clock nor changed the
+        session (greetings, name capture, time and date answers);
+        _extract_and_store_info still runs for every message.
+        """
+        turn = user_input if isinstance(user_input, Turn) else Turn(user_input)
+        cache = self.response_cache
+        if cache is None or len(turn.text) > MAX_CACHED_INPUT:
+            turn.intents, turn.feeling, turn.name = self._match_intents(turn.text, turn.lower)
+            return self._generate_contextual_response(turn)
+        
+        key = (turn.text, self.user_info.get('name', ''), len(self.conversation_history) > 0)
+        cached = cache.get(key)
+        if cached is not None:
+            self._extract_and_store_info(turn)
+            self.last_intent, response = cached
+            return response
+        
+        self._reply_cacheable = True
+        turn.intents, turn.feeling, turn.name = self._match_intents(turn.text, turn.lower)
+        response = self._generate_contextual_response(turn)
+        if self._reply_cacheable:
+            cache.put(key, (self.last_intent, response))
+        return response
+    
+    def process_turn(self, user_input):
+        """Score, answer and record one (already cleaned) user message.
+        
+        VADER runs exactly once per turn; the label and raw scores are stored
+        with the turn so later consumers never re-score it. The message is
+        lowercased and split once, into the Turn every reply stage reads.
+        Returns the turn as a dict.
+        """
+        # Analyze sentiment for this message
+        message_sentiment, scores = self._score_message(user_input)
+        
+        # Generate bot response
+        bot_response = self.generate_response(Turn(user_input))
+        
+        # Store conversation entry
+        conversation_entry = {
+            "user": user_input,
+            "bot": bot_response,
+            "sentiment": message_sentiment,
+            "scores": scores
+        }
+        self.conversation_history.append(user_input, bot_response, message_sentiment, scores)
+        if self.log is not None:
+            name = self.user_info['name'] if self.last_intent == 'name' else None
+            self.log.append(user_input, bot_response, message_sentiment, scores, self.last_intent, name)
+        self._count_turn(user_input, message_sentiment, scores)
+        return conversation_entry
     
-    def run(self):
+    def _count_turn(self, user_input, message_sentiment, scores):
+        """Add one turn to the counts, overall sentiment and mood trend."""
+        self.turn_count += 1
+        self.sentiment_counts[message_sentiment] = self.sentiment_counts.get(message_sentiment, 0) + 1
+        self.overall_sentiment.add(user_input, scores)
+        self.mood_tracker.add(message_sentiment, scores['compound'])
+    
+    def run(self, **summary_options):
         """Main conversation loop."""
         print("\n" + "="*60)
         print("Welcome to the Sentiment Analysis Chatbot!")
@@ -610,19 +595,10 @@ class Chatbot:
                 # Clean input
                 user_input = clean_input(user_input)
                 
-                # Analyze sentiment for this message
-                message_sentiment = analyze_message(user_input)
-                
-                # Generate bot response
-                bot_response = self.generate_response(user_input)
-                
-                # Store conversation entry
-                conversation_entry = {
-                    "user": user_input,
-                    "bot": bot_response,
-                    "sentiment": message_sentiment
-                }
-                self.conversation_history.append(conversation_entry)
+                # Score, respond and store this turn
+                conversation_entry = self.process_turn(user_input)
+                bot_response = conversation_entry["bot"]
+                message_sentiment = conversation_entry["sentiment"]
                 
                 # Display bot response
                 if self.tier2_enabled:
@@ -649,57 +625,236 @@ class Chatbot:
                 print(f"\nError: {e}")
                 continue
         
-        # Generate and display final summary
-        self._display_final_summary()
+        # Generate and display final summary (summary_options: out, head, tail, page_size)
+        self._display_final_summary(**summary_options)
+    
+    def summary(self):
+        """Return the end-of-conversation statistics as a dict (over all turns, not just stored ones)."""
+        return {
+            "messages": self.turn_count,
+            # Tier 1: Overall conversation sentiment (kept up to date per turn)
+            "overall_sentiment": self.overall_sentiment.label() if self.turn_count else None,
+            # Tier 2: Mood trend (if enabled)
+            "mood_trend": self.mood_tracker.trend() if self.tier2_enabled else None,
+            "sentiment_distribution": dict(self.sentiment_counts)
+        }
+    
+    def snapshot(self):
+        """The session state as a picklable dict, to continue the session in another process.
+        
+        The reply cache, metrics and turn log belong to the process and are
+        not included; a session written to a turn log is moved by opening
+        its log instead.
+        """
+        if self.log is not None:
+            raise ValueError("a session with a turn log is continued from its log, not a snapshot")
+        return {name: getattr(self, name) for name in _SNAPSHOT_FIELDS}
     
-    def _display_final_summary(self):
-        """Display final conversation summary with sentiment analysis."""
-        if not self.conversation_history:
-            print("\nNo conversation to analyze. Goodbye!\n")
+    @classmethod
+    def from_snapshot(cls, state, metrics=None, response_cache=True):
+        """A Chatbot that continues the session of a snapshot() taken elsewhere."""
+        chatbot = cls(tier2_enabled=state['tier2_enabled'], history_limit=state['history_limit'],
+                      memory_limit=state['memory_limit'], metrics=metrics, response_cache=response_cache)
+        for name in _SNAPSHOT_FIELDS:
+            setattr(chatbot, name, state[name])
+        return chatbot
+    
+    def _display_final_summary(self, out=None, head=None, tail=None, page_size=None):
+        """Display final conversation summary with sentiment analysis.
+        
+        The summary is streamed to out (stdout by default) in one pass over the
+        stored turns; head/tail limit the listing to the first/last N turns and
+        page_size pauses every N turns (console only).
+        """
+        if out is None:
+            out = sys.stdout
+        if not self.turn_count:
+            out.write("\nNo conversation to analyze. Goodbye!\n\n")
             return
         
-        # Extract all user messages
-        all_user_messages = [entry["user"] for entry in self.conversation_history]
-        
-        # Tier 1: Overall conversation sentiment
-        overall_sentiment = analyze_overall(all_user_messages)
-        
-        # Tier 2: Mood trend (if enabled)
-        mood_trend = None
-        if self.tier2_enabled:
-            sentiment_list = [entry["sentiment"] for entry in self.conversation_history]
-            mood_trend = get_mood_trend(sentiment_list)
-        
-        # Format and display summary
-        summary = format_conversation_summary(
-            self.conversation_history,
-            overall_sentiment,
-            mood_trend
+        more = None
+        if page_size and out is sys.stdout and sys.stdin.isatty():
+            more = _more_prompt
+        
+        stats = self.summary()
+        write_conversation_summary(
+            out,
+            # The turn log lists the whole session; the in-memory history may only hold the latest turns
+            self.log if self.log is not None else self.conversation_history,
+            stats["overall_sentiment"],
+            stats["mood_trend"],
+            total_messages=stats["messages"],
+            sentiment_counts=stats["sentiment_distribution"],
+            head=head,
+            tail=tail,
+            page_size=page_size,
+            more=more
         )
-        print(summary)
-        
-        # Additional summary statistics
-        sentiment_counts = {}
-        for entry in self.conversation_history:
-            sentiment = entry["sentiment"]
-            sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
-        
-        print("Sentiment Distribution:")
-        for sentiment, count in sentiment_counts.items():
-            percentage = (count / len(self.conversation_history)) * 100
-            print(f"  {sentiment}: {count} messages ({percentage:.1f}%)")
-        print()
 
 
+# Per-session state carried by Chatbot.snapshot()
+_SNAPSHOT_FIELDS = (
+    'tier2_enabled', 'history_limit', 'memory_limit', 'conversation_history', 'turn_count', 'sentiment_counts',
+    'overall_sentiment', 'mood_tracker', 'greeting_count', 'user_info', 'discussed_topics', 'conversation_memory',
+    'last_intent',
+)
+
+# Reply handler of each intent; keywords.INTENTS fixes their priority
+_INTENT_HANDLERS = {
+    INTENT_BITS[intent]: (intent, getattr(Chatbot, f"_reply_{intent}")) for intent in INTENTS
+}
+
+# Sub-check bits of the intent mask used by the handlers
+_PRONOUN = SUBCHECK_BITS['pronoun']
+_THEM = SUBCHECK_BITS['them']
+_YOU = SUBCHECK_BITS['you']
+_SORRY = SUBCHECK_BITS['sorry']
+_SERVICE_WORD = SUBCHECK_BITS['service_word']
+_NEGATIVE_WORD = SUBCHECK_BITS['negative_word']
+_STATUS_WORD = SUBCHECK_BITS['status_word']
+_BETTER_WORD = SUBCHECK_BITS['better_word']
+_WORSE_WORD = SUBCHECK_BITS['worse_word']
+_WHAT = SUBCHECK_BITS['what']
+_WHO = SUBCHECK_BITS['who']
+_HOW = SUBCHECK_BITS['how']
+_WHY = SUBCHECK_BITS['why']
+_WHERE = SUBCHECK_BITS['where']
+_WHEN = SUBCHECK_BITS['when']
+
+# Keyword flag bits the handlers read
+_OFFENSIVE = FLAG_BITS['is_offensive']
+_CRITICISM = FLAG_BITS['is_criticism']
+_EXPERIENCE_FEEDBACK = FLAG_BITS['is_experience_feedback']
+
+
+def _more_prompt():
+    """Pause a paged summary; Enter shows the next page, q stops the listing."""
+    try:
+        return input("-- more (Enter to continue, q to stop) -- ").strip().lower() != "q"
+    except (EOFError, KeyboardInterrupt):
+        print()
+        return False
+
 def main():
     """Entry point for the chatbot application."""
-    # Enable Tier 2 by default (can be changed via command line argument)
-    tier2_enabled = True
-    if len(sys.argv) > 1 and sys.argv[1] == "--tier1-only":
-        tier2_enabled = False
+    # `python chatbot.py score ...` scores exported transcripts offline
+    if sys.argv[1:2] == ["score"]:
+        import transcripts
+        sys.exit(transcripts.main(sys.argv[2:]))
+    # `python chatbot.py replay ...` drives many sessions for throughput testing
+    if sys.argv[1:2] == ["replay"]:
+        import replay
+        sys.exit(replay.main(sys.argv[2:]))
+    
+    parser = argparse.ArgumentParser(
+        description="Sentiment Analysis Chatbot",
+        epilog="Run `python chatbot.py score --help` to score exported transcripts, "
+               "`python chatbot.py replay --help` to load-test the chatbot."
+    )
+    # Tier 2 is enabled by default
+    parser.add_argument("--tier1-only", action="store_true",
+                        help="only show the overall sentiment at the end")
+    # Re-score the joined transcript at the end instead of the running total
+    parser.add_argument("--overall-concat", action="store_true",
+                        help="compute overall sentiment by re-scoring the joined transcript")
+    parser.add_argument("--serve", action="store_true",
+                        help="run the multi-session line-delimited JSON server instead of the console chat")
+    parser.add_argument("--host", default=None, help="server host (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=None, help="server port (default 8765)")
+    parser.add_argument("--unix", metavar="PATH", help="serve on a Unix socket instead of TCP")
+    parser.add_argument("--max-sessions", type=int, default=None, help="server: most sessions kept (LRU evicted)")
+    parser.add_argument("--session-ttl", type=float, default=None, help="server: seconds before an idle session is dropped")
+    parser.add_argument("--workers", type=int, default=None, metavar="N",
+                        help="server: keep the sessions in N worker processes (sticky by session id) to use N cores")
+    parser.add_argument("--history-limit", type=int, default=None, help="turns kept per session (default: all for the console, 50 for the server)")
+    parser.add_argument("--summary-head", type=int, default=None, metavar="N", help="final summary: list only the first N turns")
+    parser.add_argument("--summary-tail", type=int, default=None, metavar="N", help="final summary: list only the last N turns")
+    parser.add_argument("--summary-page", type=int, default=None, metavar="N", help="final summary: pause every N turns")
+    parser.add_argument("--summary-file", metavar="PATH", help="write the final summary to PATH instead of the console")
+    parser.add_argument("--log", metavar="PATH",
+                        help="append every turn to the JSONL turn log at PATH and continue the session already in it")
+    parser.add_argument("--log-fsync", choices=("none", "batch", "turn"), default="batch",
+                        help="when the turn log is fsynced (default: once per written batch)")
+    parser.add_argument("--metrics", nargs="?", const="-", metavar="PATH",
+                        help="time the pipeline stages; write a Prometheus dump to PATH (default stdout) on exit")
+    parser.add_argument("--profile", metavar="SCRIPT",
+                        help="run the messages in SCRIPT (one per line) under cProfile and print the hottest functions")
+    parser.add_argument("--profile-out", metavar="PATH", help="with --profile, also save the raw profile to PATH")
+    args = parser.parse_args()
+    
+    tier2_enabled = not args.tier1_only
+    overall_mode = "concat" if args.overall_concat else "incremental"
     
-    chatbot = Chatbot(tier2_enabled=tier2_enabled)
-    chatbot.run()
+    if args.profile:
+        import metrics
+        with open(args.profile, encoding="utf-8") as f:
+            messages = [clean_input(line) for line in f]
+        chatbot = Chatbot(tier2_enabled=tier2_enabled, overall_mode=overall_mode, history_limit=args.history_limit)
+        print(metrics.profile_session([message for message in messages if message], chatbot,
+                                      stats_path=args.profile_out))
+        return
+    
+    pipeline_metrics = None
+    if args.metrics:
+        import metrics
+        pipeline_metrics = metrics.Metrics()
+        pipeline_metrics.instrument_analyzer(get_analyzer())
+    
+    if args.serve:
+        import server
+        session_options = {
+            name: value for name, value in (
+                ("max_sessions", args.max_sessions),
+                ("session_ttl", args.session_ttl),
+                ("history_limit", args.history_limit),
+                ("workers", args.workers)
+            ) if value is not None
+        }
+        server.serve(
+            host=args.host or server.DEFAULT_HOST,
+            port=args.port if args.port is not None else server.DEFAULT_PORT,
+            unix_path=args.unix,
+            tier2_enabled=tier2_enabled,
+            overall_mode=overall_mode,
+            metrics=pipeline_metrics,
+            **session_options
+        )
+        _write_metrics(pipeline_metrics, args.metrics)
+        return
+    
+    log = None
+    if args.log:
+        from turnlog import TurnLog
+        log = TurnLog(args.log, fsync=args.log_fsync)
+    
+    chatbot = Chatbot(tier2_enabled=tier2_enabled, overall_mode=overall_mode, history_limit=args.history_limit,
+                      metrics=pipeline_metrics, log=log)
+    if log is not None and len(log):
+        print(f"Continuing the session in {args.log} ({len(log)} turns).")
+    summary_options = {"head": args.summary_head, "tail": args.summary_tail, "page_size": args.summary_page}
+    try:
+        if args.summary_file:
+            with open(args.summary_file, "w", encoding="utf-8") as out:
+                chatbot.run(out=out, **summary_options)
+            print(f"Conversation summary written to {args.summary_file}")
+        else:
+            chatbot.run(**summary_options)
+    finally:
+        if log is not None:
+            log.close()
+    _write_metrics(pipeline_metrics, args.metrics)
+
+
+def _write_metrics(pipeline_metrics, path):
+    """Dump the Prometheus text to path ("-" for stdout) when metrics are on."""
+    if pipeline_metrics is None:
+        return
+    if path == "-":
+        print(pipeline_metrics.prometheus())
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(pipeline_metrics.prometheus())
+        print(f"Metrics written to {path}")
 
 
 if __name__ == "__main__":
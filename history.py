@@ -0,0 +1,122 @@
+# Compact columnar storage for conversation turns
+from array import array
+from collections.abc import Mapping, Sequence
+
+from sentiment import SENTIMENT_VALUES
+
+
+# Labels are stored as their trend value (one signed byte per turn)
+_LABELS = {value: label for label, value in SENTIMENT_VALUES.items()}
+
+_SCORE_KEYS = ('neg', 'neu', 'pos', 'compound')
+
+# VADER rounds every score to 4 decimals, so rounding the float32 copy back
+# to 4 decimals restores the exact original value
+_SCORE_DECIMALS = 4
+
+
+class HistoryEntry(Mapping):
+    """Read-only view of one stored turn: "user", "bot", "sentiment", "scores"."""
+
+    __slots__ = ('user', 'bot', 'sentiment', '_scores')
+
+    _KEYS = ('user', 'bot', 'sentiment', 'scores')
+
+    def __init__(self, user, bot, sentiment, scores):
+        self.user = user
+        self.bot = bot
+        self.sentiment = sentiment
+        self._scores = scores
+
+    @property
+    def scores(self):
+        return dict(zip(_SCORE_KEYS, self._scores))
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        # Mapping.get goes through __getitem__ and a KeyError; this is the hot path of summaries
+        return getattr(self, key) if key in self._KEYS else default
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        return f"HistoryEntry(user={self.user!r}, bot={self.bot!r}, sentiment={self.sentiment!r})"
+
+
+class ConversationHistory(Sequence):
+    """Conversation turns stored column by column.
+
+    Messages and replies live in two lists of strings, labels in an
+    array('b') and the four VADER scores in an array('f'), so a turn costs
+    two list slots plus 17 bytes instead of two dicts. Indexing returns a
+    HistoryEntry (a read-only mapping with the same keys as the old turn
+    dicts). With maxlen set the columns form a ring buffer of the latest
+    maxlen turns.
+    """
+
+    def __init__(self, maxlen=None):
+        if maxlen is not None and maxlen < 1:
+            raise ValueError("maxlen must be at least 1")
+        self.maxlen = maxlen
+        self._user = []
+        self._bot = []
+        self._labels = array('b')
+        self._scores = array('f')
+        self._start = 0  # Physical slot of the oldest turn once the ring is full
+
+    def append(self, user, bot, sentiment, scores):
+        """Store one turn; scores is a VADER polarity dict."""
+        label = SENTIMENT_VALUES[sentiment]
+        values = [scores[key] for key in _SCORE_KEYS]
+        if self.maxlen is None or len(self._user) < self.maxlen:
+            self._user.append(user)
+            self._bot.append(bot)
+            self._labels.append(label)
+            self._scores.extend(values)
+            return
+
+        # Full ring: overwrite the oldest turn
+        slot = self._start
+        self._user[slot] = user
+        self._bot[slot] = bot
+        self._labels[slot] = label
+        self._scores[4 * slot:4 * slot + 4] = array('f', values)
+        self._start = (slot + 1) % self.maxlen
+
+    def _entry(self, slot):
+        scores = tuple(round(value, _SCORE_DECIMALS) for value in self._scores[4 * slot:4 * slot + 4])
+        return HistoryEntry(self._user[slot], self._bot[slot], _LABELS[self._labels[slot]], scores)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        length = len(self._user)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("conversation history index out of range")
+        return self._entry((self._start + index) % length)
+
+    def __iter__(self):
+        length = len(self._user)
+        start = self._start
+        for index in range(length):
+            yield self._entry((start + index) % length)
+
+    def __len__(self):
+        return len(self._user)
+
+    def clear(self):
+        self._user.clear()
+        self._bot.clear()
+        self._labels = array('b')
+        self._scores = array('f')
+        self._start = 0
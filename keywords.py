@@ -0,0 +1,372 @@
+# Single-pass keyword/intent matcher used by Chatbot._extract_keywords and the reply dispatch
+import re
+
+
+# Phrase lists for each intent flag (plain substring matches on lowercased text)
+INTENT_PHRASES = {
+    'is_question': ['what', 'who', 'where', 'when', 'why', 'how'],
+    'is_apology': ['sorry', 'apologize', 'apology', 'forgive'],
+    'is_greeting': ['hello', 'hi', 'hey', 'greetings', 'good morning', 'good afternoon', 'good evening', 'morning', 'afternoon', 'evening'],
+    'is_goodbye': ['bye', 'goodbye', 'see you', 'farewell', 'later'],
+    'is_thanks': ['thank', 'thanks', 'appreciate', 'grateful'],
+    'is_birthday': ['birthday', 'my birthday', "it's my birthday", 'today is my birthday', 'turning', 'years old today', 'born today'],
+    'is_special_event': ['anniversary', 'graduation', 'wedding', 'promotion', 'new job', 'got engaged'],
+    'is_reciprocal_question': ['and you', 'what about you', 'how about you', 'you?', 'and yourself'],
+    'is_complaint': ['disappoint', 'disappointing', 'bad', 'terrible', 'awful', 'horrible', 'worst', 'hate', 'sucks', 'useless', 'stupid', 'dumb', 'waste', 'poor', 'pathetic'],
+    'is_criticism': ['your service', 'you are bad', "you're bad", 'you are terrible', "you're terrible", 'you are awful', "you're awful", 'you are horrible', "you're horrible", 'you are worst', "you're worst", 'you suck', 'this bot', 'this chatbot', 'not helpful', 'not working', 'does not work', "doesn't work"],
+    'is_positive_feedback': ['you are good', "you're good", 'you are great', "you're great", 'you are excellent', "you're excellent", 'you are amazing', "you're amazing", 'you are wonderful', "you're wonderful", 'you are awesome', "you're awesome", 'you are very good', "you're very good", 'you are the best', "you're the best", 'you are helpful', "you're helpful", 'you are perfect', "you're perfect"],
+    'is_comparison': ['was better', 'was worse', 'used to be', 'better than', 'worse than', 'not as good', 'not as bad', 'improved', 'got worse', 'declined', 'better before', 'worse before'],
+    'is_experience_feedback': ['experience was', 'last experience', 'previous experience', 'this experience', 'my experience', 'the experience'],
+    'is_offensive': ['fuck you', 'fuck off', 'go to hell', 'screw you', 'shut up', 'shut your', 'kill yourself', 'die'],
+    'needs_time': ['time', 'what time', 'current time', 'clock'],
+    'needs_date': ['what date', 'what\'s the date', 'what is the date', 'what day is it', 'what day is today', 'date today', 'today\'s date', 'current date'],
+    'needs_calc': ['calculate', 'what is', 'equals', '='],
+}
+
+# Whole-word matches (\b...\b), unlike the substring lists above
+PROFANITY_WORDS = ['fuck', 'damn', 'hell', 'shit', 'asshole', 'bitch', 'bastard', 'crap', 'piss', 'dick', 'cock', 'pussy', 'motherfucker', 'fucking', 'fucked']
+
+# "date"/"day is it" only count as a date question alongside one of these words
+DATE_MENTIONS = ['date', 'day is it']
+DATE_QUESTION_WORDS = ['what', 'when', 'which']
+
+# Checked in priority order - the first one present in the text wins
+FEELING_WORDS = ['happy', 'sad', 'angry', 'excited', 'worried', 'anxious',
+                 'stressed', 'tired', 'energetic', 'confused', 'frustrated',
+                 'grateful', 'proud', 'disappointed', 'relieved', 'upset', 'mad',
+                 'depressed', 'down', 'unhappy', 'great', 'wonderful', 'amazing',
+                 'fine', 'okay', 'ok', 'terrible', 'awful', 'horrible']
+
+# Words that should never be treated as names
+NAME_BLACKLIST = frozenset([
+    'feeling', 'doing', 'going', 'here', 'there', 'sorry', 'fine', 'good', 'bad',
+    'happy', 'sad', 'angry', 'excited', 'worried', 'anxious', 'stressed', 'tired',
+    'energetic', 'confused', 'frustrated', 'grateful', 'proud', 'disappointed',
+    'relieved', 'upset', 'mad', 'depressed', 'down', 'unhappy', 'great', 'wonderful',
+    'amazing', 'okay', 'ok', 'terrible', 'awful', 'horrible', 'being',
+    'working', 'studying', 'learning', 'trying', 'thinking', 'wondering'
+])
+
+# Name patterns are "<anchor>(\w+)"; specific anchors are preferred over the loose ones
+SPECIFIC_NAME_ANCHORS = ['my name is ', 'call me ', "name's ", 'i go by ', 'people call me ']
+LOOSE_NAME_ANCHORS = ["i'm ", 'i am ']
+NAME_ANCHORS = SPECIFIC_NAME_ANCHORS + LOOSE_NAME_ANCHORS
+
+CALC_EXPRESSION = r'\d+\s*[+\-*/]\s*\d+'
+
+# Reply intents in priority order: bit i of an intent mask is INTENTS[i], so
+# the lowest set bit is the intent that gets the first chance to answer
+INTENTS = ('follow_up', 'greeting', 'profanity', 'positive_feedback', 'complaint', 'feeling', 'name',
+           'time', 'calc', 'apology', 'birthday', 'special_event', 'goodbye', 'thanks',
+           'reciprocal_question', 'comparison', 'question')
+INTENT_BITS = {intent: 1 << index for index, intent in enumerate(INTENTS)}
+INTENT_MASK = (1 << len(INTENTS)) - 1
+
+# Keyword flags -> the intents they make a candidate
+INTENT_TRIGGERS = {
+    'is_question': ('follow_up', 'question'),
+    'is_greeting': ('greeting',),
+    'is_profanity': ('profanity',),
+    'is_offensive': ('profanity',),
+    'is_positive_feedback': ('positive_feedback',),
+    'is_complaint': ('complaint',),
+    'is_criticism': ('complaint',),
+    'feeling': ('feeling',),
+    'name': ('name',),
+    'needs_time': ('time',),
+    'needs_date': ('time',),
+    'needs_calc': ('calc',),
+    'is_apology': ('apology',),
+    'is_birthday': ('birthday',),
+    'is_special_event': ('special_event',),
+    'is_goodbye': ('goodbye',),
+    'is_thanks': ('thanks',),
+    'is_reciprocal_question': ('reciprocal_question',),
+    'is_comparison': ('comparison',),
+    'is_experience_feedback': ('comparison',),
+}
+
+# Substring checks the reply handlers make, matched in the same scan; each
+# gets a bit above the intents
+SUBCHECK_PHRASES = {
+    'pronoun': ['it', 'that', 'this', 'they'],
+    'them': ['them'],
+    'you': ['you'],
+    'sorry': ['sorry'],
+    'service_word': ['service', 'bot', 'chatbot', 'you', 'this'],
+    'negative_word': ['bad', 'terrible', 'awful', 'horrible', 'worst', 'disappoint', 'suck', 'not helpful', 'not working', 'does not work', "doesn't work"],
+    'status_word': ['good', 'great', 'fine', 'well', 'okay', 'ok', 'alright', 'excellent', 'wonderful', 'amazing', 'doing well', 'doing good'],
+    'better_word': ['better', 'improved', 'good', 'great', 'excellent'],
+    'worse_word': ['worse', 'declined', 'not as good', 'bad', 'terrible'],
+    'what': ['what'],
+    'who': ['who'],
+    'how': ['how'],
+    'why': ['why'],
+    'where': ['where'],
+    'when': ['when'],
+}
+SUBCHECK_BITS = {flag: 1 << (len(INTENTS) + index) for index, flag in enumerate(SUBCHECK_PHRASES)}
+
+# The boolean flags of the keyword dict, in its key order; each gets a bit
+# above the sub-checks, so one scan yields a single int instead of a dict
+KEYWORD_FLAGS = ('is_question', 'is_apology', 'is_greeting', 'is_goodbye', 'is_thanks', 'is_birthday',
+                 'is_special_event', 'is_reciprocal_question', 'is_complaint', 'is_criticism',
+                 'is_positive_feedback', 'is_comparison', 'is_experience_feedback', 'is_profanity',
+                 'is_offensive', 'needs_time', 'needs_date', 'needs_calc')
+_SCAN_FLAGS = KEYWORD_FLAGS + ('date_mention', 'date_question_word')
+FLAG_BITS = {flag: 1 << (len(INTENTS) + len(SUBCHECK_PHRASES) + index) for index, flag in enumerate(_SCAN_FLAGS)}
+
+
+def _intent_bits(*flags):
+    mask = 0
+    for flag in flags:
+        mask |= FLAG_BITS.get(flag, 0)
+        for intent in INTENT_TRIGGERS.get(flag, ()):
+            mask |= INTENT_BITS[intent]
+    return mask
+
+
+# Flag and intent bits of the flags scan() derives after the phrase search
+_QUESTION_BITS = _intent_bits('is_question')
+_FEELING_BITS = _intent_bits('feeling')
+_NAME_BITS = _intent_bits('name')
+_PROFANITY_BITS = _intent_bits('is_profanity')
+_CALC_BITS = _intent_bits('needs_calc')
+_DATE_BITS = _intent_bits('needs_date')
+_DATE_PARTS = FLAG_BITS['date_mention'] | FLAG_BITS['date_question_word']
+
+_WORD_RUN = re.compile(r'\w+')
+
+
+def _is_word_char(char):
+    # Same definition of a word character as re's \b for str patterns
+    return char.isalnum() or char == '_'
+
+
+def _trie_regex(phrases):
+    """Build a regex alternation from a prefix trie so the longest phrase wins."""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def render(node):
+        branches = [re.escape(char) + render(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # Greedy optional: try the longer continuation before stopping here
+            return '(?:' + body + ')?'
+        return body
+
+    return render(trie)
+
+
+class _PhraseInfo:
+    """Everything implied by finding one phrase (and so all its prefixes) at a position."""
+
+    __slots__ = ('mask', 'feeling_rank', 'profanity_lengths', 'name_anchors')
+
+    def __init__(self, mask, feeling_rank, profanity_lengths, name_anchors):
+        self.mask = mask
+        self.feeling_rank = feeling_rank
+        self.profanity_lengths = profanity_lengths
+        self.name_anchors = name_anchors
+
+
+class KeywordMatcher:
+    """Compiled matcher that extracts every keyword flag in one scan of the text.
+
+    All phrases go into a single trie-shaped regex. At each position where
+    some phrase starts, the regex reports the longest one; every shorter
+    phrase starting there is a prefix of it, so its implied flags are
+    precomputed per phrase and a single left-to-right scan finds every
+    (possibly overlapping) substring hit the old any()-cascade found.
+    """
+
+    def __init__(self):
+        tags = {}
+
+        def add(phrase, tag):
+            tags.setdefault(phrase, set()).add(tag)
+
+        for flag, phrases in INTENT_PHRASES.items():
+            for phrase in phrases:
+                add(phrase, flag)
+        for flag, phrases in SUBCHECK_PHRASES.items():
+            for phrase in phrases:
+                add(phrase, ('subcheck', SUBCHECK_BITS[flag]))
+        for phrase in DATE_MENTIONS:
+            add(phrase, 'date_mention')
+        for phrase in DATE_QUESTION_WORDS:
+            add(phrase, 'date_question_word')
+        for rank, word in enumerate(FEELING_WORDS):
+            add(word, ('feeling', rank))
+        for word in PROFANITY_WORDS:
+            add(word, ('profanity', len(word)))
+        for index, anchor in enumerate(NAME_ANCHORS):
+            add(anchor, ('name', index))
+
+        self._phrases = {}
+        for phrase in tags:
+            mask = 0
+            feeling_ranks = []
+            profanity_lengths = []
+            name_anchors = []
+            for end in range(1, len(phrase) + 1):
+                for tag in tags.get(phrase[:end], ()):
+                    if isinstance(tag, str):
+                        mask |= _intent_bits(tag)
+                    elif tag[0] == 'subcheck':
+                        mask |= tag[1]
+                    elif tag[0] == 'feeling':
+                        feeling_ranks.append(tag[1])
+                    elif tag[0] == 'profanity':
+                        profanity_lengths.append(tag[1])
+                    else:
+                        name_anchors.append((tag[1], len(NAME_ANCHORS[tag[1]])))
+            self._phrases[phrase] = _PhraseInfo(
+                mask,
+                min(feeling_ranks) if feeling_ranks else None,
+                tuple(profanity_lengths),
+                tuple(name_anchors),
+            )
+
+        self._pattern = re.compile(_trie_regex(tags) + '|(?P<calc>' + CALC_EXPRESSION + ')')
+
+    def match(self, text):
+        """Return the keyword dict for text (same shape as Chatbot._extract_keywords)."""
+        return keywords_from_scan(*self.scan(text.lower()))
+
+    def match_intents(self, text, text_lower=None):
+        """Return (keyword dict, intent mask) for text."""
+        mask, feeling, name = self.scan(text.lower() if text_lower is None else text_lower)
+        return keywords_from_scan(mask, feeling, name), mask
+
+    def scan(self, text_lower):
+        """Return (mask, feeling, name) for lowercased text, without building a dict.
+
+        The mask has the INTENT_BITS of every intent whose trigger flags are
+        set, the SUBCHECK_BITS of every sub-check phrase in the text and the
+        FLAG_BITS of every keyword flag. Surrounding whitespace in text_lower
+        does not change the result.
+        """
+        length = len(text_lower)
+        phrases = self._phrases
+        search = self._pattern.search
+
+        mask = 0
+        feeling_rank = None
+        is_profanity = False
+        needs_calc_expr = False
+        name_candidates = None
+
+        pos = 0
+        while True:
+            match = search(text_lower, pos)
+            if match is None:
+                break
+            start = match.start()
+            pos = start + 1
+            if match.lastgroup == 'calc':
+                needs_calc_expr = True
+                continue
+
+            info = phrases[match.group()]
+            mask |= info.mask
+            if info.feeling_rank is not None and (feeling_rank is None or info.feeling_rank < feeling_rank):
+                feeling_rank = info.feeling_rank
+            if info.profanity_lengths and not is_profanity:
+                if start == 0 or not _is_word_char(text_lower[start - 1]):
+                    for word_length in info.profanity_lengths:
+                        end = start + word_length
+                        if end == length or not _is_word_char(text_lower[end]):
+                            is_profanity = True
+                            break
+            for anchor_index, anchor_length in info.name_anchors:
+                if name_candidates is None:
+                    name_candidates = {}
+                if anchor_index not in name_candidates:
+                    word = _WORD_RUN.match(text_lower, start + anchor_length)
+                    if word:
+                        name_candidates[anchor_index] = word.group()
+
+        # Flags that do not come from a single phrase
+        if text_lower.strip().endswith('?'):
+            mask |= _QUESTION_BITS
+        if is_profanity:
+            mask |= _PROFANITY_BITS
+        if needs_calc_expr:
+            mask |= _CALC_BITS
+        if mask & _DATE_PARTS == _DATE_PARTS:
+            mask |= _DATE_BITS
+
+        feeling = None
+        name = None
+        if feeling_rank is not None:
+            feeling = FEELING_WORDS[feeling_rank]
+            mask |= _FEELING_BITS
+        elif name_candidates:
+            # Names are only extracted when no feeling was detected
+            name = self._pick_name(name_candidates)
+            if name:
+                mask |= _NAME_BITS
+
+        return mask, feeling, name
+
+    def _pick_name(self, name_candidates):
+        for index in range(len(SPECIFIC_NAME_ANCHORS)):
+            potential_name = name_candidates.get(index)
+            if potential_name and potential_name not in NAME_BLACKLIST and len(potential_name) > 1:
+                return potential_name.capitalize()
+
+        # Be very strict with the loose "i'm"/"i am" patterns
+        for index in range(len(SPECIFIC_NAME_ANCHORS), len(NAME_ANCHORS)):
+            potential_name = name_candidates.get(index)
+            if (potential_name and
+                    potential_name not in NAME_BLACKLIST and
+                    len(potential_name) > 2 and
+                    not any(char.isdigit() for char in potential_name) and
+                    potential_name[0].isalpha()):
+                return potential_name.capitalize()
+
+        return None
+
+
+# Built once at import and shared by every Chatbot
+_matcher = None
+
+
+def get_matcher():
+
+    global _matcher
+    if _matcher is None:
+        _matcher = KeywordMatcher()
+    return _matcher
+
+
+def extract_keywords(text):
+
+    return get_matcher().match(text)
+
+
+def extract_intents(text, text_lower=None):
+
+    return get_matcher().match_intents(text, text_lower)
+
+
+def scan_message(text_lower):
+
+    return get_matcher().scan(text_lower)
+
+
+def keywords_from_scan(mask, feeling, name):
+    """The keyword dict described by a scan() result."""
+    keywords = {'name': name, 'feeling': feeling, 'topic': None}
+    for flag in KEYWORD_FLAGS:
+        keywords[flag] = bool(mask & FLAG_BITS[flag])
+    return keywords
@@ -0,0 +1,354 @@
+# Fast loading of the VADER lexicon through a precompiled snapshot
+import importlib.util
+import json
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from zlib import crc32
+
+
+# Bump when the snapshot layout changes so old files are rebuilt
+SNAPSHOT_VERSION = 2
+
+LEXICON_FILE = "vader_lexicon.txt"
+EMOJI_FILE = "emoji_utf8_lexicon.txt"
+
+# Set to a file path to move the snapshot, or to "off" to disable it
+SNAPSHOT_ENV = "SENTIMENT_LEXICON_SNAPSHOT"
+
+# Set to "on" (or a file path) to read the lexicon from the shared mapped file
+SHARED_ENV = "SENTIMENT_SHARED_LEXICON"
+
+# Shared lexicon file layout (native byte order, host-local):
+#   file header, then one table per mapping (lexicon, emojis), each made of
+#   a table header, an open-addressing slot array (entry index + 1, 0 = empty),
+#   entries of (crc32, key offset, key length, value offset, value length),
+#   float64 values (lexicon table only) and a UTF-8 blob of keys and strings
+SHARED_MAGIC = b"VADERMAP"
+SHARED_VERSION = 1
+_FILE_HEADER = struct.Struct("=8sII")    # magic, version, signature length
+_TABLE_HEADER = struct.Struct("=4sIII")  # kind, entry count, slot count, blob length
+_ENTRY_FIELDS = 5
+
+# Per-process memo of recent SharedTable lookups; kept small so the mapped
+# file, not private dicts, holds the lexicon
+SHARED_MEMO_ENTRIES = 2048
+
+
+def vader_data_dir():
+    """Directory holding the vaderSentiment lexicon files (found without importing it)."""
+    spec = importlib.util.find_spec("vaderSentiment")
+    if spec is None or not spec.submodule_search_locations:
+        raise ImportError("vaderSentiment is not installed (pip install -r requirements.txt)")
+    return list(spec.submodule_search_locations)[0]
+
+
+def _cache_file(name):
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "sentiment-chatbot", name)
+
+
+def default_snapshot_path():
+    override = os.environ.get(SNAPSHOT_ENV)
+    if override:
+        return None if override.lower() == "off" else override
+    return _cache_file("vader_lexicon.json")
+
+
+def default_shared_path():
+    """Path of the shared lexicon file, or None when the shared lexicon is off."""
+    setting = os.environ.get(SHARED_ENV, "")
+    if setting.lower() in ("", "0", "off", "false", "no"):
+        return None
+    if setting.lower() not in ("1", "on", "true", "yes"):
+        return setting
+    return _cache_file("vader_lexicon.map")
+
+
+def source_signature(data_dir):
+    """Identify the current lexicon sources; any change invalidates the snapshot."""
+    signature = [SNAPSHOT_VERSION, os.path.abspath(data_dir)]
+    for name in (LEXICON_FILE, EMOJI_FILE):
+        stat = os.stat(os.path.join(data_dir, name))
+        signature.extend([name, stat.st_size, stat.st_mtime_ns])
+    return tuple(signature)
+
+
+def parse_sources(data_dir):
+    """Parse the lexicon text files the same way SentimentIntensityAnalyzer does."""
+    lexicon = {}
+    with open(os.path.join(data_dir, LEXICON_FILE), encoding='utf-8') as f:
+        for line in f.read().rstrip('\n').split('\n'):
+            if not line:
+                continue
+            (word, measure) = line.strip().split('\t')[0:2]
+            lexicon[word] = float(measure)
+
+    emojis = {}
+    with open(os.path.join(data_dir, EMOJI_FILE), encoding='utf-8') as f:
+        for line in f.read().rstrip('\n').split('\n'):
+            (emoji, description) = line.strip().split('\t')[0:2]
+            emojis[emoji] = description
+
+    return lexicon, emojis
+
+
+def load_lexicons(snapshot_path=None, data_dir=None):
+    """Return (lexicon, emojis), from the snapshot when it matches the sources.
+
+    The snapshot is plain JSON, so reading a file planted at the snapshot
+    path can give wrong scores but never runs code. A missing or stale
+    snapshot is rebuilt from the text files. Failing to write it (e.g. a
+    read-only home directory) only costs the speedup.
+    """
+    if data_dir is None:
+        data_dir = vader_data_dir()
+    signature = source_signature(data_dir)
+
+    if snapshot_path:
+        try:
+            with open(snapshot_path, encoding='utf-8') as f:
+                stored_signature, lexicon, emojis = json.load(f)
+            if stored_signature == list(signature) and isinstance(lexicon, dict) and isinstance(emojis, dict):
+                return lexicon, emojis
+        except (OSError, ValueError, TypeError):
+            pass
+
+    lexicon, emojis = parse_sources(data_dir)
+
+    if snapshot_path:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), exist_ok=True)
+            temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump([signature, lexicon, emojis], f, ensure_ascii=False)
+            os.replace(temp_path, snapshot_path)
+        except OSError:
+            pass
+
+    return lexicon, emojis
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _pack_table(mapping, kind):
+    """Serialize a str -> float ("d") or str -> str ("s") mapping as a hash table."""
+    nslots = 8
+    while nslots < 2 * len(mapping):
+        nslots *= 2
+    mask = nslots - 1
+
+    slots = array('I', bytes(4 * nslots))
+    entries = array('I')
+    values = array('d')
+    blob = bytearray()
+    for index, (key, value) in enumerate(mapping.items()):
+        data = key.encode('utf-8', 'surrogatepass')
+        key_hash = crc32(data)
+        slot = key_hash & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = index + 1
+
+        key_offset = len(blob)
+        blob += data
+        if kind == "d":
+            values.append(value)
+            value_offset, value_length = index, 0
+        else:
+            value_offset = len(blob)
+            blob += value.encode('utf-8', 'surrogatepass')
+            value_length = len(blob) - value_offset
+        entries.extend((key_hash, key_offset, len(data), value_offset, value_length))
+
+    table = bytearray(_TABLE_HEADER.pack(kind.encode('ascii'), len(mapping), nslots, len(blob)))
+    for section in (slots.tobytes(), entries.tobytes(), values.tobytes(), blob):
+        table += bytes(_align(len(table)) - len(table))
+        table += section
+    table += bytes(_align(len(table)) - len(table))
+    return bytes(table)
+
+
+def _shared_header(signature):
+    # sys.byteorder is part of the signature: the tables use native byte order
+    encoded = json.dumps([SHARED_VERSION, sys.byteorder] + list(signature)).encode('utf-8')
+    header = _FILE_HEADER.pack(SHARED_MAGIC, SHARED_VERSION, len(encoded)) + encoded
+    return header + bytes(_align(len(header)) - len(header))
+
+
+def write_shared_lexicon(path, lexicon, emojis, signature):
+    """Atomically write the shared lexicon file for (lexicon, emojis)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(_shared_header(signature))
+        f.write(_pack_table(lexicon, "d"))
+        f.write(_pack_table(emojis, "s"))
+    os.replace(temp_path, path)
+
+
+class SharedTable(Mapping):
+    """Read-only mapping backed by one table of a memory-mapped lexicon file.
+
+    Keys and values stay in the mapped pages, so every process that maps the
+    same file shares one physical copy instead of building its own dicts.
+    """
+
+    def __init__(self, view, offset):
+        kind, count, nslots, blob_length = _TABLE_HEADER.unpack_from(view, offset)
+        self._kind = kind.rstrip(b"\0").decode('ascii')
+        self._count = count
+        self._mask = nslots - 1
+
+        offset = _align(offset + _TABLE_HEADER.size)
+        self._slots = view[offset:offset + 4 * nslots].cast('I')
+        offset = _align(offset + 4 * nslots)
+        self._entries = view[offset:offset + 4 * _ENTRY_FIELDS * count].cast('I')
+        offset = _align(offset + 4 * _ENTRY_FIELDS * count)
+        value_bytes = 8 * count if self._kind == "d" else 0
+        self._values = view[offset:offset + value_bytes].cast('d')
+        offset = _align(offset + value_bytes)
+        self._blob = view[offset:offset + blob_length]
+        self.end = _align(offset + blob_length)
+
+        # Small private memo of recent lookups (hits and misses). VADER tests
+        # every character of a message against the emoji table, so single
+        # ASCII characters are always kept
+        self._ascii = {chr(code): self._probe(chr(code)) for code in range(128)}
+        self._memo = dict(self._ascii)
+
+    def _probe(self, key):
+        data = key.encode('utf-8', 'surrogatepass')
+        key_hash = crc32(data)
+        mask, slots, entries = self._mask, self._slots, self._entries
+        slot = key_hash & mask
+        while True:
+            index = slots[slot] - 1
+            if index < 0:
+                return -1
+            base = index * _ENTRY_FIELDS
+            if entries[base] == key_hash and entries[base + 2] == len(data):
+                start = entries[base + 1]
+                if self._blob[start:start + len(data)] == data:
+                    return index
+            slot = (slot + 1) & mask
+
+    def _find(self, key):
+        index = self._memo.get(key)
+        if index is None:
+            if not isinstance(key, str):
+                return -1
+            index = self._probe(key)
+            if len(self._memo) >= SHARED_MEMO_ENTRIES:
+                self._memo = dict(self._ascii)
+            self._memo[key] = index
+        return index
+
+    def _value(self, index):
+        if self._kind == "d":
+            return self._values[index]
+        base = index * _ENTRY_FIELDS
+        start, length = self._entries[base + 3], self._entries[base + 4]
+        return str(self._blob[start:start + length], 'utf-8', 'surrogatepass')
+
+    def __getitem__(self, key):
+        index = self._find(key)
+        if index < 0:
+            raise KeyError(key)
+        return self._value(index)
+
+    def __contains__(self, key):
+        index = self._memo.get(key)
+        if index is None:
+            index = self._find(key)
+        return index >= 0
+
+    def get(self, key, default=None):
+        index = self._find(key)
+        return default if index < 0 else self._value(index)
+
+    def __iter__(self):
+        entries, blob = self._entries, self._blob
+        for index in range(self._count):
+            base = index * _ENTRY_FIELDS
+            start = entries[base + 1]
+            yield str(blob[start:start + entries[base + 2]], 'utf-8', 'surrogatepass')
+
+    def __len__(self):
+        return self._count
+
+
+def open_shared_lexicon(path, signature):
+    """Map the shared lexicon file; None if it is missing or was built from other sources."""
+    import mmap
+
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(mapped)
+    expected = _shared_header(signature)
+    if view[:len(expected)] != expected:
+        view.release()
+        mapped.close()
+        return None
+
+    lexicon = SharedTable(view, len(expected))
+    emojis = SharedTable(view, lexicon.end)
+    return lexicon, emojis
+
+
+def load_shared_lexicons(shared_path, snapshot_path=None, data_dir=None):
+    """Return (lexicon, emojis) as SharedTable mappings over shared_path.
+
+    The file is (re)built when missing or stale. If it cannot be written,
+    plain dicts are returned instead.
+    """
+    if data_dir is None:
+        data_dir = vader_data_dir()
+    signature = source_signature(data_dir)
+
+    tables = open_shared_lexicon(shared_path, signature)
+    if tables is not None:
+        return tables
+
+    lexicon, emojis = load_lexicons(snapshot_path, data_dir)
+    try:
+        write_shared_lexicon(shared_path, lexicon, emojis, signature)
+    except OSError:
+        return lexicon, emojis
+    return open_shared_lexicon(shared_path, signature) or (lexicon, emojis)
+
+
+def load_vader(snapshot=True, shared=None):
+    """Build a SentimentIntensityAnalyzer, using the lexicon snapshot when enabled.
+
+    shared=True reads the lexicon from the memory-mapped file shared by all
+    processes on the host (shared=None follows SENTIMENT_SHARED_LEXICON).
+    """
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    snapshot_path = default_snapshot_path() if snapshot else None
+    shared_path = default_shared_path() if shared is not False else None
+    if shared and shared_path is None:
+        shared_path = _cache_file("vader_lexicon.map")
+
+    if shared_path is not None:
+        lexicon, emojis = load_shared_lexicons(shared_path, snapshot_path)
+    elif snapshot_path is not None:
+        lexicon, emojis = load_lexicons(snapshot_path)
+    else:
+        return SentimentIntensityAnalyzer()
+
+    # Skip __init__ (which re-reads and parses both text files); polarity_scores
+    # only needs these two dicts
+    analyzer = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+    analyzer.lexicon = lexicon
+    analyzer.emojis = emojis
+    return analyzer
@@ -0,0 +1,118 @@
+# Bounded store of remembered facts (likes, characteristics, topics)
+from collections import OrderedDict
+from collections.abc import Sequence
+
+
+class MemoryStore(Sequence):
+    """Distinct facts with how often and how recently each was mentioned.
+
+    add() is O(1): facts live in a dict, and each is also filed in a bucket
+    of the facts mentioned equally often, least recent first. With capacity
+    set, adding a new fact to a full store evicts the least valuable one:
+    the least often mentioned, and of those the least recently mentioned.
+
+    The store reads like the list it replaces: iteration, indexing and ==
+    against a list follow the order in which the stored facts were first
+    mentioned, and `in` is a dict lookup.
+    """
+
+    def __init__(self, capacity=None):
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._facts = {}     # fact -> [mentions, tick of the last mention], in order of first mention
+        self._buckets = {}   # mentions -> OrderedDict of the facts mentioned that often, least recent first
+        self._min_mentions = 0
+        self._tick = 0
+        self.evicted = 0
+
+    def add(self, fact):
+        """Record one mention of fact; returns True when it was not stored before."""
+        self._tick += 1
+        entry = self._facts.get(fact)
+        if entry is not None:
+            mentions = entry[0]
+            bucket = self._buckets[mentions]
+            del bucket[fact]
+            if not bucket:
+                del self._buckets[mentions]
+                if self._min_mentions == mentions:
+                    self._min_mentions = mentions + 1
+            entry[0] = mentions + 1
+            entry[1] = self._tick
+            self._bucket(mentions + 1)[fact] = None
+            return False
+
+        if self.capacity is not None and len(self._facts) >= self.capacity:
+            self._evict()
+        self._facts[fact] = [1, self._tick]
+        self._bucket(1)[fact] = None
+        self._min_mentions = 1
+        return True
+
+    def _bucket(self, mentions):
+        bucket = self._buckets.get(mentions)
+        if bucket is None:
+            bucket = self._buckets[mentions] = OrderedDict()
+        return bucket
+
+    def _evict(self):
+        bucket = self._buckets[self._min_mentions]
+        fact, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self._buckets[self._min_mentions]
+        del self._facts[fact]
+        self.evicted += 1
+
+    def mentions(self, fact):
+        """How often fact was mentioned while stored (0 when it is not stored)."""
+        entry = self._facts.get(fact)
+        return entry[0] if entry is not None else 0
+
+    def last_mentioned(self, fact):
+        """Tick (1 for the first add of the store) of fact's latest mention, or None."""
+        entry = self._facts.get(fact)
+        return entry[1] if entry is not None else None
+
+    def most_common(self, k=None):
+        """The k most mentioned facts as (fact, mentions), most recent first on ties.
+
+        Walks the mention buckets from the top, so the cost depends on k and
+        the number of distinct mention counts, not on the number of facts.
+        """
+        if k is None:
+            k = len(self._facts)
+        top = []
+        for mentions in sorted(self._buckets, reverse=True):
+            for fact in reversed(self._buckets[mentions]):
+                if len(top) >= k:
+                    return top
+                top.append((fact, mentions))
+        return top
+
+    def clear(self):
+        self._facts.clear()
+        self._buckets.clear()
+        self._min_mentions = 0
+
+    def __contains__(self, fact):
+        return fact in self._facts
+
+    def __iter__(self):
+        return iter(self._facts)
+
+    def __len__(self):
+        return len(self._facts)
+
+    def __getitem__(self, index):
+        return list(self._facts)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (MemoryStore, list)):
+            return list(self._facts) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"MemoryStore({list(self._facts)!r}, capacity={self.capacity!r})"
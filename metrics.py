@@ -0,0 +1,252 @@
+# Optional per-stage latency metrics for the response pipeline
+import cProfile
+import functools
+import io
+import pstats
+import threading
+import time
+from bisect import bisect_left
+
+
+# Histogram bucket upper bounds in seconds (10 µs to 1 s)
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+# Chatbot methods timed by instrument_chatbot, by stage name
+CHATBOT_STAGES = {
+    "turn": "process_turn",
+    "sentiment": "_score_message",
+    "response": "generate_response",
+    "keywords": "_match_intents",
+    "store_info": "_extract_and_store_info",
+    "time": "_handle_time_question",
+    "calculation": "_handle_calculation",
+}
+
+# SentimentAnalyzer methods timed by instrument_analyzer (cache lookup included)
+ANALYZER_STAGES = {
+    "polarity_scores": "_polarity_scores",
+}
+
+# Label name and Prometheus help text of the counters the pipeline records
+COUNTERS = {
+    "responses": ("intent", "Replies by the intent branch that answered."),
+}
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (counts per bucket, sum and count)."""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # The last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (None when empty)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        cumulative = []
+        seen = 0
+        for count in self.counts:
+            seen += count
+            cumulative.append(seen)
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {_format_bound(bound): count for bound, count in zip([*self.bounds, float("inf")], cumulative)},
+        }
+
+
+class Metrics:
+    """Stage latency histograms and labelled counters for one or more chatbots.
+
+    Nothing is measured until an object is instrumented: instrument_chatbot()
+    and instrument_analyzer() replace the timed methods of that instance with
+    timing wrappers, so uninstrumented chatbots run exactly the code they
+    always did. Each thread records into its own shard, so one Metrics can be
+    shared by the server's worker threads without a lock per observation;
+    snapshot() merges the shards.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, clock=time.perf_counter):
+        self.buckets = tuple(buckets)
+        self.clock = clock
+        self._local = threading.local()
+        self._shards = []  # (stage -> Histogram, counter name -> {label value -> count}) per thread
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = ({}, {})
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def observe(self, stage, seconds):
+        stages = self._shard()[0]
+        histogram = stages.get(stage)
+        if histogram is None:
+            histogram = stages[stage] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def increment(self, name, label, amount=1):
+        counts = self._shard()[1].setdefault(name, {})
+        counts[label] = counts.get(label, 0) + amount
+
+    def timed(self, stage, func):
+        """Wrap func so each call is observed under stage."""
+        clock = self.clock
+        local = self._local
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                try:
+                    histogram = local.shard[0][stage]
+                except (AttributeError, KeyError):
+                    self.observe(stage, elapsed)
+                else:
+                    histogram.observe(elapsed)
+
+        wrapper.__wrapped_stage__ = stage
+        return wrapper
+
+    def _instrument(self, obj, stages):
+        for stage, name in stages.items():
+            method = getattr(obj, name)
+            if getattr(method, "__wrapped_stage__", None) is None:
+                setattr(obj, name, self.timed(stage, method))
+
+    def instrument_chatbot(self, chatbot):
+        """Time the stages of chatbot's pipeline and count replies by intent branch."""
+        if "generate_response" in vars(chatbot):
+            return chatbot  # Already instrumented
+        self._instrument(chatbot, CHATBOT_STAGES)
+        respond = chatbot.generate_response
+
+        @functools.wraps(respond)
+        def generate_response(user_input):
+            response = respond(user_input)
+            self.increment("responses", chatbot.last_intent)
+            return response
+
+        chatbot.generate_response = generate_response
+        return chatbot
+
+    def instrument_analyzer(self, analyzer):
+        """Time analyzer's scoring (VADER plus the score cache); instrumenting twice is a no-op."""
+        self._instrument(analyzer, ANALYZER_STAGES)
+        return analyzer
+
+    def reset(self):
+        with self._lock:
+            for stages, counters in self._shards:
+                stages.clear()
+                counters.clear()
+
+    def snapshot(self):
+        """Current histograms and counters as plain dicts (times in seconds)."""
+        stages, counters = {}, {}
+        with self._lock:
+            for shard_stages, shard_counters in self._shards:
+                for stage, histogram in list(shard_stages.items()):
+                    stages.setdefault(stage, Histogram(self.buckets)).merge(histogram)
+                for name, counts in list(shard_counters.items()):
+                    merged = counters.setdefault(name, {})
+                    for label, count in list(counts.items()):
+                        merged[label] = merged.get(label, 0) + count
+        return {
+            "stages": {stage: histogram.snapshot() for stage, histogram in stages.items()},
+            "counters": counters,
+        }
+
+    def prometheus(self, prefix="chatbot"):
+        """Render the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        if snapshot["stages"]:
+            name = f"{prefix}_stage_seconds"
+            lines.append(f"# HELP {name} Time spent in each stage of the response pipeline.")
+            lines.append(f"# TYPE {name} histogram")
+            for stage, histogram in sorted(snapshot["stages"].items()):
+                for bound, count in histogram["buckets"].items():
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram["sum"]!r}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram["count"]}')
+        for counter, counts in sorted(snapshot["counters"].items()):
+            label_name, help_text = COUNTERS.get(counter, ("label", counter))
+            name = f"{prefix}_{counter}_total"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for label, count in sorted(counts.items(), key=lambda item: str(item[0])):
+                lines.append(f'{name}{{{label_name}="{_escape_label(label)}"}} {count}')
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def profile_session(messages, chatbot=None, sort="cumulative", limit=30, stats_path=None):
+    """Run messages through chatbot.process_turn under cProfile.
+
+    Returns the printed statistics (top `limit` functions by `sort`);
+    stats_path also saves the raw profile for pstats/snakeviz.
+    """
+    if chatbot is None:
+        from chatbot import Chatbot
+        chatbot = Chatbot()
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        for message in messages:
+            chatbot.process_turn(message)
+    finally:
+        profiler.disable()
+
+    if stats_path:
+        profiler.dump_stats(stats_path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
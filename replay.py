@@ -0,0 +1,357 @@
+# Transcript replay and synthetic load generation (python chatbot.py replay ...)
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from chatbot import Chatbot
+from sentiment import score_message
+from transcripts import FORMATS, detect_format, read_records
+from utils import clean_input
+
+
+MODES = ("thread", "process")
+
+_WORKER_NAMES = {"thread": ("thread", "threads"), "process": ("process", "processes")}
+
+# Relative weight of each kind of synthetic message
+DEFAULT_MIX = {"greeting": 1, "calc": 2, "question": 3, "rant": 1, "statement": 3, "time": 1}
+
+DEFAULT_SESSIONS = 100
+DEFAULT_TURNS = 50
+
+# Rounds (one turn of every live session) between memory samples
+DEFAULT_SAMPLE_EVERY = 10
+
+_GREETINGS = ["hi", "hello", "hey there", "good morning", "hello again", "hi, how are you?"]
+_QUESTIONS = [
+    "How do computers learn languages?", "What is the capital of France?", "Why is the sky blue?",
+    "Who are you?", "Where do you live?", "How does sentiment analysis work?", "Can you recommend a good book?",
+    "What should I cook for dinner tonight?", "Is it going to rain tomorrow?", "How are you?",
+]
+_STATEMENTS = [
+    "I like long walks by the sea", "I am a teacher at the local school", "My dog is sleeping on the sofa",
+    "The weather is lovely today", "I'm feeling a bit stressed about work", "My name is Sam",
+    "I love pizza and movies", "We went hiking last weekend", "I'm so happy with my new job", "thanks a lot",
+]
+_TIME = ["What time is it?", "What's the date today?", "what day is it", "What year is it?"]
+_RANT = [
+    "This is the worst service I have ever used.", "Nothing works the way it should.",
+    "I waited for hours and nobody helped me.", "I am really frustrated and angry right now.",
+    "Every single update makes things worse.", "The app crashed again and I lost all my work.",
+    "I have asked three times and still no answer.", "Honestly this is terrible and I hate it.",
+    "Why is it so hard to get a simple thing right?", "I'm disappointed, upset and tired of this.",
+]
+_OPERATORS = ["plus", "minus", "times", "divided by", "+", "-", "*", "/"]
+
+
+def parse_mix(spec):
+    """Parse "greeting=1,calc=2,..." into a dict of weights (kinds as in DEFAULT_MIX)."""
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in DEFAULT_MIX:
+            raise ValueError(f"Unknown message kind: {kind!r} (expected one of {tuple(DEFAULT_MIX)})")
+        try:
+            mix[kind] = float(weight)
+        except ValueError:
+            raise ValueError(f"Bad weight for {kind!r}: {weight!r}") from None
+        if mix[kind] < 0:
+            raise ValueError(f"Negative weight for {kind!r}")
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one positive weight")
+    return mix
+
+
+def synthetic_message(kind, rng):
+    """One synthetic message of the given kind."""
+    if kind == "greeting":
+        return rng.choice(_GREETINGS)
+    if kind == "calc":
+        return f"What is {rng.randint(1, 999)} {rng.choice(_OPERATORS)} {rng.randint(1, 99)}?"
+    if kind == "question":
+        return rng.choice(_QUESTIONS)
+    if kind == "statement":
+        return rng.choice(_STATEMENTS)
+    if kind == "time":
+        return rng.choice(_TIME)
+    if kind == "rant":
+        return " ".join(rng.choice(_RANT) for _ in range(rng.randint(8, 30)))
+    raise ValueError(f"Unknown message kind: {kind!r}")
+
+
+def synthetic_sessions(sessions=DEFAULT_SESSIONS, turns=DEFAULT_TURNS, mix=None, seed=0):
+    """Messages of `sessions` synthetic sessions of `turns` messages each.
+
+    The same seed gives the same sessions in every process; each session
+    draws from its own generator, so session i does not depend on how
+    many sessions are generated.
+    """
+    mix = DEFAULT_MIX if mix is None else mix
+    kinds = [kind for kind, weight in mix.items() if weight > 0]
+    weights = [mix[kind] for kind in kinds]
+    generated = []
+    for index in range(sessions):
+        rng = random.Random(f"{seed}:{index}")
+        generated.append([synthetic_message(kind, rng) for kind in rng.choices(kinds, weights, k=turns)])
+    return generated
+
+
+def transcript_sessions(path, fmt=None, text_field="message", conversation_field="conversation_id"):
+    """Messages of each conversation of a JSONL or CSV transcript, in file order.
+
+    Messages are cleaned like console input; empty and unreadable records
+    are skipped.
+    """
+    fmt = detect_format(path, fmt)
+    conversations = {}
+    for _, conversation, message in read_records(path, fmt, text_field, conversation_field):
+        message = clean_input(message) if message else ""
+        if message:
+            conversations.setdefault(conversation, []).append(message)
+    return list(conversations.values())
+
+
+try:
+    _PAGE_KIB = os.sysconf('SC_PAGE_SIZE') // 1024
+except (AttributeError, ValueError, OSError):
+    _PAGE_KIB = 4
+
+
+def _rss_kib():
+    """Resident set size of this process in KiB (None where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_KIB
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _run_sessions(sessions, chatbot_options, sample_every=DEFAULT_SAMPLE_EVERY, sample_memory=True):
+    """Drive sessions round-robin (one turn of each live session per round).
+
+    Every session keeps its own Chatbot for the whole run, so all of them
+    are live at once, as on a server. Returns the turn latencies and the
+    RSS after every sample_every rounds.
+    """
+    score_message("warm up")  # Load VADER before the clock starts
+    rss_start = _rss_kib() if sample_memory else None
+    clock = time.perf_counter
+    latencies = array('d')
+    intents = {}
+    rss = []
+    started = time.time()
+    chatbots = [Chatbot(**chatbot_options) for _ in sessions]
+    rounds = max(map(len, sessions), default=0)
+    for round_index in range(rounds):
+        for chatbot, messages in zip(chatbots, sessions):
+            if round_index < len(messages):
+                start = clock()
+                chatbot.process_turn(messages[round_index])
+                latencies.append(clock() - start)
+                intents[chatbot.last_intent] = intents.get(chatbot.last_intent, 0) + 1
+        if rss_start is not None and ((round_index + 1) % sample_every == 0 or round_index + 1 == rounds):
+            rss.append((round_index + 1, _rss_kib()))
+    finished = time.time()
+    return {
+        "started": started,
+        "finished": finished,
+        "latencies": latencies.tobytes(),
+        "intents": intents,
+        "rss_start": rss_start,
+        "rss": rss,
+    }
+
+
+def session_memory(messages, chatbot_options, sample_every=DEFAULT_SAMPLE_EVERY):
+    """Bytes held by one Chatbot after every sample_every turns of a session (tracemalloc).
+
+    The session is played once untraced first, so the shared score cache
+    and lazily built module state are warm, and the reply cache is off:
+    only the session's own state is counted. Deterministic for a given
+    session, unlike RSS.
+    """
+    options = dict(chatbot_options, response_cache=False)
+    warm = Chatbot(**options)
+    for message in messages:
+        warm.process_turn(message)
+    del warm
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        chatbot = Chatbot(**options)
+        samples = []
+        for turn, message in enumerate(messages, 1):
+            chatbot.process_turn(message)
+            if turn % sample_every == 0 or turn == len(messages):
+                samples.append((turn, tracemalloc.get_traced_memory()[0] - baseline))
+    finally:
+        tracemalloc.stop()
+    return samples
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def replay(sessions, workers=1, mode="thread", chatbot_options=None, sample_every=DEFAULT_SAMPLE_EVERY):
+    """Run every session through Chatbot.process_turn on `workers` threads or processes.
+
+    Session i goes to worker i % workers; each worker keeps all of its
+    sessions live and gives them one turn per round. Returns a dict with
+    turns, sessions, seconds, turns_per_second, latency percentiles (in
+    seconds), the replies per intent, and memory samples: the RSS growth
+    after every sample_every rounds (summed over the worker processes; the
+    whole process in thread mode) and that growth per session.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode!r} (expected one of {MODES})")
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    chatbot_options = dict(chatbot_options or {})
+    shares = [sessions[worker::workers] for worker in range(workers)]
+    if mode == "thread":
+        score_message("warm up")
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="replay")
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    with executor:
+        # RSS is per process: in thread mode only the first worker samples it
+        futures = [
+            executor.submit(_run_sessions, share, chatbot_options, sample_every, mode == "process" or worker == 0)
+            for worker, share in enumerate(shares)
+        ]
+        results = [future.result() for future in futures]
+
+    latencies = array('d')
+    intents = {}
+    for result in results:
+        latencies.frombytes(result["latencies"])
+        for intent, count in result["intents"].items():
+            intents[intent] = intents.get(intent, 0) + count
+    ordered = sorted(latencies)
+    seconds = max(result["finished"] for result in results) - min(result["started"] for result in results)
+    report = {
+        "mode": mode,
+        "workers": workers,
+        "sessions": len(sessions),
+        "turns": len(ordered),
+        "seconds": seconds,
+        "turns_per_second": len(ordered) / seconds if seconds > 0 else None,
+        "latency": {
+            name: percentile(ordered, p) if ordered else None
+            for name, p in (("p50", 50), ("p90", 90), ("p99", 99), ("p999", 99.9), ("max", 100))
+        },
+        "intents": dict(sorted(intents.items(), key=lambda item: -item[1])),
+        "memory": _memory_growth(results, len(sessions)),
+    }
+    if ordered:
+        report["latency"]["mean"] = sum(ordered) / len(ordered)
+    return report
+
+
+def _memory_growth(results, sessions):
+    sampled = [result for result in results if result["rss_start"] is not None and result["rss"]]
+    if not sampled:
+        return []
+    rounds = sorted({round_index for result in sampled for round_index, _ in result["rss"]})
+    growth = []
+    for round_index in rounds:
+        total = 0
+        for result in sampled:
+            # A worker whose sessions already ended keeps its last sample
+            values = [kib for sample_round, kib in result["rss"] if sample_round <= round_index]
+            total += (values[-1] if values else result["rss_start"]) - result["rss_start"]
+        growth.append({"round": round_index, "rss_kib": total, "kib_per_session": total / sessions if sessions else 0})
+    return growth
+
+
+def format_report(report, session_bytes=None):
+    """Human-readable summary of a replay() result (and a session_memory() curve)."""
+    lines = [
+        f"Replayed {report['turns']} turns of {report['sessions']} sessions on {report['workers']} "
+        f"{_WORKER_NAMES[report['mode']][report['workers'] != 1]} in {report['seconds']:.2f}s",
+    ]
+    if report["turns_per_second"] is not None:
+        lines.append(f"Throughput: {report['turns_per_second']:.0f} turns/s")
+    latency = report["latency"]
+    if latency.get("mean") is not None:
+        lines.append("Latency (us): " + "  ".join(
+            f"{name} {latency[name] * 1e6:.0f}" for name in ("mean", "p50", "p90", "p99", "p999", "max")
+        ))
+    lines.append("Replies by intent: " + ", ".join(f"{intent} {count}" for intent, count in report["intents"].items()))
+    if report["memory"]:
+        lines.append("RSS growth by round:")
+        for sample in _spread(report["memory"]):
+            lines.append(f"  round {sample['round']:>6}  +{sample['rss_kib'] / 1024:8.1f} MiB  "
+                         f"{sample['kib_per_session']:8.1f} KiB/session")
+    if session_bytes:
+        lines.append("Memory held by one session (tracemalloc):")
+        for turn, size in _spread(session_bytes):
+            lines.append(f"  turn {turn:>7}  {size / 1024:8.1f} KiB")
+    return "\n".join(lines)
+
+
+def _spread(samples, count=8):
+    """At most count samples, evenly spaced and always including the last one."""
+    if len(samples) <= count:
+        return samples
+    step = (len(samples) - 1) / (count - 1)
+    return [samples[round(i * step)] for i in range(count)]
+
+
+def main(argv=None):
+    """Entry point for `python chatbot.py replay`."""
+    parser = argparse.ArgumentParser(
+        prog="chatbot.py replay",
+        description="Drive many concurrent chatbot sessions from a transcript or a seeded synthetic mix "
+                    "and report throughput, latency percentiles and memory growth."
+    )
+    parser.add_argument("transcript", nargs="?", help="transcript to replay (.jsonl/.ndjson or .csv); synthetic traffic without it")
+    parser.add_argument("--format", choices=FORMATS, help="transcript format (default: from the extension)")
+    parser.add_argument("--text-field", default="message", help="field holding the message text (default: message)")
+    parser.add_argument("--conversation-field", default="conversation_id", help="field holding the conversation id (default: conversation_id)")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help=f"synthetic sessions (default: {DEFAULT_SESSIONS})")
+    parser.add_argument("--turns", type=int, default=DEFAULT_TURNS, help=f"turns per synthetic session (default: {DEFAULT_TURNS})")
+    parser.add_argument("--mix", default=None,
+                        help="synthetic message mix, e.g. greeting=1,calc=2,question=3,rant=1,statement=3,time=1")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic traffic (default: 0)")
+    parser.add_argument("--workers", type=int, default=1, help="threads or processes driving the sessions (default: 1)")
+    parser.add_argument("--mode", choices=MODES, default="thread", help="run the workers as threads or processes (default: thread)")
+    parser.add_argument("--history-limit", type=int, default=None, help="turns kept per session (default: all)")
+    parser.add_argument("--memory-limit", type=int, default=None, help="likes/characteristics/topics kept per session")
+    parser.add_argument("--no-response-cache", action="store_true", help="answer every message without the reply cache")
+    parser.add_argument("--sample-every", type=int, default=DEFAULT_SAMPLE_EVERY, help="rounds between memory samples")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON to PATH")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.transcript:
+            sessions = transcript_sessions(args.transcript, args.format, args.text_field, args.conversation_field)
+        else:
+            mix = parse_mix(args.mix) if args.mix else None
+            sessions = synthetic_sessions(args.sessions, args.turns, mix, args.seed)
+        chatbot_options = {"history_limit": args.history_limit, "memory_limit": args.memory_limit,
+                           "response_cache": not args.no_response_cache}
+        report = replay(sessions, args.workers, args.mode, chatbot_options, args.sample_every)
+        session_bytes = session_memory(sessions[0], chatbot_options, args.sample_every) if sessions else []
+    except KeyboardInterrupt:
+        sys.stderr.write("\nInterrupted.\n")
+        return 130
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"Error: {e}\n")
+        return 1
+
+    print(format_report(report, session_bytes))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(dict(report, session_bytes=session_bytes), f, indent=2)
+    return 0
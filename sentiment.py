@@ -1,30 +1,220 @@
 
 # VADER (Valence Aware Dictionary and sEntiment Reasoner) for sentiment analysis
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import math
+import os
+import sys
+import threading
+from array import array
+from collections import OrderedDict, deque
+
+# vaderSentiment itself is imported lazily (see lexicon.load_vader) so that
+# importing this module, and sessions that never score, stay fast
+from lexicon import load_vader
+
+
+NEUTRAL_SCORES = {'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0}
+
+# Below this many messages a process pool costs more than it saves
+MIN_PARALLEL_BATCH = 2000
+
+# Scoring engines for analyze_batch: stock VADER, or the NumPy re-implementation
+ENGINES = ("vader", "numpy")
+
+# Messages per vectorized call; bounds the size of the token arrays
+VECTORIZED_BATCH = 5000
+
+
+# Numeric value of each label for trend math
+SENTIMENT_VALUES = {"Positive": 1, "Negative": -1, "Neutral": 0}
+
+
+def label_from_compound(compound_score):
+    """Convert a VADER compound score to a sentiment label."""
+    if compound_score >= 0.05:
+        return "Positive"
+    elif compound_score <= -0.05:
+        return "Negative"
+    else:
+        return "Neutral"
+
+
+# VADER's normalization constant: compound = valence / sqrt(valence^2 + alpha)
+VADER_ALPHA = 15
+
+# Largest |compound| that VADER's 4-decimal rounding can still tell apart from 1.0
+_MAX_COMPOUND = 0.99995
+
+
+def compound_to_valence(compound_score):
+    """Invert VADER's normalization to recover the summed valence of a message."""
+    compound_score = max(-_MAX_COMPOUND, min(_MAX_COMPOUND, compound_score))
+    return compound_score * math.sqrt(VADER_ALPHA / (1 - compound_score * compound_score))
+
+
+def valence_to_compound(valence):
+    """Apply VADER's normalization to a summed valence."""
+    return round(valence / math.sqrt(valence * valence + VADER_ALPHA), 4)
+
+
+def trend_from_halves(first_sum, first_count, second_sum, second_count):
+    """Compare first-half and second-half averages -> "improving"/"declining"/"consistent"."""
+    first_half_avg = first_sum / first_count if first_count > 0 else 0
+    second_half_avg = second_sum / second_count if second_count > 0 else 0
+    
+    if second_half_avg > first_half_avg + 0.1:
+        return "improving"
+    elif second_half_avg < first_half_avg - 0.1:
+        return "declining"
+    else:
+        return "consistent"
+
+
+def _is_count(value):
+    return type(value) is int and value >= 0
+
+
+def _is_real(value):
+    return type(value) in (int, float) and math.isfinite(value)
+
+
+# Default bounds for the per-analyzer polarity score cache
+DEFAULT_CACHE_ENTRIES = 4096
+DEFAULT_CACHE_BYTES = 4 * 1024 * 1024
+
+# Rough size of one cached scores dict plus its bookkeeping
+_CACHE_ENTRY_OVERHEAD = 400
+
+
+def normalize_for_cache(message):
+    """Collapse whitespace runs - VADER tokenizes on whitespace, so scores are unchanged.
+    
+    Case and punctuation are kept because VADER scores them.
+    """
+    return " ".join(message.split())
+
+
+class ScoreCache:
+    """Thread-safe LRU cache of polarity scores bounded by entry count and approximate bytes."""
+    
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def _entry_size(key):
+        return sys.getsizeof(key) + _CACHE_ENTRY_OVERHEAD
+    
+    def get(self, key):
+        with self._lock:
+            scores = self._entries.get(key)
+            if scores is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return scores
+    
+    def put(self, key, scores):
+        size = self._entry_size(key)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = scores
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(old_key)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
 
 
 class SentimentAnalyzer:
     """Sentiment analyzer using VADER SentimentIntensityAnalyzer."""
     
-    def __init__(self):
-        # Initialize VADER analyzer (this is the actual VADER library being used)
-        self.analyzer = SentimentIntensityAnalyzer()
+    def __init__(self, cache_entries=DEFAULT_CACHE_ENTRIES, cache_bytes=DEFAULT_CACHE_BYTES,
+                 lexicon_snapshot=True, shared_lexicon=None):
+        # The VADER analyzer (the actual VADER library being used) is loaded on
+        # first use; lexicon_snapshot=False parses the lexicon text files directly
+        self.lexicon_snapshot = lexicon_snapshot
+        
+        # shared_lexicon=True maps the lexicon from a file shared by every
+        # process on the host instead of building private dicts; None follows
+        # the SENTIMENT_SHARED_LEXICON environment variable
+        self.shared_lexicon = shared_lexicon
+        self._vader = None
+        self._vader_lock = threading.Lock()
+        
+        # Repeated messages ("hi", "thanks", ...) are served from the cache;
+        # cache_entries=0 turns caching off
+        self.cache = ScoreCache(cache_entries, cache_bytes) if cache_entries > 0 else None
+        
+        # Built on first use of the "numpy" batch engine
+        self._vectorized = None
+    
+    @property
+    def analyzer(self):
+        """The VADER SentimentIntensityAnalyzer, loaded on first access."""
+        if self._vader is None:
+            with self._vader_lock:
+                if self._vader is None:
+                    self._vader = load_vader(snapshot=self.lexicon_snapshot, shared=self.shared_lexicon)
+        return self._vader
+    
+    def _polarity_scores(self, message):
+        """Return VADER scores for message, using the cache when enabled.
+        
+        The returned dict may be shared with the cache and must not be mutated.
+        """
+        if self.cache is None:
+            return self.analyzer.polarity_scores(message)
+        
+        key = normalize_for_cache(message)
+        scores = self.cache.get(key)
+        if scores is None:
+            scores = self.analyzer.polarity_scores(key)
+            self.cache.put(key, scores)
+        return scores
+    
+    def cache_stats(self):
+        """Return hits, misses, evictions and current size of the score cache."""
+        if self.cache is None:
+            return None
+        return self.cache.stats()
     
     def analyze_message(self, message):
         if not message or not message.strip():
             return "Neutral"
         
         # Get polarity scores
-        scores = self.analyzer.polarity_scores(message)
-        compound_score = scores['compound']
+        scores = self._polarity_scores(message)
         
         # Convert compound score to sentiment label
-        if compound_score >= 0.05:
-            return "Positive"
-        elif compound_score <= -0.05:
-            return "Negative"
-        else:
-            return "Neutral"
+        return label_from_compound(scores['compound'])
     
     def analyze_overall(self, messages):
         if not messages:
@@ -41,32 +231,282 @@ class SentimentAnalyzer:
             return "consistent"
         
         # Convert sentiments to numeric values for trend analysis
-        sentiment_values = []
-        for sentiment in sentiment_list:
-            if sentiment == "Positive":
-                sentiment_values.append(1)
-            elif sentiment == "Negative":
-                sentiment_values.append(-1)
-            else:
-                sentiment_values.append(0)
+        sentiment_values = [SENTIMENT_VALUES.get(sentiment, 0) for sentiment in sentiment_list]
         
         # Calculate trend by comparing first half to second half
         mid_point = len(sentiment_values) // 2
-        first_half_avg = sum(sentiment_values[:mid_point]) / mid_point if mid_point > 0 else 0
-        second_half_avg = sum(sentiment_values[mid_point:]) / (len(sentiment_values) - mid_point) if len(sentiment_values) - mid_point > 0 else 0
+        return trend_from_halves(
+            sum(sentiment_values[:mid_point]), mid_point,
+            sum(sentiment_values[mid_point:]), len(sentiment_values) - mid_point
+        )
+    
+    def get_detailed_scores(self, message):
+        if not message or not message.strip():
+            return dict(NEUTRAL_SCORES)
+        
+        return dict(self._polarity_scores(message))
+    
+    def score_message(self, message):
+        """Score message once, returning (label, scores) so callers never re-run VADER."""
+        scores = self.get_detailed_scores(message)
+        return label_from_compound(scores['compound']), scores
+    
+    def analyze_batch(self, messages, workers=1, chunksize=None, engine="vader"):
+        """Score many messages, returning (label, scores) pairs in input order.
+        
+        With workers > 1 (or None for one per CPU) large inputs are split
+        into chunks and scored in a process pool; each worker builds its own
+        analyzer once. Results are identical to the single-process path.
         
-        if second_half_avg > first_half_avg + 0.1:
-            return "improving"
-        elif second_half_avg < first_half_avg - 0.1:
-            return "declining"
+        engine="numpy" scores with the vectorized VADER engine (requires
+        numpy); it gives the same scores as stock VADER.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown scoring engine: {engine!r} (expected one of {ENGINES})")
+        messages = list(messages)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        
+        if workers <= 1 or len(messages) < MIN_PARALLEL_BATCH:
+            return self._score_chunk(messages, engine)
+        
+        if chunksize is None:
+            # A few chunks per worker keeps them evenly loaded
+            chunksize = max(1, len(messages) // (workers * 4))
+        chunks = [messages[i:i + chunksize] for i in range(0, len(messages), chunksize)]
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                 initargs=(self.lexicon_snapshot, self.shared_lexicon)) as executor:
+            for chunk_result in executor.map(_score_chunk_in_worker, chunks, [engine] * len(chunks)):
+                results.extend(chunk_result)
+        return results
+    
+    def _score_chunk(self, messages, engine="vader"):
+        if engine == "numpy":
+            return self._score_chunk_vectorized(messages)
+        return [self.score_message(message) for message in messages]
+    
+    def _score_chunk_vectorized(self, messages):
+        if self._vectorized is None:
+            from vader_numpy import VectorizedVader
+            self._vectorized = VectorizedVader(self.analyzer.lexicon, self.analyzer.emojis)
+        
+        results = []
+        for start in range(0, len(messages), VECTORIZED_BATCH):
+            batch = messages[start:start + VECTORIZED_BATCH]
+            for message, scores in zip(batch, self._vectorized.polarity_scores_batch(batch)):
+                if not message or not message.strip():
+                    scores = dict(NEUTRAL_SCORES)
+                results.append((label_from_compound(scores['compound']), scores))
+        return results
+
+
+class OverallSentiment:
+    """Running overall conversation sentiment, updated once per scored turn.
+    
+    "incremental" mode sums each turn's valence (recovered from its compound
+    score) and re-normalizes, so label and compound are O(1) at any point.
+    This approximates scoring the concatenated transcript but is not the
+    same: VADER caps '!' emphasis and weights "but" over the whole text, not
+    per message, and its 4-decimal rounding saturates a message's compound
+    near +/-0.99995, which loses valence beyond that. Use mode="concat" for
+    exact results: it keeps the messages and scores " ".join(messages) like
+    analyze_overall.
+    """
+    
+    MODES = ("incremental", "concat")
+    
+    def __init__(self, mode="incremental", analyzer=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown overall sentiment mode: {mode!r} (expected one of {self.MODES})")
+        self.mode = mode
+        self.analyzer = analyzer
+        self.count = 0
+        self._valence = 0.0
+        self._messages = []
+        self._concat_compound = None
+    
+    def add(self, message, scores):
+        """Fold one scored turn into the running total."""
+        self.count += 1
+        if self.mode == "concat":
+            self._messages.append(message)
+            self._concat_compound = None
         else:
+            self._valence += compound_to_valence(scores['compound'])
+    
+    def compound(self):
+        if self.mode == "concat":
+            if self._concat_compound is None:
+                analyzer = self.analyzer or get_analyzer()
+                self._concat_compound = analyzer.get_detailed_scores(" ".join(self._messages))['compound']
+            return self._concat_compound
+        
+        if self.count == 0:
+            return 0.0
+        return valence_to_compound(self._valence)
+    
+    def label(self):
+        if self.count == 0:
+            return "Neutral"
+        return label_from_compound(self.compound())
+    
+    def to_state(self):
+        """The running total as plain JSON-safe data (see from_state)."""
+        return {'mode': self.mode, 'count': self.count, 'valence': self._valence, 'messages': list(self._messages)}
+    
+    @classmethod
+    def from_state(cls, state, analyzer=None):
+        """Rebuild an accumulator from to_state(); raises ValueError if state is malformed."""
+        if not isinstance(state, dict) or state.get('mode') not in cls.MODES:
+            raise ValueError("Malformed overall sentiment state")
+        count, valence, messages = state.get('count'), state.get('valence'), state.get('messages')
+        if not (_is_count(count) and _is_real(valence) and isinstance(messages, list)
+                and all(isinstance(message, str) for message in messages)
+                and len(messages) == (count if state['mode'] == "concat" else 0)):
+            raise ValueError("Malformed overall sentiment state")
+        
+        overall = cls(mode=state['mode'], analyzer=analyzer)
+        overall.count = count
+        overall._valence = float(valence)
+        overall._messages = messages
+        return overall
+
+
+class MoodTrendTracker:
+    """Live mood trend, updated in O(1) per turn.
+    
+    trend() gives the same first-half vs second-half verdict as
+    get_mood_trend over every label added so far. That verdict needs the
+    labels of the current second half, because they cross the moving
+    midpoint later, so memory is O(n) in the session length: one signed byte
+    per label, about n/2 bytes (up to n before consumed labels are dropped).
+    The rolling window and the EMA of compound scores use constant memory.
+    """
+    
+    def __init__(self, window=10, ema_alpha=0.3):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if not 0 < ema_alpha <= 1:
+            raise ValueError("ema_alpha must be in (0, 1]")
+        self.window = window
+        self.ema_alpha = ema_alpha
+        self.count = 0
+        
+        # First half is summarized; second half values wait to cross the midpoint
+        self._first_sum = 0
+        self._first_count = 0
+        self._second_sum = 0
+        self._second = array('b')
+        self._second_head = 0
+        
+        # Rolling window over the last `window` compound scores
+        self._recent = deque(maxlen=window)
+        self._recent_sum = 0.0
+        self._ema = None
+    
+    def add(self, label, compound=None):
+        """Record one turn's label and (optionally) its compound score."""
+        value = SENTIMENT_VALUES.get(label, 0)
+        if compound is None:
+            compound = float(value)
+        self.count += 1
+        
+        self._second.append(value)
+        self._second_sum += value
+        while self._first_count < self.count // 2:
+            moved = self._second[self._second_head]
+            self._second_head += 1
+            self._second_sum -= moved
+            self._first_sum += moved
+            self._first_count += 1
+        if self._second_head > len(self._second) // 2:
+            # Drop consumed values; amortized O(1) per turn
+            del self._second[:self._second_head]
+            self._second_head = 0
+        
+        if len(self._recent) == self.window:
+            self._recent_sum -= self._recent[0]
+        self._recent.append(compound)
+        self._recent_sum += compound
+        
+        if self._ema is None:
+            self._ema = compound
+        else:
+            self._ema = self.ema_alpha * compound + (1 - self.ema_alpha) * self._ema
+    
+    def trend(self):
+        if self.count < 2:
             return "consistent"
+        return trend_from_halves(
+            self._first_sum, self._first_count,
+            self._second_sum, self.count - self._first_count
+        )
     
-    def get_detailed_scores(self, message):
-        if not message or not message.strip():
-            return {'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0}
+    def window_average(self):
+        """Mean compound score of the last `window` turns."""
+        if not self._recent:
+            return 0.0
+        return self._recent_sum / len(self._recent)
+    
+    def ema(self):
+        """Exponential moving average of compound scores."""
+        return self._ema if self._ema is not None else 0.0
+    
+    def snapshot(self):
+        return {
+            'turns': self.count,
+            'trend': self.trend(),
+            'window': self.window,
+            'window_average': self.window_average(),
+            'window_label': label_from_compound(self.window_average()),
+            'ema': self.ema(),
+        }
+    
+    def to_state(self):
+        """The tracker as plain JSON-safe data (see from_state)."""
+        return {
+            'window': self.window,
+            'ema_alpha': self.ema_alpha,
+            'count': self.count,
+            'first_sum': self._first_sum,
+            'first_count': self._first_count,
+            'second': self._second[self._second_head:].tolist(),
+            'recent': list(self._recent),
+            'recent_sum': self._recent_sum,
+            'ema': self._ema,
+        }
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a tracker from to_state(); raises ValueError if state is malformed."""
+        if not isinstance(state, dict):
+            raise ValueError("Malformed mood trend state")
+        window, ema_alpha, count = state.get('window'), state.get('ema_alpha'), state.get('count')
+        first_sum, first_count, second = state.get('first_sum'), state.get('first_count'), state.get('second')
+        recent, recent_sum, ema = state.get('recent'), state.get('recent_sum'), state.get('ema')
+        if not (_is_count(window) and _is_real(ema_alpha) and _is_count(count)
+                and first_count == count // 2 and type(first_sum) is int and abs(first_sum) <= first_count
+                and isinstance(second, list) and len(second) == count - first_count
+                and all(type(value) is int and -1 <= value <= 1 for value in second)
+                and isinstance(recent, list) and len(recent) == min(count, window)
+                and all(_is_real(value) for value in recent) and _is_real(recent_sum)
+                and (ema is None if count == 0 else _is_real(ema))):
+            raise ValueError("Malformed mood trend state")
         
-        return self.analyzer.polarity_scores(message)
+        tracker = cls(window=window, ema_alpha=ema_alpha)
+        tracker.count = count
+        tracker._first_sum = first_sum
+        tracker._first_count = first_count
+        tracker._second = array('b', second)
+        tracker._second_sum = sum(second)
+        tracker._recent.extend(recent)
+        tracker._recent_sum = recent_sum
+        tracker._ema = ema
+        return tracker
 
 
 # Global analyzer instance (initialized once)
@@ -81,6 +521,19 @@ def get_analyzer():
     return _analyzer
 
 
+# Per-process analyzer for batch workers (built once by the pool initializer)
+_worker_analyzer = None
+
+
+def _init_batch_worker(lexicon_snapshot=True, shared_lexicon=None):
+    global _worker_analyzer
+    _worker_analyzer = SentimentAnalyzer(lexicon_snapshot=lexicon_snapshot, shared_lexicon=shared_lexicon)
+
+
+def _score_chunk_in_worker(messages, engine):
+    return _worker_analyzer._score_chunk(messages, engine)
+
+
 def analyze_message(message):
     
     return get_analyzer().analyze_message(message)
@@ -95,3 +548,22 @@ def get_mood_trend(sentiment_list):
     
     return get_analyzer().get_mood_trend(sentiment_list)
 
+
+def get_detailed_scores(message):
+    
+    return get_analyzer().get_detailed_scores(message)
+
+
+def score_message(message):
+    
+    return get_analyzer().score_message(message)
+
+
+def analyze_batch(messages, workers=1, chunksize=None, engine="vader"):
+    
+    return get_analyzer().analyze_batch(messages, workers=workers, chunksize=chunksize, engine=engine)
+
+
+def cache_stats():
+    
+    return get_analyzer().cache_stats()
@@ -0,0 +1,281 @@
+# Asyncio multi-session chat server speaking line-delimited JSON
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from sentiment import get_analyzer
+from sessions import SessionManager, DEFAULT_MAX_SESSIONS, DEFAULT_IDLE_TTL, DEFAULT_HISTORY_LIMIT
+from utils import clean_input
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Longest accepted request line; longer lines get an error and the connection is closed
+MAX_LINE_BYTES = 64 * 1024
+
+# Pending connections the listening socket queues before accept()
+LISTEN_BACKLOG = 1024
+
+# Scoring and response generation hold the GIL, so a couple of threads are
+# enough to keep the event loop free without making turns queue behind each other
+DEFAULT_EXECUTOR_WORKERS = 2
+
+
+class ChatServer:
+    """Serve many independent chat sessions over TCP or a Unix socket.
+
+    Each request is one JSON object per line:
+        {"session": "alice", "message": "Hi there!"}  -> one chat turn
+        {"session": "alice", "command": "summary"}    -> conversation summary
+        {"session": "alice", "command": "end"}        -> summary, then forget the session
+        {"command": "metrics"}                        -> stage latencies and intent counts
+                                                         ("format": "prometheus" for text)
+    An optional "id" is echoed back. Requests without "session" use a
+    session private to the connection. Every request gets exactly one
+    JSON line in reply, in order; failures reply {"error": ...}.
+
+    Sessions live in a SessionManager (LRU cap, idle TTL, bounded history).
+    Connections only cost a coroutine while idle. The CPU-bound part of a
+    turn (scoring and response generation) runs on a thread pool, and turns
+    of the same session are serialized so its Chatbot state stays consistent.
+    A session is pinned in the SessionManager while a request waits for or
+    holds its lock, so it is not evicted under a running turn.
+
+    With workers=N the sessions live in N worker processes instead
+    (shards.ShardedSessions): this process only parses, routes each session
+    to its worker and writes replies, so turns use N cores. Routing runs on
+    the thread pool, so the event loop never waits for a busy worker or a
+    rebalance. max_sessions then caps each worker, and the metrics command
+    is not available.
+    """
+
+    def __init__(self, tier2_enabled=True, overall_mode="incremental",
+                 executor_workers=DEFAULT_EXECUTOR_WORKERS, max_sessions=DEFAULT_MAX_SESSIONS,
+                 session_ttl=DEFAULT_IDLE_TTL, history_limit=DEFAULT_HISTORY_LIMIT, metrics=None, workers=None):
+        self.tier2_enabled = tier2_enabled
+        self.workers = workers
+        self.pool = None  # shards.ShardedSessions while serving with workers
+        self._pool_options = {"max_sessions": max_sessions, "idle_ttl": session_ttl, "history_limit": history_limit,
+                              "tier2_enabled": tier2_enabled, "overall_mode": overall_mode}
+        # Optional metrics.Metrics shared by every session; None disables the metrics command
+        self.metrics = metrics
+        if metrics is not None and workers is None:
+            metrics.instrument_analyzer(get_analyzer())  # Every session scores through it
+        self.executor_workers = executor_workers
+        self.sessions = SessionManager(
+            max_sessions=max_sessions,
+            idle_ttl=session_ttl,
+            history_limit=history_limit,
+            tier2_enabled=tier2_enabled,
+            overall_mode=overall_mode,
+            on_evict=self._forget_session,
+            metrics=metrics
+        )
+        self._session_locks = {}
+        self._connection_ids = itertools.count(1)
+        self._executor = None
+        self._server = None
+        self._connections = {}  # handler task -> writer, for shutdown
+
+    def _session(self, session_id, create=True):
+        # Expiry only looks at the least recently used end, so it is cheap per request
+        self.sessions.expire()
+        chatbot = self.sessions.get(session_id, create=create, pin=True)
+        if chatbot is None:
+            return None, None
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = self._session_locks[session_id] = asyncio.Lock()
+        return chatbot, lock
+
+    @contextlib.asynccontextmanager
+    async def _locked_session(self, session_id, create=True):
+        """The session's Chatbot (None if unknown and create is False) with its lock held.
+
+        A request queued behind an "end" finds the session gone once it gets
+        the lock, and starts over on the current session instead.
+        """
+        while True:
+            chatbot, lock = self._session(session_id, create)
+            if chatbot is None:
+                yield None
+                return
+            try:
+                async with lock:
+                    if self.sessions.peek(session_id) is chatbot:
+                        yield chatbot
+                        return
+            finally:
+                self.sessions.unpin(session_id)
+
+    def _forget_session(self, session_id, chatbot, reason):
+        self._session_locks.pop(session_id, None)
+
+    async def _pool_request(self, submit, *arguments):
+        """Route a request to the worker pool off the event loop and await its reply."""
+        loop = asyncio.get_running_loop()
+        future = await loop.run_in_executor(self._executor, submit, *arguments)
+        return await asyncio.wrap_future(future)
+
+    async def handle_request(self, request, default_session):
+        """Answer one decoded request (a dict) and return the reply dict."""
+        if not isinstance(request, dict):
+            return {"error": "request must be a JSON object"}
+
+        if request.get("command") == "metrics":
+            if self.pool is not None:
+                return {"error": "metrics are not available with worker processes"}
+            if self.metrics is None:
+                return {"error": "metrics are not enabled"}
+            if request.get("format") == "prometheus":
+                return {"prometheus": self.metrics.prometheus()}
+            return {"metrics": self.metrics.snapshot()}
+
+        session_id = request.get("session", default_session)
+        if not isinstance(session_id, str) or not session_id:
+            return {"error": "session must be a non-empty string"}
+
+        command = request.get("command", "message")
+        if command == "message":
+            message = request.get("message")
+            if not isinstance(message, str):
+                return {"error": "message must be a string"}
+            message = clean_input(message)
+            if not message:
+                return {"error": "message is empty"}
+
+            if self.pool is not None:
+                entry = await self._pool_request(self.pool.submit_turn, session_id, message)
+            else:
+                async with self._locked_session(session_id) as chatbot:
+                    loop = asyncio.get_running_loop()
+                    entry = await loop.run_in_executor(self._executor, chatbot.process_turn, message)
+
+            reply = {"session": session_id, "bot": entry["bot"]}
+            if self.tier2_enabled:
+                reply["sentiment"] = entry["sentiment"]
+                reply["compound"] = entry["scores"]["compound"]
+            return reply
+
+        if command in ("summary", "end"):
+            if self.pool is not None:
+                summary = await self._pool_request(self.pool.submit_summary, session_id, command == "end")
+                if summary is None:
+                    return {"error": f"unknown session: {session_id}"}
+                return {"session": session_id, **summary}
+            async with self._locked_session(session_id, create=False) as chatbot:
+                if chatbot is None:
+                    return {"error": f"unknown session: {session_id}"}
+                reply = {"session": session_id, **chatbot.summary()}
+                if command == "end":
+                    self.sessions.remove(session_id)
+            return reply
+
+        return {"error": f"unknown command: {command!r}"}
+
+    async def handle_connection(self, reader, writer):
+        default_session = f"connection-{next(self._connection_ids)}"
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    await self._send(writer, {"error": f"request line longer than {MAX_LINE_BYTES} bytes"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    reply = {"error": "invalid JSON"}
+                else:
+                    try:
+                        reply = await self.handle_request(request, default_session)
+                    except Exception as e:
+                        reply = {"error": f"internal error: {e}"}
+                    if isinstance(request, dict) and "id" in request:
+                        reply["id"] = request["id"]
+                await self._send(writer, reply)
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _send(writer, reply):
+        writer.write(json.dumps(reply, ensure_ascii=False).encode('utf-8') + b"\n")
+        await writer.drain()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """Start listening; on TCP (host, port) or on the Unix socket unix_path."""
+        if self.workers:
+            from shards import ShardedSessions
+            self.pool = ShardedSessions(self.workers, **self._pool_options)
+        # Without workers the executor runs turns; with them it only routes, which
+        # waits while workers are added or removed
+        self._executor = ThreadPoolExecutor(max_workers=self.executor_workers,
+                                            thread_name_prefix="chat-route" if self.workers else "chat-turn")
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            self._server = await asyncio.start_unix_server(
+                self.handle_connection, path=unix_path, limit=MAX_LINE_BYTES, backlog=LISTEN_BACKLOG
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self.handle_connection, host=host, port=port, limit=MAX_LINE_BYTES, backlog=LISTEN_BACKLOG
+            )
+        return self._server
+
+    def addresses(self):
+        """Addresses the server is listening on."""
+        return [sock.getsockname() for sock in self._server.sockets]
+
+    async def close(self):
+        """Stop accepting, close open connections and wait for in-flight turns."""
+        if self._server is not None:
+            self._server.close()
+            # Closing the transports makes each handler see EOF and return
+            handlers = list(self._connections)
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self.pool is not None:
+            self.pool.close()
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        await self.start(host, port, unix_path)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, tier2_enabled=True,
+          overall_mode="incremental", executor_workers=DEFAULT_EXECUTOR_WORKERS, **session_options):
+    """Run a ChatServer until interrupted; session_options go to ChatServer (max_sessions, ...)."""
+    server = ChatServer(tier2_enabled=tier2_enabled, overall_mode=overall_mode,
+                        executor_workers=executor_workers, **session_options)
+    where = unix_path or f"{host}:{port}"
+    print(f"Serving line-delimited JSON chat on {where} (Ctrl+C to stop)")
+    try:
+        asyncio.run(server.serve_forever(host, port, unix_path))
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
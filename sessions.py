@@ -0,0 +1,191 @@
+# Bounded store of per-user Chatbot states for multi-user hosts
+import threading
+import time
+from collections import OrderedDict
+
+from chatbot import Chatbot
+
+
+DEFAULT_MAX_SESSIONS = 10000
+
+# Seconds a session may sit idle before it is dropped
+DEFAULT_IDLE_TTL = 30 * 60
+
+# Turns kept per session; older turns only live on in the running aggregates
+DEFAULT_HISTORY_LIMIT = 50
+
+# Distinct likes/characteristics/topics kept per session
+DEFAULT_MEMORY_LIMIT = 100
+
+
+class SessionManager:
+    """Own many Chatbot states with a session cap and an idle TTL.
+
+    Sessions are kept in least-recently-used order: get() moves a session
+    to the back, so when max_sessions is exceeded the front one is evicted,
+    and expire() only has to look at the front for idle sessions. Each
+    Chatbot keeps a ring buffer of its last history_limit turns; its turn
+    counts, overall sentiment and mood trend still cover every turn.
+
+    on_evict(session_id, chatbot, reason) is called for every session that
+    leaves the manager; reason is "lru", "ttl" or "removed".
+
+    A pinned session (get(..., pin=True) until unpin()) is in use, e.g. a
+    turn is running on it, and is never evicted or expired. If every
+    session is pinned the cap is exceeded until they are unpinned; only
+    remove() drops a pinned session.
+    """
+
+    def __init__(self, max_sessions=DEFAULT_MAX_SESSIONS, idle_ttl=DEFAULT_IDLE_TTL,
+                 history_limit=DEFAULT_HISTORY_LIMIT, memory_limit=DEFAULT_MEMORY_LIMIT,
+                 tier2_enabled=True, overall_mode="incremental", on_evict=None, clock=time.monotonic,
+                 metrics=None):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.history_limit = history_limit
+        self.memory_limit = memory_limit
+        self.tier2_enabled = tier2_enabled
+        self.overall_mode = overall_mode
+        self.on_evict = on_evict
+        self.clock = clock
+        self.metrics = metrics  # Shared metrics.Metrics every new Chatbot reports to
+
+        self._sessions = OrderedDict()  # session id -> (chatbot, last used)
+        self._pins = {}  # session id -> pin count, only for pinned sessions
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def get(self, session_id, create=True, pin=False):
+        """Return the session's Chatbot (creating it if needed) and mark it used; pin=True also pins it."""
+        now = self.clock()
+        evicted = []
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                chatbot = entry[0]
+                self._sessions.move_to_end(session_id)
+            elif not create:
+                return None
+            else:
+                chatbot = Chatbot(
+                    tier2_enabled=self.tier2_enabled,
+                    overall_mode=self.overall_mode,
+                    history_limit=self.history_limit,
+                    memory_limit=self.memory_limit,
+                    metrics=self.metrics
+                )
+                self.created += 1
+                self._make_room(1, evicted)
+            self._sessions[session_id] = (chatbot, now)
+            if pin:
+                self._pins[session_id] = self._pins.get(session_id, 0) + 1
+
+        for old_id, old_chatbot in evicted:
+            self._notify(old_id, old_chatbot, "lru")
+        return chatbot
+
+    def adopt(self, session_id, chatbot):
+        """Add an existing Chatbot (e.g. from Chatbot.from_snapshot) as the most recently used session."""
+        evicted = []
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._make_room(1, evicted)
+            self._sessions[session_id] = (chatbot, self.clock())
+
+        for old_id, old_chatbot in evicted:
+            self._notify(old_id, old_chatbot, "lru")
+
+    def unpin(self, session_id):
+        """Undo one get(..., pin=True); sessions kept over the cap while pinned are evicted now."""
+        evicted = []
+        with self._lock:
+            count = self._pins.get(session_id, 0)
+            if count > 1:
+                self._pins[session_id] = count - 1
+                return
+            self._pins.pop(session_id, None)
+            self._make_room(0, evicted)
+
+        for old_id, old_chatbot in evicted:
+            self._notify(old_id, old_chatbot, "lru")
+
+    def _make_room(self, room, evicted):
+        # Caller holds _lock. Evicts least recently used unpinned sessions until
+        # `room` more fit under the cap, collecting them in evicted
+        excess = len(self._sessions) + room - self.max_sessions
+        if excess <= 0:
+            return
+        victims = []
+        for session_id in self._sessions:
+            if session_id not in self._pins:
+                victims.append(session_id)
+                if len(victims) == excess:
+                    break
+        for session_id in victims:
+            chatbot, _ = self._sessions.pop(session_id)
+            self.evicted += 1
+            evicted.append((session_id, chatbot))
+
+    def ids(self):
+        """Ids of the current sessions, least recently used first."""
+        with self._lock:
+            return list(self._sessions)
+
+    def peek(self, session_id):
+        """Return the session's Chatbot without creating it or marking it used."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+        return entry[0] if entry is not None else None
+
+    def remove(self, session_id):
+        """Drop a session; returns its Chatbot, or None if it was unknown."""
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return None
+        self._notify(session_id, entry[0], "removed")
+        return entry[0]
+
+    def expire(self):
+        """Drop sessions idle for longer than idle_ttl; returns how many were dropped."""
+        if self.idle_ttl is None:
+            return 0
+        deadline = self.clock() - self.idle_ttl
+        expired = []
+        with self._lock:
+            for session_id, (chatbot, last_used) in self._sessions.items():
+                if last_used > deadline:
+                    break
+                if session_id not in self._pins:
+                    expired.append((session_id, chatbot))
+            for session_id, _ in expired:
+                del self._sessions[session_id]
+            self.expired += len(expired)
+
+        for session_id, chatbot in expired:
+            self._notify(session_id, chatbot, "ttl")
+        return len(expired)
+
+    def _notify(self, session_id, chatbot, reason):
+        if self.on_evict is not None:
+            self.on_evict(session_id, chatbot, reason)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'created': self.created,
+                'evicted': self.evicted,
+                'expired': self.expired,
+            }
@@ -0,0 +1,355 @@
+# Sessions sharded over worker processes with consistent-hash routing
+import hashlib
+import itertools
+import multiprocessing
+import queue
+import threading
+from bisect import bisect
+from concurrent.futures import Future
+
+from sessions import DEFAULT_MAX_SESSIONS, DEFAULT_IDLE_TTL, DEFAULT_HISTORY_LIMIT, DEFAULT_MEMORY_LIMIT
+
+
+# Points each worker gets on the hash ring; more points spread sessions more evenly
+DEFAULT_VNODES = 128
+
+DEFAULT_WORKERS = 4
+
+
+def _point(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent hashing of session ids onto nodes.
+
+    Every node owns vnodes points of a 64-bit ring; a key belongs to the
+    node of the first point at or after its hash. Adding or removing one of
+    N nodes only moves the keys of that node's points, about 1/N of them.
+    Hashes come from blake2b, so every process routes a key the same way.
+    """
+
+    def __init__(self, nodes=(), vnodes=DEFAULT_VNODES):
+        if vnodes < 1:
+            raise ValueError("vnodes must be at least 1")
+        self.vnodes = vnodes
+        self._nodes = []
+        self._points = []  # Sorted ring positions
+        self._owners = []  # Node of each position
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self):
+        return list(self._nodes)
+
+    def add(self, node):
+        if node in self._nodes:
+            raise ValueError(f"node already on the ring: {node!r}")
+        self._nodes.append(node)
+        self._rebuild()
+
+    def remove(self, node):
+        self._nodes.remove(node)
+        self._rebuild()
+
+    def _rebuild(self):
+        ring = sorted((_point(f"{node}#{replica}"), node) for node in self._nodes for replica in range(self.vnodes))
+        self._points = [point for point, _ in ring]
+        self._owners = [node for _, node in ring]
+
+    def node_for(self, key):
+        """Node that owns key (a string)."""
+        if not self._points:
+            raise ValueError("the ring has no nodes")
+        index = bisect(self._points, _point(key))
+        return self._owners[index % len(self._owners)]
+
+    def __len__(self):
+        return len(self._nodes)
+
+
+def _turn_reply(entry):
+    return {"bot": entry["bot"], "sentiment": entry["sentiment"], "scores": entry["scores"]}
+
+
+def _worker_main(worker_id, connection, vnodes, session_options):
+    """Body of a worker process: owns the sessions routed to it and answers requests in order.
+
+    Requests are (request id, command, *arguments) tuples; every request
+    gets (request id, result, error) back.
+    """
+    from chatbot import Chatbot
+    from sessions import SessionManager
+    from sentiment import score_message
+
+    score_message("warm up")  # Load VADER before the first turn
+    manager = SessionManager(**session_options)
+
+    def turn(session_id, message):
+        manager.expire()
+        return _turn_reply(manager.get(session_id).process_turn(message))
+
+    def summary(session_id, end):
+        chatbot = manager.peek(session_id)
+        if chatbot is None:
+            return None
+        result = chatbot.summary()
+        if end:
+            manager.remove(session_id)
+        return result
+
+    def release(nodes):
+        # Hand over the sessions this worker no longer owns on the new ring
+        ring = HashRing(nodes, vnodes)
+        moved = {}
+        for session_id in manager.ids():
+            if ring.node_for(session_id) != worker_id:
+                moved[session_id] = manager.remove(session_id).snapshot()
+        return moved
+
+    def adopt(snapshots):
+        for session_id, state in snapshots.items():
+            manager.adopt(session_id, Chatbot.from_snapshot(state))
+        return len(snapshots)
+
+    def stats():
+        return dict(manager.stats(), worker=worker_id)
+
+    commands = {"turn": turn, "summary": summary, "release": release, "adopt": adopt, "stats": stats}
+    while True:
+        try:
+            request_id, command, *arguments = connection.recv()
+        except EOFError:
+            return
+        if command == "stop":
+            connection.send((request_id, None, None))
+            return
+        try:
+            result = commands[command](*arguments)
+        except Exception as e:
+            connection.send((request_id, None, f"{type(e).__name__}: {e}"))
+        else:
+            connection.send((request_id, result, None))
+
+
+class _Worker:
+    """Front-side handle of one worker process: a pipe, its sender and reader threads and pending futures.
+
+    Requests are queued for the sender thread, so a caller never blocks on
+    the pipe when the worker is busy and its pipe buffer is full.
+    """
+
+    def __init__(self, worker_id, context, vnodes, session_options):
+        self.id = worker_id
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(worker_id, child, vnodes, session_options),
+                                       name=f"chat-shard-{worker_id}", daemon=True)
+        self.process.start()
+        child.close()
+        self.pending = {}  # request id -> Future
+        self.send_lock = threading.Lock()
+        self.closed = False
+        self.outbox = queue.SimpleQueue()  # Requests in send order; None stops the sender
+        self.sender = threading.Thread(target=self._send_requests, name=f"chat-shard-{worker_id}-requests", daemon=True)
+        self.sender.start()
+        self.reader = threading.Thread(target=self._read_replies, name=f"chat-shard-{worker_id}-replies", daemon=True)
+        self.reader.start()
+
+    def send(self, request_id, command, *arguments):
+        """Queue one request; returns its Future without waiting for the pipe."""
+        future = Future()
+        with self.send_lock:
+            if self.closed:
+                raise RuntimeError(f"worker {self.id} is gone")
+            self.pending[request_id] = future
+            self.outbox.put((request_id, command, *arguments))
+        return future
+
+    def _send_requests(self):
+        while True:
+            request = self.outbox.get()
+            if request is None:
+                return
+            try:
+                self.connection.send(request)
+            except (OSError, ValueError):
+                future = self.pending.pop(request[0], None)
+                if future is not None:
+                    future.set_exception(RuntimeError(f"worker {self.id} is gone"))
+
+    def close(self):
+        """Stop the sender thread and close the pipe."""
+        with self.send_lock:
+            self.closed = True
+        self.outbox.put(None)
+        self.sender.join(timeout=10)
+        self.connection.close()
+
+    def _read_replies(self):
+        while True:
+            try:
+                request_id, result, error = self.connection.recv()
+            except (EOFError, OSError):
+                break
+            future = self.pending.pop(request_id, None)
+            if future is None:
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(error))
+        # The worker exited: nothing still pending will be answered
+        with self.send_lock:
+            pending, self.pending = self.pending, {}
+        for future in pending.values():
+            future.set_exception(RuntimeError(f"worker {self.id} exited"))
+
+
+class ShardedSessions:
+    """Chat sessions spread over worker processes, each session sticky to one worker.
+
+    The front (this object) only routes: a HashRing maps every session id
+    to a worker id, and the session's Chatbot lives in that worker's own
+    SessionManager, next to the worker's own analyzer, so turns of
+    different sessions run on different cores. Requests to a worker go
+    through one pipe and are answered in order, so the turns of a session
+    never overtake each other; submit_turn() returns a Future, so many
+    turns can be in flight at once. A per-worker sender thread writes to
+    the pipe, so submitting never waits for a busy worker.
+
+    add_worker() and remove_worker() move only the sessions whose owner
+    changes on the ring (about 1/N of them): the old owner hands each one
+    over as a Chatbot.snapshot(), and routing is paused meanwhile, so
+    submit_turn() blocks until the move is done; an event loop should call
+    it from a thread (as ChatServer does).
+    session_options go to every worker's SessionManager (max_sessions,
+    idle_ttl, history_limit, memory_limit, tier2_enabled, overall_mode).
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, vnodes=DEFAULT_VNODES, max_sessions=DEFAULT_MAX_SESSIONS,
+                 idle_ttl=DEFAULT_IDLE_TTL, history_limit=DEFAULT_HISTORY_LIMIT, memory_limit=DEFAULT_MEMORY_LIMIT,
+                 **session_options):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.vnodes = vnodes
+        # max_sessions caps each worker, so the pool holds up to workers * max_sessions
+        self.session_options = dict(session_options, max_sessions=max_sessions, idle_ttl=idle_ttl,
+                                    history_limit=history_limit, memory_limit=memory_limit)
+        # Workers are started by spawning: the front runs reply threads, which fork does not copy safely
+        self._context = multiprocessing.get_context("spawn")
+        self._request_ids = itertools.count(1)
+        self._worker_ids = itertools.count()
+        self._workers = {}
+        self._route_lock = threading.Lock()
+        self.ring = HashRing(vnodes=vnodes)
+        self.moved = 0
+        self._closed = False
+        for _ in range(workers):
+            worker = self._start_worker()
+            self.ring.add(worker.id)
+
+    def _start_worker(self):
+        worker = _Worker(next(self._worker_ids), self._context, self.vnodes, self.session_options)
+        self._workers[worker.id] = worker
+        return worker
+
+    def _call(self, worker, command, *arguments):
+        return worker.send(next(self._request_ids), command, *arguments)
+
+    def _route(self, session_id, command, *arguments):
+        with self._route_lock:
+            if self._closed:
+                raise RuntimeError("the session pool is closed")
+            return self._call(self._workers[self.ring.node_for(session_id)], command, session_id, *arguments)
+
+    def worker_for(self, session_id):
+        """Id of the worker that owns session_id."""
+        return self.ring.node_for(session_id)
+
+    def submit_turn(self, session_id, message):
+        """Send one turn to the session's worker; the Future gives {"bot", "sentiment", "scores"}."""
+        return self._route(session_id, "turn", message)
+
+    def process_turn(self, session_id, message):
+        return self.submit_turn(session_id, message).result()
+
+    def submit_summary(self, session_id, end=False):
+        """The Future of the session's summary dict (None for an unknown session); end=True forgets it."""
+        return self._route(session_id, "summary", end)
+
+    def summary(self, session_id, end=False):
+        return self.submit_summary(session_id, end).result()
+
+    def stats(self):
+        """Session counts of every worker (SessionManager.stats plus the worker id)."""
+        with self._route_lock:
+            futures = [self._call(worker, "stats") for worker in self._workers.values()]
+        return [future.result() for future in futures]
+
+    def add_worker(self):
+        """Start one more worker and move its share of the sessions to it; returns its id."""
+        with self._route_lock:
+            worker = self._start_worker()
+            nodes = self.ring.nodes + [worker.id]
+            releases = [self._call(old, "release", nodes) for old in self._workers.values() if old is not worker]
+            snapshots = {}
+            for release in releases:
+                snapshots.update(release.result())
+            self._call(worker, "adopt", snapshots).result()
+            self.ring.add(worker.id)
+            self.moved += len(snapshots)
+        return worker.id
+
+    def remove_worker(self, worker_id):
+        """Hand the worker's sessions to their new owners and stop it; returns how many moved."""
+        with self._route_lock:
+            if worker_id not in self._workers:
+                raise ValueError(f"unknown worker: {worker_id!r}")
+            if len(self.ring) == 1:
+                raise ValueError("cannot remove the last worker")
+            nodes = [node for node in self.ring.nodes if node != worker_id]
+            worker = self._workers[worker_id]
+            snapshots = self._call(worker, "release", nodes).result()
+            ring = HashRing(nodes, self.vnodes)
+            by_owner = {}
+            for session_id, state in snapshots.items():
+                by_owner.setdefault(ring.node_for(session_id), {})[session_id] = state
+            adopted = [self._call(self._workers[owner], "adopt", moved) for owner, moved in by_owner.items()]
+            for future in adopted:
+                future.result()
+            self.ring = ring
+            self._stop(self._workers.pop(worker_id))
+            self.moved += len(snapshots)
+            return len(snapshots)
+
+    def _stop(self, worker):
+        try:
+            self._call(worker, "stop").result(timeout=10)
+        except Exception:
+            pass
+        worker.process.join(timeout=10)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join()
+        worker.close()
+
+    def close(self):
+        """Stop every worker (their sessions are dropped)."""
+        with self._route_lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            self._stop(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.ring)
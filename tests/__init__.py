@@ -1,5 +1,8 @@
 """
 Tests package for sentiment chatbot.
 """
+import os
 
-
+# Tests that need a lexicon snapshot point it at a temporary file; nothing
+# else writes to the user's cache directory
+os.environ["SENTIMENT_LEXICON_SNAPSHOT"] = "off"
@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import calculator module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from calculator import (calculate, evaluate, extract_expression, tokenize,
+                        MAX_TOKENS, MAX_DEPTH, MAX_NUMBER_DIGITS)
+
+
+class TestEvaluate(unittest.TestCase):
+    """Test cases for the expression evaluator."""
+
+    def test_matches_python_arithmetic(self):
+        """Test precedence, associativity and number types against Python itself."""
+        for expression in ["2 + 3 * 4", "(2 + 3) * 4", "20 / 4", "10 // 3", "-2 ** 2", "2 ** -1", "2 ** 3 ** 2",
+                           "7 - 9 - 1", "--5", "1.5 + .5", "5. * 2", "1 / 3", "2 * (3 + (4 - 1)) / 5", "00 + 1"]:
+            result = evaluate(expression)
+            self.assertEqual(result, eval(expression), expression)
+            self.assertIs(type(result), type(eval(expression)), expression)
+
+    def test_rejects_non_arithmetic(self):
+        """Test that malformed expressions raise ValueError."""
+        for expression in ["", "()", "2 +", "2 3", "2 (3)", "(1 + 2", "1 + 2)", "07", "1.2.3", "* 2", "2 * * 3",
+                           "(-8) ** 0.5"]:
+            with self.assertRaises(ValueError, msg=expression):
+                evaluate(expression)
+
+    def test_limits(self):
+        """Test that oversized input and results stop with OverflowError before the work is done."""
+        for expression in ["9 ** 9 ** 9", "10 ** 100", "2.0 ** 10000", "1" * (MAX_NUMBER_DIGITS + 1),
+                           "(" * (MAX_DEPTH + 1) + "1" + ")" * (MAX_DEPTH + 1), "-" * (MAX_DEPTH + 1) + "1",
+                           " + ".join(["1"] * MAX_TOKENS), "9" * 40 + " * " + "9" * 40 + " * " + "9" * 40]:
+            with self.assertRaises(OverflowError, msg=expression[:40]):
+                evaluate(expression)
+        self.assertEqual(evaluate("(" * MAX_DEPTH + "1" + ")" * MAX_DEPTH), 1)
+        self.assertEqual(evaluate("10 ** 99"), 10 ** 99)
+        with self.assertRaises(ZeroDivisionError):
+            evaluate("0 ** -1")
+
+    def test_tokenize(self):
+        """Test numbers become ints/floats and operators stay strings."""
+        self.assertEqual(tokenize("12+3.5*(2//1)**2"), [12, '+', 3.5, '*', '(', 2, '//', 1, ')', '**', 2])
+
+
+class TestCalculate(unittest.TestCase):
+    """Test cases for the replies to calculation messages."""
+
+    def test_natural_language(self):
+        """Test the word forms, decimals and sentence punctuation."""
+        self.assertEqual(extract_expression("What is 12 plus 7?"), "12 + 7")
+        self.assertEqual(calculate("what is 12 plus 7"), "The answer is 19.")
+        self.assertEqual(calculate("What is 20 divided by 4?"), "The answer is 5.0.")
+        self.assertEqual(calculate("what is 7 minus 9."), "The answer is -2.")
+        self.assertEqual(calculate("what is 1.5 times 3"), "The answer is 4.5.")
+        self.assertEqual(calculate("what is 3 plus 4 times 2"), "The answer is 11.")
+        self.assertEqual(calculate("Calculate 10 * 5"), "The answer is 50.")
+        self.assertEqual(calculate("The surplus is 3 plus 4."), "The answer is 7.")
+
+    def test_several_calculations(self):
+        """Test that the first calculation with an operator is answered."""
+        self.assertEqual(calculate("I'm 25, what is 3 plus 4"), "The answer is 7.")
+        self.assertEqual(calculate("20 / 4 and then 8 minus 2"), "The answer is 5.0.")
+        self.assertEqual(calculate("(2 + 3 or 8 minus 2"), "The answer is 6.")
+        self.assertEqual(calculate("Room 101 - what is 2 + 2"), "The answer is 4.")
+        self.assertEqual(calculate("3 * 3, what is the answer?"), "The answer is 9.")
+
+    def test_errors_and_limits(self):
+        """Test division by zero, oversized input and messages without arithmetic."""
+        self.assertEqual(calculate("What is 100 / 0?"), "I can't divide by zero!")
+        self.assertEqual(calculate("5 divided by 0"), "I can't divide by zero!")
+        self.assertEqual(calculate("what is 9**9**9"), "That number is too big for me to work out.")
+        self.assertEqual(calculate("1 " * 100000), "That number is too big for me to work out.")
+        self.assertEqual(calculate("(" * 100000), "That number is too big for me to work out.")
+        self.assertIsNone(calculate("calculate the meaning of life"))
+        self.assertIsNone(calculate("what is . . ."))
+        self.assertIsNone(calculate("what is 2 +"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import sys
+import os
+import subprocess
+from datetime import datetime
+from unittest.mock import patch
+
+# Add parent directory to path to import chatbot module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chatbot
+from chatbot import Chatbot
+from sentiment import SentimentAnalyzer, ScoreCache
+from keywords import extract_keywords
+from turn import Turn
+
+
+class TestChatbotTurns(unittest.TestCase):
+    """Test cases for the per-turn chatbot pipeline."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.chatbot = Chatbot()
+
+    def test_process_turn_stores_scores(self):
+        """Test that each turn keeps its label and raw VADER scores."""
+        entry = self.chatbot.process_turn("I'm feeling great today!")
+
+        self.assertEqual(entry["sentiment"], "Positive")
+        self.assertEqual(
+            entry["scores"],
+            SentimentAnalyzer(cache_entries=0).get_detailed_scores("I'm feeling great today!")
+        )
+        self.assertIn("great", entry["bot"])
+        self.assertEqual(self.chatbot.conversation_history[-1], entry)
+
+    def test_process_turn_scores_once(self):
+        """Test that a turn runs sentiment scoring exactly once."""
+        with patch.object(chatbot, 'score_message', wraps=chatbot.score_message) as scorer:
+            self.chatbot.process_turn("What is 25 + 17?")
+
+        scorer.assert_called_once_with("What is 25 + 17?")
+        self.assertEqual(self.chatbot.conversation_history[-1]["bot"], "The answer is 42.")
+
+    def test_process_turn_parses_once(self):
+        """Test that a turn builds one Turn and that it carries the same keywords as the matcher."""
+        with patch.object(Turn, '__init__', autospec=True, side_effect=Turn.__init__) as make_turn:
+            entry = self.chatbot.process_turn("  My name is Alice  ")
+
+        make_turn.assert_called_once()
+        self.assertEqual(make_turn.call_args.args[1], "  My name is Alice  ")
+        self.assertEqual(entry["bot"], "Nice to meet you, Alice! I'll remember that. How are you doing today?")
+
+        for message in ["My name is John", "I'm feeling sad today", "What is 25 + 3?", "what's the date"]:
+            turn = Turn(message)
+            turn.intents, turn.feeling, turn.name = self.chatbot._match_intents(turn.text, turn.lower)
+            self.assertEqual(turn.keywords, extract_keywords(message), message)
+            self.assertEqual(Chatbot(response_cache=False).generate_response(turn),
+                             Chatbot(response_cache=False).generate_response(message), message)
+
+
+class _Clock(datetime):
+    current = datetime(2024, 1, 15, 9, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the reply cache and the stable fallback choice."""
+
+    def setUp(self):
+        """Give each test its own cache."""
+        self.cache = ScoreCache(100)
+
+    def test_cached_replies_match_uncached(self):
+        """Test that hits return the same reply and intent while the session state still updates."""
+        messages = ["I love pizza", "who are you?", "You are helpful", "I love pizza",
+                    "who are you?", "You are helpful", "My name is Ada", "I love pizza"]
+        cached, plain = Chatbot(response_cache=self.cache), Chatbot(response_cache=False)
+        for message in messages:
+            self.assertEqual(cached.process_turn(message), plain.process_turn(message))
+            self.assertEqual(cached.last_intent, plain.last_intent)
+        self.assertEqual(cached.conversation_memory, plain.conversation_memory)
+        self.assertEqual(cached.discussed_topics, plain.discussed_topics)
+        # The first "I love pizza" had no history yet; the name is part of the key too
+        self.assertEqual(self.cache.stats()['hits'], 2)
+        self.assertTrue(cached.conversation_history[-1]["bot"].startswith("Ada, "))
+
+    def test_clock_and_state_dependent_replies_bypass_cache(self):
+        """Test that greetings, time answers and name capture are never cached."""
+        bot = Chatbot(response_cache=self.cache)
+        with patch.object(chatbot, 'datetime', _Clock):
+            _Clock.current = datetime(2024, 1, 15, 9, 0)
+            first = [bot.generate_response(message) for message in ["hello", "What's the time?", "when now?"]]
+            _Clock.current = datetime(2024, 1, 15, 19, 30)
+            second = [bot.generate_response(message) for message in ["hello", "What's the time?", "when now?"]]
+        self.assertIn("Good morning", first[0])
+        self.assertIn("Good evening", second[0])
+        self.assertNotEqual(first[1], second[1])
+        self.assertNotEqual(first[2], second[2])
+        self.assertEqual(bot.greeting_count, 2)
+
+        bot.generate_response("My name is Ada")
+        bot.user_info.clear()
+        self.assertEqual(bot.generate_response("My name is Ada"), "Nice to meet you, Ada! I'll remember that. How are you doing today?")
+        self.assertEqual(bot.user_info['name'], "Ada")
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_fallback_choice_is_stable_across_processes(self):
+        """Test that the fallback reply does not depend on the hash seed."""
+        code = "from chatbot import Chatbot; print(Chatbot(response_cache=False).generate_response('ok'))"
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        replies = {
+            subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True,
+                           env={**os.environ, "PYTHONHASHSEED": seed}).stdout
+            for seed in ("1", "2", "3")
+        }
+        self.assertEqual(replies, {Chatbot(response_cache=False).generate_response('ok') + "\n"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import random
+from collections import deque
+
+# Add parent directory to path to import history module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from history import ConversationHistory
+from sentiment import SentimentAnalyzer
+
+
+class TestConversationHistory(unittest.TestCase):
+    """Test cases for the columnar conversation history."""
+
+    def setUp(self):
+        """Set up scored sample turns."""
+        analyzer = SentimentAnalyzer(cache_entries=0)
+        rng = random.Random(3)
+        words = ["good", "bad", "great", "awful", "okay", "not", "very", "love", "hate", "the", "day", "!"]
+        self.turns = []
+        for i in range(300):
+            message = " ".join(rng.choice(words) for _ in range(rng.randint(1, 8)))
+            label, scores = analyzer.score_message(message)
+            self.turns.append({"user": message, "bot": f"reply {i}", "sentiment": label, "scores": scores})
+
+    def store(self, history, turns):
+        for turn in turns:
+            history.append(turn["user"], turn["bot"], turn["sentiment"], turn["scores"])
+
+    def test_entries_round_trip_exactly(self):
+        """Test that stored entries equal the original turn dicts, scores included."""
+        history = ConversationHistory()
+        self.store(history, self.turns)
+
+        self.assertEqual(len(history), len(self.turns))
+        self.assertEqual([dict(entry) for entry in history], self.turns)
+        self.assertEqual(history[-1], self.turns[-1])
+        self.assertEqual(history[10:13], self.turns[10:13])
+        self.assertEqual(history[-5:], self.turns[-5:])
+        with self.assertRaises(IndexError):
+            history[len(self.turns)]
+
+    def test_ring_buffer_matches_deque(self):
+        """Test that maxlen keeps the same turns as a bounded deque."""
+        for maxlen in (1, 7, 300, 500):
+            history = ConversationHistory(maxlen=maxlen)
+            expected = deque(maxlen=maxlen)
+            for turn in self.turns:
+                history.append(turn["user"], turn["bot"], turn["sentiment"], turn["scores"])
+                expected.append(turn)
+            self.assertEqual(list(history), list(expected))
+            self.assertEqual(history[-3:], list(expected)[-3:])
+
+    def test_entries_are_read_only(self):
+        """Test that entries cannot be modified."""
+        history = ConversationHistory()
+        self.store(history, self.turns[:1])
+        entry = history[0]
+
+        with self.assertRaises(TypeError):
+            entry["user"] = "changed"
+        with self.assertRaises(AttributeError):
+            entry.extra = 1
+        entry.scores["compound"] = 5.0
+        self.assertEqual(history[0]["scores"], self.turns[0]["scores"])
+        self.assertEqual(entry.get("missing", "default"), "default")
+
+    def test_clear(self):
+        """Test that clear empties every column."""
+        history = ConversationHistory(maxlen=5)
+        self.store(history, self.turns[:8])
+        history.clear()
+        self.assertEqual(len(history), 0)
+        self.store(history, self.turns[:2])
+        self.assertEqual(list(history), self.turns[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import sys
+import os
+import json
+import random
+from datetime import datetime
+from unittest.mock import patch
+
+# Add parent directory to path to import chatbot module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chatbot
+from chatbot import Chatbot
+from keywords import INTENT_PHRASES, FEELING_WORDS, PROFANITY_WORDS, NAME_ANCHORS
+
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), 'golden_responses.json')
+
+# Replies depend on the clock (greetings, time answers); the golden run uses a fixed one
+GOLDEN_NOW = datetime(2024, 1, 15, 15, 45)
+
+# Hand-written sessions walking through every branch of the reply logic
+SCRIPTED_SESSIONS = [
+    ["Hello", "Hi there", "What's the time?", "What's the date?", "What is sentiment analysis?", "How are you?"],
+    ["What is 25 + 17?", "Calculate 10 * 5", "What is 20 divided by 4?", "what is 7 minus 9", "what is 6 times 7",
+     "What is 100 / 0?", "calculate the meaning of life", "3 plus 4", "what is 2 ** 3?", "= 5"],
+    ["I'm feeling great today!", "I'm so happy!", "I'm excited about my vacation", "I'm feeling sad",
+     "I'm stressed about work", "I'm worried about my exam", "I'm tired", "I'm angry", "I feel fine", "I'm confused"],
+    ["It's my birthday today", "I'm turning 25 today", "I'm 21 years old today", "turning 12", "I'm turning 3 today",
+     "I got a promotion", "It's my anniversary", "graduation day!", "we got engaged", "my wedding is soon", "new job"],
+    ["You are very good", "You are helpful", "Your service disappoints me", "This bot is terrible",
+     "I hate rainy days", "the food was bad", "this is the worst", "useless"],
+    ["Last experience was better", "It used to be better", "my experience was bad", "the experience was okay",
+     "it got worse", "better than before", "not as good as it was", "things declined"],
+    ["I'm good and you?", "Fine, what about you?", "and you?", "Sorry", "I apologize", "forgive me", "thanks a lot",
+     "I appreciate it", "bye", "see you later"],
+    ["My name is John", "Call me Sarah", "I'm Bob", "I am working", "people call me Max", "i go by jj", "name's Li"],
+    ["Hello", "My name is Alice", "I'm feeling great! It's my birthday", "I'm having a party tonight",
+     "What's the time?", "What is 50 + 25?"],
+    ["I'm feeling really stressed about work", "I have too much work to do", "What is sentiment analysis?",
+     "How does it work?", "Hi, how are you?", "I'm good and you?"],
+    ["fuck you", "shut up", "damn this", "what the hell", "oh crap", "hello damn", "go to hell", "die"],
+    ["who are you?", "who is the president?", "who?", "who knows", "why is the sky blue", "why?", "where is Paris",
+     "where?", "when is lunch", "when is it now", "when?", "how does a car move", "how do birds fly", "how?", "how so"],
+    ["what do you do", "what can you do?", "what's your name", "what is your feeling", "what's up?", "what?",
+     "what day is it", "which date is good", "what the", "date night", "is it later?"],
+    ["I love pizza", "pizza is great", "I like long walks, and sunsets", "I am a teacher", "I'm a doctor.",
+     "ok", "yes", "cool", "I see", "tell me about them", "they left", "that one", "the cat sat on the mat", "."],
+]
+
+
+def _fragments():
+    fragments = [phrase for phrases in INTENT_PHRASES.values() for phrase in phrases]
+    fragments += FEELING_WORDS + PROFANITY_WORDS[:5] + [anchor.strip() for anchor in NAME_ANCHORS]
+    fragments += ["12 + 7", "10 * 5", "20 / 4", "7 - 9", "3 plus 4", "9 times 3", "100 divided by 0", "8 minus 2",
+                  "turning 30", "25 years old", "what is", "who is", "how does", "how do", "what do you",
+                  "what can you", "who are you", "how are you", "sentiment", "work", "service", "bot", "chatbot",
+                  "better", "worse", "good", "fine", "well", "alright", "excellent", "doing well", "not helpful",
+                  "suck", "the", "my", "pizza", "today", "really", "it", "this", "that", "them", "they", "Alice",
+                  "weather", "movie", "you", "your", "?", "!", ".", ",", "and", "Über", "23"]
+    return fragments
+
+
+def random_sessions(seed=2024, sessions=12, turns=40):
+    """Random messages built from the phrase lists, so most branches and their overlaps occur."""
+    rng = random.Random(seed)
+    fragments = _fragments()
+    result = []
+    for _ in range(sessions):
+        session = []
+        for _ in range(turns):
+            words = [rng.choice(fragments) for _ in range(rng.randint(1, 6))]
+            message = " ".join(words)
+            if rng.random() < 0.3:
+                message = message.capitalize()
+            if rng.random() < 0.25:
+                message += "?"
+            session.append(message)
+        result.append(session)
+    return result
+
+
+class _FixedClock(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return GOLDEN_NOW
+
+
+def run_sessions(sessions):
+    """Replies and answering intents for each session, with a fixed clock."""
+    results = []
+    with patch.object(chatbot, 'datetime', _FixedClock):
+        for messages in sessions:
+            bot = Chatbot()
+            replies, intents = [], []
+            for message in messages:
+                replies.append(bot.process_turn(message)["bot"])
+                intents.append(bot.last_intent)
+            results.append({"messages": messages, "replies": replies, "intents": intents})
+    return results
+
+
+def write_golden():
+    with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+        json.dump({"now": GOLDEN_NOW.isoformat(), "sessions": run_sessions(SCRIPTED_SESSIONS + random_sessions())},
+                  f, indent=1, ensure_ascii=False)
+        f.write("\n")
+
+
+class TestGoldenResponses(unittest.TestCase):
+    """Test that replies stay identical to the recorded golden corpus."""
+
+    @classmethod
+    def setUpClass(cls):
+        with open(GOLDEN_PATH, encoding="utf-8") as f:
+            cls.golden = json.load(f)["sessions"]
+
+    def test_replies_match_golden_corpus(self):
+        """Test every recorded session turn by turn."""
+        actual = run_sessions([session["messages"] for session in self.golden])
+        for expected, session in zip(self.golden, actual):
+            for message, want, got in zip(expected["messages"], expected["replies"], session["replies"]):
+                self.assertEqual(got, want, f"reply to {message!r}")
+
+    def test_intents_match_golden_corpus(self):
+        """Test that the same intent answers every recorded turn."""
+        actual = run_sessions([session["messages"] for session in self.golden])
+        for expected, session in zip(self.golden, actual):
+            self.assertEqual(session["intents"], expected["intents"])
+
+    def test_corpus_covers_every_intent(self):
+        """Test that the corpus exercises each reply branch."""
+        seen = {intent for session in self.golden for intent in session["intents"]}
+        self.assertEqual(seen, {
+            "follow_up", "greeting", "profanity", "positive_feedback", "complaint", "feeling", "name", "time",
+            "calc", "apology", "birthday", "special_event", "goodbye", "thanks", "reciprocal_question",
+            "comparison", "question", "statement", "fallback",
+        })
+
+
+if __name__ == '__main__':
+    if "--regenerate" in sys.argv:
+        # Only after a deliberate change of replies: rewrites the expected outputs
+        write_golden()
+    else:
+        unittest.main()
@@ -0,0 +1,191 @@
+
+import random
+import re
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import keywords module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from keywords import KeywordMatcher, extract_keywords
+
+
+def legacy_extract_keywords(text):
+    """Reference copy of the original any()-cascade Chatbot._extract_keywords."""
+    text_lower = text.lower()
+    keywords = {
+        'name': None,
+        'feeling': None,
+        'topic': None,
+        'is_question': text_lower.strip().endswith('?') or any(word in text_lower for word in ['what', 'who', 'where', 'when', 'why', 'how']),
+        'is_apology': any(word in text_lower for word in ['sorry', 'apologize', 'apology', 'forgive']),
+        'is_greeting': any(word in text_lower for word in ['hello', 'hi', 'hey', 'greetings', 'good morning', 'good afternoon', 'good evening', 'morning', 'afternoon', 'evening']),
+        'is_goodbye': any(word in text_lower for word in ['bye', 'goodbye', 'see you', 'farewell', 'later']),
+        'is_thanks': any(word in text_lower for word in ['thank', 'thanks', 'appreciate', 'grateful']),
+        'is_birthday': any(phrase in text_lower for phrase in ['birthday', 'my birthday', "it's my birthday", 'today is my birthday', 'turning', 'years old today', 'born today']),
+        'is_special_event': any(phrase in text_lower for phrase in ['anniversary', 'graduation', 'wedding', 'promotion', 'new job', 'got engaged']),
+        'is_reciprocal_question': any(phrase in text_lower for phrase in ['and you', 'what about you', 'how about you', 'you?', 'and yourself']),
+        'is_complaint': any(word in text_lower for word in ['disappoint', 'disappointing', 'bad', 'terrible', 'awful', 'horrible', 'worst', 'hate', 'sucks', 'useless', 'stupid', 'dumb', 'waste', 'poor', 'pathetic']),
+        'is_criticism': any(phrase in text_lower for phrase in ['your service', 'you are bad', "you're bad", 'you are terrible', "you're terrible", 'you are awful', "you're awful", 'you are horrible', "you're horrible", 'you are worst', "you're worst", 'you suck', 'this bot', 'this chatbot', 'not helpful', 'not working', 'does not work', "doesn't work"]),
+        'is_positive_feedback': any(phrase in text_lower for phrase in ['you are good', "you're good", 'you are great', "you're great", 'you are excellent', "you're excellent", 'you are amazing', "you're amazing", 'you are wonderful', "you're wonderful", 'you are awesome', "you're awesome", 'you are very good', "you're very good", 'you are the best', "you're the best", 'you are helpful', "you're helpful", 'you are perfect', "you're perfect"]),
+        'is_comparison': any(phrase in text_lower for phrase in ['was better', 'was worse', 'used to be', 'better than', 'worse than', 'not as good', 'not as bad', 'improved', 'got worse', 'declined', 'better before', 'worse before']),
+        'is_experience_feedback': any(phrase in text_lower for phrase in ['experience was', 'last experience', 'previous experience', 'this experience', 'my experience', 'the experience']),
+        'is_profanity': any(re.search(r'\b' + re.escape(word) + r'\b', text_lower) for word in ['fuck', 'damn', 'hell', 'shit', 'asshole', 'bitch', 'bastard', 'crap', 'piss', 'dick', 'cock', 'pussy', 'motherfucker', 'fucking', 'fucked']),
+        'is_offensive': any(phrase in text_lower for phrase in ['fuck you', 'fuck off', 'go to hell', 'screw you', 'shut up', 'shut your', 'kill yourself', 'die']),
+        'needs_time': any(word in text_lower for word in ['time', 'what time', 'current time', 'clock']),
+        'needs_date': any(phrase in text_lower for phrase in ['what date', 'what\'s the date', 'what is the date', 'what day is it', 'what day is today', 'date today', 'today\'s date', 'current date']) or (('date' in text_lower or 'day is it' in text_lower) and any(q_word in text_lower for q_word in ['what', 'when', 'which'])),
+        'needs_calc': bool(re.search(r'\d+\s*[+\-*/]\s*\d+', text)) or any(word in text_lower for word in ['calculate', 'what is', 'equals', '=']),
+    }
+
+    # Extract feelings/emotions FIRST (before name extraction to avoid conflicts)
+    feeling_words = ['happy', 'sad', 'angry', 'excited', 'worried', 'anxious', 
+                    'stressed', 'tired', 'energetic', 'confused', 'frustrated',
+                    'grateful', 'proud', 'disappointed', 'relieved', 'upset', 'mad',
+                    'depressed', 'down', 'unhappy', 'great', 'wonderful', 'amazing',
+                    'fine', 'okay', 'ok', 'terrible', 'awful', 'horrible']
+    for word in feeling_words:
+        if word in text_lower:
+            keywords['feeling'] = word
+            break
+
+    # Try to extract name - but ONLY if no feeling was detected
+    # Also use more specific patterns that are less likely to match emotions
+    if not keywords['feeling']:
+        # Extended blacklist of words that should never be treated as names
+        name_blacklist = [
+            'feeling', 'doing', 'going', 'here', 'there', 'sorry', 'fine', 'good', 'bad',
+            'happy', 'sad', 'angry', 'excited', 'worried', 'anxious', 'stressed', 'tired',
+            'energetic', 'confused', 'frustrated', 'grateful', 'proud', 'disappointed',
+            'relieved', 'upset', 'mad', 'depressed', 'down', 'unhappy', 'great', 'wonderful',
+            'amazing', 'okay', 'ok', 'terrible', 'awful', 'horrible', 'feeling', 'being',
+            'working', 'studying', 'learning', 'trying', 'thinking', 'wondering'
+        ]
+
+        # More specific name patterns (prefer these)
+        specific_name_patterns = [
+            r"my name is (\w+)",
+            r"call me (\w+)",
+            r"name's (\w+)",
+            r"i go by (\w+)",
+            r"people call me (\w+)"
+        ]
+
+        for pattern in specific_name_patterns:
+            match = re.search(pattern, text_lower)
+            if match:
+                potential_name = match.group(1).lower()
+                if potential_name not in name_blacklist and len(potential_name) > 1:
+                    keywords['name'] = potential_name.capitalize()
+                    break
+
+        # Less specific patterns (only if no specific pattern matched and still no feeling)
+        if not keywords['name']:
+            less_specific_patterns = [
+                r"i'm (\w+)",
+                r"i am (\w+)"
+            ]
+            for pattern in less_specific_patterns:
+                match = re.search(pattern, text_lower)
+                if match:
+                    potential_name = match.group(1).lower()
+                    # Be very strict with these patterns - check if it's clearly a name
+                    if (potential_name not in name_blacklist and 
+                        len(potential_name) > 2 and  # Names are usually longer
+                        not any(char.isdigit() for char in potential_name) and  # No numbers
+                        potential_name[0].isalpha()):  # Starts with letter
+                        keywords['name'] = potential_name.capitalize()
+                        break
+
+    return keywords
+
+
+SAMPLE_MESSAGES = [
+    "Hello",
+    "Hi there",
+    "My name is John",
+    "Call me Sarah",
+    "I'm Alice and I'm feeling great",
+    "i am bob",
+    "I am 25",
+    "What's the time?",
+    "What's the date?",
+    "What day is it today",
+    "Which date works for you",
+    "What is 25 + 17?",
+    "Calculate 10 * 5",
+    "What is 20 divided by 4?",
+    "I'm feeling sad",
+    "I'm stressed about work",
+    "It's my birthday today",
+    "I'm turning 25 today",
+    "I got a promotion",
+    "Your service disappoints me",
+    "This bot is terrible",
+    "Last experience was better",
+    "It used to be better",
+    "I'm good and you?",
+    "Fine, what about you?",
+    "Sorry",
+    "I apologize",
+    "You are very good",
+    "Thanks a lot, goodbye!",
+    "what the hell",
+    "hello there",
+    "shellfish is tasty",
+    "fucking hell",
+    "motherfucker",
+    "Fuck you",
+    "The weather is cloudy today.",
+    "people call me Max",
+    "name's Bond",
+    "i go by   spaces",
+    "my name is ok but call me Zed",
+    "",
+    "   ",
+    "x=y",
+    "I'M SHOUTING AT THE INDIE DIE",
+]
+
+VOCABULARY = [
+    'hello', 'hi', 'shell', 'hell', 'what', "what's", 'the', 'date', 'time', 'day', 'is', 'it',
+    'which', 'my', 'name', "name's", 'call', 'me', 'i', "i'm", 'am', 'go', 'by', 'people',
+    'fuck', 'fucking', 'you', 'your', 'service', 'bot', 'this', 'not', 'helpful', 'sad',
+    'happy', 'ok', 'okay', 'down', 'birthday', 'turning', '25', '+', '3', '*', '/', '=',
+    'sorry', 'thanks', 'bye', 'later', 'was', 'better', 'experience', 'and', 'about', '?',
+    'good', 'great', 'are', 'very', 'die', 'shut', 'up', 'John', 'x1', 'calculate',
+]
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    """The compiled matcher must reproduce the original keyword dict exactly."""
+
+    def setUp(self):
+        self.matcher = KeywordMatcher()
+
+    def test_sample_messages_match_legacy(self):
+        for message in SAMPLE_MESSAGES:
+            self.assertEqual(
+                self.matcher.match(message), legacy_extract_keywords(message),
+                f"Keyword mismatch for: '{message}'"
+            )
+
+    def test_random_messages_match_legacy(self):
+        rng = random.Random(1234)
+        for _ in range(3000):
+            words = rng.choices(VOCABULARY, k=rng.randint(1, 12))
+            separator = rng.choice([' ', '', ' ', '  '])
+            message = separator.join(words)
+            self.assertEqual(
+                self.matcher.match(message), legacy_extract_keywords(message),
+                f"Keyword mismatch for: '{message}'"
+            )
+
+    def test_module_level_helper(self):
+        keywords = extract_keywords("My name is John")
+        self.assertEqual(keywords['name'], "John")
+        self.assertTrue(keywords['needs_calc'] is False)
+
+
+if __name__ == '__main__':
+    unittest.main()
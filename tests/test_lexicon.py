@@ -0,0 +1,134 @@
+import unittest
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import lexicon module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+import lexicon
+
+
+class TestLexiconSnapshot(unittest.TestCase):
+    """Test cases for the precompiled lexicon snapshot."""
+
+    def setUp(self):
+        """Set up a private snapshot path and a copy of the lexicon sources."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.snapshot_path = os.path.join(self.temp_dir, 'cache', 'vader_lexicon.json')
+        self.stock = SentimentIntensityAnalyzer()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_snapshot_matches_stock_lexicon(self):
+        """Test that both a fresh build and a snapshot load match stock VADER."""
+        built = lexicon.load_lexicons(self.snapshot_path)
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        loaded = lexicon.load_lexicons(self.snapshot_path)
+
+        for lexicon_dict, emojis in (built, loaded):
+            self.assertEqual(lexicon_dict, self.stock.lexicon)
+            self.assertEqual(emojis, self.stock.emojis)
+
+    def test_snapshot_rebuilt_when_sources_change(self):
+        """Test that editing a lexicon file invalidates the snapshot."""
+        data_dir = os.path.join(self.temp_dir, 'vader')
+        os.makedirs(data_dir)
+        for name in (lexicon.LEXICON_FILE, lexicon.EMOJI_FILE):
+            shutil.copy(os.path.join(lexicon.vader_data_dir(), name), data_dir)
+
+        lexicon.load_lexicons(self.snapshot_path, data_dir=data_dir)
+        with open(os.path.join(data_dir, lexicon.LEXICON_FILE), 'a', encoding='utf-8') as f:
+            f.write("\nchatbotastic\t3.1\t0.3\t[3, 3, 3]")
+
+        words, _ = lexicon.load_lexicons(self.snapshot_path, data_dir=data_dir)
+        self.assertEqual(words["chatbotastic"], 3.1)
+
+    def test_corrupt_snapshot_is_ignored(self):
+        """Test that an unreadable snapshot falls back to the text files."""
+        os.makedirs(os.path.dirname(self.snapshot_path))
+        with open(self.snapshot_path, 'wb') as f:
+            f.write(b"not json")
+
+        words, _ = lexicon.load_lexicons(self.snapshot_path)
+        self.assertEqual(words, self.stock.lexicon)
+
+    def test_snapshot_never_runs_code(self):
+        """Test that a pickle planted at the snapshot path is not unpickled."""
+        import pickle
+
+        marker = os.path.join(self.temp_dir, 'ran')
+
+        class Payload:
+            def __reduce__(self):
+                return (open, (marker, 'w'))
+
+        os.makedirs(os.path.dirname(self.snapshot_path))
+        with open(self.snapshot_path, 'wb') as f:
+            pickle.dump(Payload(), f)
+
+        words, _ = lexicon.load_lexicons(self.snapshot_path)
+        self.assertEqual(words, self.stock.lexicon)
+        self.assertFalse(os.path.exists(marker))
+
+    def test_load_vader_scores_like_stock(self):
+        """Test that the snapshot-backed analyzer scores exactly like stock VADER."""
+        with patch.dict(os.environ, {lexicon.SNAPSHOT_ENV: self.snapshot_path}):
+            analyzer = lexicon.load_vader()
+
+        for text in ("I love this!", "Not bad at all", "Today SUX! 😁", "The food was good, but slow."):
+            self.assertEqual(analyzer.polarity_scores(text), self.stock.polarity_scores(text))
+
+    def test_shared_lexicon_matches_stock(self):
+        """Test that the memory-mapped tables hold exactly the stock lexicons."""
+        shared_path = os.path.join(self.temp_dir, 'vader_lexicon.map')
+        words, emojis = lexicon.load_shared_lexicons(shared_path, self.snapshot_path)
+
+        self.assertIsInstance(words, lexicon.SharedTable)
+        self.assertEqual(dict(words), self.stock.lexicon)
+        self.assertEqual(dict(emojis), self.stock.emojis)
+        self.assertNotIn("chatbotastic", words)
+        self.assertNotIn(None, words)
+        self.assertIsNone(emojis.get("a"))
+        with self.assertRaises(KeyError):
+            words["chatbotastic"]
+
+    def test_shared_lexicon_rebuilt_when_stale(self):
+        """Test that a shared file built from other sources is replaced."""
+        shared_path = os.path.join(self.temp_dir, 'vader_lexicon.map')
+        lexicon.write_shared_lexicon(shared_path, {"good": 9.0}, {}, ("other", "sources"))
+
+        words, _ = lexicon.load_shared_lexicons(shared_path, self.snapshot_path)
+        self.assertEqual(words["good"], self.stock.lexicon["good"])
+        self.assertEqual(len(words), len(self.stock.lexicon))
+
+    def test_shared_vader_scores_like_stock(self):
+        """Test that VADER over the shared lexicon scores exactly like stock VADER."""
+        with patch.dict(os.environ, {lexicon.SNAPSHOT_ENV: self.snapshot_path,
+                                     lexicon.SHARED_ENV: os.path.join(self.temp_dir, 'vader_lexicon.map')}):
+            analyzer = lexicon.load_vader()
+
+        self.assertIsInstance(analyzer.lexicon, lexicon.SharedTable)
+        for text in ("I love this!", "Not bad at all", "Today SUX! 😁 💘", "The food was good, but slow.",
+                     "At least it isn't a horrible book :)", "Catch utf-8 emoji such as 💋 and 😁"):
+            self.assertEqual(analyzer.polarity_scores(text), self.stock.polarity_scores(text))
+
+    def test_import_sentiment_is_lazy(self):
+        """Test that importing sentiment does not load vaderSentiment."""
+        code = "import sys, sentiment; print('vaderSentiment' in sys.modules)"
+        output = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=os.path.abspath(os.path.join(os.path.dirname(__file__), '..')),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        self.assertEqual(output, "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
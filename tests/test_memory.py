@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import random
+
+# Add parent directory to path to import memory module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from memory import MemoryStore
+from chatbot import Chatbot
+
+
+class ReferenceStore:
+    """Plain-list model of MemoryStore: scans everything on each call."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.facts = []  # [fact, mentions, last tick] in order of first mention
+        self.tick = 0
+
+    def add(self, fact):
+        self.tick += 1
+        for entry in self.facts:
+            if entry[0] == fact:
+                entry[1] += 1
+                entry[2] = self.tick
+                return
+        if self.capacity is not None and len(self.facts) >= self.capacity:
+            self.facts.remove(min(self.facts, key=lambda entry: (entry[1], entry[2])))
+        self.facts.append([fact, 1, self.tick])
+
+    def most_common(self):
+        return [(fact, mentions) for fact, mentions, _ in sorted(self.facts, key=lambda entry: (-entry[1], -entry[2]))]
+
+
+class TestMemoryStore(unittest.TestCase):
+    """Test cases for the bounded memory store."""
+
+    def test_matches_reference(self):
+        """Test random mentions against the list model, bounded and unbounded."""
+        rng = random.Random(4)
+        for capacity in (None, 1, 3, 10):
+            store, reference = MemoryStore(capacity), ReferenceStore(capacity)
+            for _ in range(2000):
+                fact = f"fact {int(rng.paretovariate(1.2)) % 30}"
+                store.add(fact)
+                reference.add(fact)
+                self.assertEqual(store, [entry[0] for entry in reference.facts])
+            self.assertEqual(store.most_common(), reference.most_common())
+            self.assertEqual(store.most_common(2), reference.most_common()[:2])
+            for fact, mentions, tick in reference.facts:
+                self.assertIn(fact, store)
+                self.assertEqual(store.mentions(fact), mentions)
+                self.assertEqual(store.last_mentioned(fact), tick)
+            self.assertNotIn("never said", store)
+            self.assertEqual(store.mentions("never said"), 0)
+
+    def test_list_view(self):
+        """Test that the store still reads like the list it replaced."""
+        store = MemoryStore(capacity=2)
+        for fact in ("pizza", "music", "music", "hiking"):
+            store.add(fact)
+
+        self.assertEqual(store, ["music", "hiking"])
+        self.assertEqual(list(store), ["music", "hiking"])
+        self.assertEqual((store[0], store[-1], len(store)), ("music", "hiking", 2))
+        self.assertEqual(store.evicted, 1)
+        self.assertEqual(store.most_common(1), [("music", 2)])
+        with self.assertRaises(ValueError):
+            MemoryStore(capacity=0)
+
+    def test_chatbot_memory(self):
+        """Test that a long session keeps its most mentioned likes within memory_limit."""
+        chatbot = Chatbot(memory_limit=5, response_cache=False)
+        for i in range(200):
+            chatbot.process_turn("I like tea" if i % 4 == 0 else f"I like thing {i}")
+
+        likes = chatbot.conversation_memory['likes']
+        self.assertEqual(len(likes), 5)
+        self.assertEqual(likes.most_common(1), [("tea", 50)])
+        self.assertLessEqual(len(chatbot.discussed_topics), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
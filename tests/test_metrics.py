@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add parent directory to path to import metrics module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from metrics import Metrics, Histogram, CHATBOT_STAGES, profile_session
+from chatbot import Chatbot
+from sentiment import SentimentAnalyzer
+
+
+SCRIPT = [
+    "hello", "My name is Alice", "I'm feeling stressed", "What is 12 plus 7", "What is 2 ** 3?",
+    "What's the time now?", "How do computers learn languages?", "The garden looks lovely in spring",
+    "thank you", "Sorry about that", "ok", "bye",
+]
+
+
+class TestHistogram(unittest.TestCase):
+    """Test cases for the fixed-bucket histogram."""
+
+    def test_buckets_and_quantiles(self):
+        """Test that values land in the right buckets and quantiles use their bounds."""
+        histogram = Histogram(bounds=(0.001, 0.01, 0.1))
+        for value in [0.0005] * 50 + [0.005] * 45 + [0.05] * 4 + [5.0]:
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 100)
+        self.assertEqual(snapshot["buckets"], {"0.001": 50, "0.01": 95, "0.1": 99, "+Inf": 100})
+        self.assertEqual(snapshot["p50"], 0.001)
+        self.assertEqual(snapshot["p95"], 0.01)
+        self.assertEqual(snapshot["p99"], 0.1)
+        self.assertEqual(histogram.quantile(1.0), float("inf"))
+        self.assertIsNone(Histogram().quantile(0.5))
+
+
+class TestPipelineMetrics(unittest.TestCase):
+    """Test cases for chatbot instrumentation and the exports."""
+
+    def setUp(self):
+        """Run the script through an instrumented and a plain chatbot."""
+        self.metrics = Metrics()
+        # Cached replies skip the keyword stage, so the instrumented one runs uncached
+        self.chatbot = Chatbot(metrics=self.metrics, response_cache=False)
+        self.plain = Chatbot()
+        self.intents = []
+        for message in SCRIPT:
+            instrumented = self.chatbot.process_turn(message)
+            self.intents.append(self.chatbot.last_intent)
+            self.assertEqual(instrumented, self.plain.process_turn(message))
+
+    def test_stages_and_intents_recorded(self):
+        """Test that every stage is timed and replies are counted by answering branch."""
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["stages"]["turn"]["count"], len(SCRIPT))
+        self.assertEqual(snapshot["stages"]["sentiment"]["count"], len(SCRIPT))
+        self.assertEqual(snapshot["stages"]["keywords"]["count"], len(SCRIPT))
+        self.assertEqual(set(snapshot["stages"]), set(CHATBOT_STAGES))
+        self.assertEqual(snapshot["stages"]["calculation"]["count"], 2)
+
+        expected = {}
+        for intent in self.intents:
+            expected[intent] = expected.get(intent, 0) + 1
+        self.assertEqual(snapshot["counters"]["responses"], expected)
+        self.assertEqual(self.intents[:4], ["greeting", "name", "feeling", "calc"])
+        self.assertIn("time", self.intents)
+        self.assertIn("fallback", self.intents)
+        json.dumps(snapshot)
+
+    def test_uninstrumented_chatbot_is_untouched(self):
+        """Test that without metrics no wrapper is installed."""
+        for name in CHATBOT_STAGES.values():
+            self.assertNotIn(name, vars(self.plain))
+        # Instrumenting twice does not wrap twice
+        self.metrics.instrument_chatbot(self.chatbot)
+        self.chatbot.generate_response("hello")
+        self.assertEqual(self.metrics.snapshot()["stages"]["response"]["count"], len(SCRIPT) + 1)
+
+    def test_prometheus_text(self):
+        """Test the Prometheus exposition format."""
+        text = self.metrics.prometheus()
+        lines = text.splitlines()
+        self.assertIn("# TYPE chatbot_stage_seconds histogram", lines)
+        self.assertIn(f'chatbot_stage_seconds_count{{stage="turn"}} {len(SCRIPT)}', lines)
+        self.assertIn(f'chatbot_stage_seconds_bucket{{stage="turn",le="+Inf"}} {len(SCRIPT)}', lines)
+        self.assertIn("# TYPE chatbot_responses_total counter", lines)
+        self.assertIn('chatbot_responses_total{intent="greeting"} 1', lines)
+        self.assertTrue(text.endswith("\n"))
+        self.assertEqual(Metrics().prometheus(), "")
+
+    def test_analyzer_instrumentation(self):
+        """Test timing a standalone analyzer."""
+        analyzer = self.metrics.instrument_analyzer(SentimentAnalyzer(cache_entries=0))
+        self.metrics.instrument_analyzer(analyzer)
+        analyzer.analyze_message("I love this")
+        analyzer.analyze_message("")
+        self.assertEqual(self.metrics.snapshot()["stages"]["polarity_scores"]["count"], 1)
+
+    def test_profile_session(self):
+        """Test the cProfile capture of a scripted session."""
+        stats_path = os.path.join(tempfile.mkdtemp(), "session.prof")
+        chatbot = Chatbot()
+        report = profile_session(SCRIPT, chatbot, limit=10, stats_path=stats_path)
+        self.assertIn("process_turn", report)
+        self.assertEqual(chatbot.turn_count, len(SCRIPT))
+        self.assertTrue(os.path.getsize(stats_path) > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import sys
+import os
+import io
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import replay module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import replay
+
+
+class TestSyntheticTraffic(unittest.TestCase):
+    """Test cases for the seeded synthetic sessions."""
+
+    def test_deterministic(self):
+        """Test that a seed fixes the sessions, whatever their number."""
+        sessions = replay.synthetic_sessions(sessions=5, turns=20, seed=7)
+        self.assertEqual(sessions, replay.synthetic_sessions(sessions=5, turns=20, seed=7))
+        self.assertEqual(sessions[:3], replay.synthetic_sessions(sessions=3, turns=20, seed=7))
+        self.assertNotEqual(sessions, replay.synthetic_sessions(sessions=5, turns=20, seed=8))
+        self.assertEqual([len(messages) for messages in sessions], [20] * 5)
+
+    def test_mix(self):
+        """Test mix parsing and that only the kinds with weight are generated."""
+        self.assertEqual(replay.parse_mix("calc=2, rant=0.5"), {"calc": 2.0, "rant": 0.5})
+        for spec in ("calc=2,poetry=1", "calc=x", "calc=-1", "calc=0"):
+            with self.assertRaises(ValueError, msg=spec):
+                replay.parse_mix(spec)
+
+        sessions = replay.synthetic_sessions(sessions=3, turns=30, mix={"calc": 1, "greeting": 0}, seed=1)
+        self.assertTrue(all(message.startswith("What is ") for messages in sessions for message in messages))
+        rants = replay.synthetic_sessions(sessions=1, turns=5, mix={"rant": 1})[0]
+        self.assertTrue(all(len(message.split()) > 40 for message in rants))
+
+
+class TestReplay(unittest.TestCase):
+    """Test cases for driving concurrent sessions."""
+
+    def test_thread_and_process_workers(self):
+        """Test that both modes play every turn and agree on the replies."""
+        sessions = replay.synthetic_sessions(sessions=6, turns=4, mix={"calc": 1, "question": 1}, seed=2)
+        sessions[0] = sessions[0][:2]  # Sessions of different lengths
+        turns = sum(len(messages) for messages in sessions)
+        reports = [replay.replay(sessions, workers=2, mode=mode, sample_every=2) for mode in replay.MODES]
+        for report in reports:
+            self.assertEqual((report["turns"], report["sessions"]), (turns, 6))
+            self.assertGreater(report["turns_per_second"], 0)
+            latency = report["latency"]
+            self.assertLessEqual(latency["p50"], latency["p90"])
+            self.assertLessEqual(latency["p99"], latency["max"])
+            self.assertEqual(sum(report["intents"].values()), turns)
+            self.assertEqual([sample["round"] for sample in report["memory"]], [2, 4])
+        self.assertEqual(reports[0]["intents"], reports[1]["intents"])
+        with self.assertRaises(ValueError):
+            replay.replay(sessions, mode="fiber")
+
+    def test_session_memory_grows_with_history(self):
+        """Test that the traced memory of one session is sampled and grows with its turns."""
+        messages = replay.synthetic_sessions(sessions=1, turns=40, seed=3)[0]
+        samples = replay.session_memory(messages, {}, sample_every=10)
+        self.assertEqual([turn for turn, _ in samples], [10, 20, 30, 40])
+        self.assertGreater(samples[-1][1], samples[0][1])
+
+    def test_transcript_main(self):
+        """Test replaying a JSONL transcript from the command line, with a JSON report."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, "chat.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                for conversation, message in [("a", "hello"), ("b", "What is 2 plus 2?"), ("a", "  I like tea  "),
+                                              ("b", ""), ("a", "bye")]:
+                    f.write(json.dumps({"conversation_id": conversation, "message": message}) + "\n")
+            self.assertEqual(replay.transcript_sessions(path), [["hello", "I like tea", "bye"], ["What is 2 plus 2?"]])
+
+            json_path = os.path.join(temp_dir, "report.json")
+            with patch("sys.stdout", new=io.StringIO()) as out:
+                self.assertEqual(replay.main([path, "--workers", "2", "--json", json_path]), 0)
+            self.assertIn("Replayed 4 turns of 2 sessions on 2 threads", out.getvalue())
+            with open(json_path, encoding="utf-8") as f:
+                report = json.load(f)
+            self.assertEqual(report["turns"], 4)
+            self.assertEqual(report["intents"]["calc"], 1)
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,16 @@
 
 
+import json
+import random
 import unittest
 import sys
 import os
+from unittest.mock import patch
 
 # Add parent directory to path to import sentiment module
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from sentiment import SentimentAnalyzer
+from sentiment import SentimentAnalyzer, OverallSentiment, MoodTrendTracker, label_from_compound
 
 
 class TestSentimentAnalysis(unittest.TestCase):
@@ -152,6 +155,139 @@ class TestSentimentAnalysis(unittest.TestCase):
         self.assertGreaterEqual(scores['neg'], 0.0)
         self.assertLessEqual(scores['neg'], 1.0)
 
+    
+    def test_analyze_batch(self):
+        """Test that batch results match single-message analysis in input order."""
+        messages = [
+            "I am so happy and excited!",
+            "This is terrible and awful!",
+            "The cat sat on the mat.",
+            "",
+            "I love this! It's fantastic!",
+        ]
+        results = self.analyzer.analyze_batch(messages)
+        
+        self.assertEqual(len(results), len(messages))
+        for message, (label, scores) in zip(messages, results):
+            self.assertEqual(label, self.analyzer.analyze_message(message))
+            self.assertEqual(scores, self.analyzer.get_detailed_scores(message))
+    
+    def test_analyze_batch_process_pool(self):
+        """Test that the process pool path returns the same results as one process."""
+        messages = ["I am so happy!", "I hate this.", "It is 3 o'clock."] * 20
+        
+        with patch('sentiment.MIN_PARALLEL_BATCH', 0):
+            parallel = self.analyzer.analyze_batch(messages, workers=2, chunksize=7)
+        
+        self.assertEqual(parallel, self.analyzer.analyze_batch(messages, workers=1))
+
+    
+    def test_score_cache(self):
+        """Test that repeated messages are served from the cache with the same scores."""
+        analyzer = SentimentAnalyzer(cache_entries=2)
+        first = analyzer.get_detailed_scores("thanks")
+        self.assertEqual(analyzer.get_detailed_scores("  thanks "), first)
+        self.assertEqual(analyzer.analyze_message("thanks"), "Positive")
+        
+        stats = analyzer.cache_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['entries'], 1)
+        
+        analyzer.analyze_message("hi")
+        analyzer.analyze_message("I hate this.")
+        stats = analyzer.cache_stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertEqual(stats['evictions'], 1)
+    
+    def test_score_cache_disabled(self):
+        """Test that caching can be turned off without changing results."""
+        analyzer = SentimentAnalyzer(cache_entries=0)
+        self.assertIsNone(analyzer.cache_stats())
+        self.assertEqual(
+            analyzer.get_detailed_scores("I love it!"),
+            self.analyzer.get_detailed_scores("I love it!")
+        )
+
+    
+    def test_overall_sentiment_incremental(self):
+        """Test the running overall sentiment updated once per turn."""
+        overall = OverallSentiment()
+        self.assertEqual(overall.label(), "Neutral")
+        self.assertEqual(overall.compound(), 0.0)
+        
+        for message in ["I'm feeling great!", "This is wonderful!", "I love it!"]:
+            overall.add(message, self.analyzer.get_detailed_scores(message))
+        self.assertEqual(overall.label(), "Positive")
+        self.assertEqual(overall.count, 3)
+        
+        overall = OverallSentiment()
+        for message in ["I'm feeling terrible.", "This is awful.", "I hate it."]:
+            overall.add(message, self.analyzer.get_detailed_scores(message))
+        self.assertEqual(overall.label(), "Negative")
+    
+    def test_overall_sentiment_concat_mode(self):
+        """Test that concat mode reproduces analyze_overall exactly."""
+        messages = ["I'm feeling great!", "The weather is cloudy.", "I'm feeling terrible but ok"]
+        overall = OverallSentiment(mode="concat", analyzer=self.analyzer)
+        for message in messages:
+            overall.add(message, self.analyzer.get_detailed_scores(message))
+            self.assertEqual(overall.label(), self.analyzer.analyze_overall(overall._messages))
+        
+        with self.assertRaises(ValueError):
+            OverallSentiment(mode="average")
+
+    
+    def test_mood_trend_tracker_matches_get_mood_trend(self):
+        """Test that the streaming tracker gives the same verdict after every turn."""
+        rng = random.Random(42)
+        tracker = MoodTrendTracker()
+        labels = []
+        for _ in range(300):
+            label = rng.choice(["Positive", "Negative", "Neutral"])
+            labels.append(label)
+            tracker.add(label)
+            self.assertEqual(tracker.trend(), self.analyzer.get_mood_trend(labels))
+    
+    def test_mood_trend_tracker_windows(self):
+        """Test the rolling window average and EMA of compound scores."""
+        tracker = MoodTrendTracker(window=2, ema_alpha=0.5)
+        self.assertEqual(tracker.snapshot()['trend'], "consistent")
+        
+        tracker.add("Negative", -0.8)
+        tracker.add("Positive", 0.4)
+        tracker.add("Positive", 0.6)
+        
+        self.assertAlmostEqual(tracker.window_average(), 0.5)
+        self.assertAlmostEqual(tracker.ema(), 0.5 * 0.6 + 0.5 * (0.5 * 0.4 + 0.5 * -0.8))
+        self.assertEqual(tracker.snapshot()['window_label'], "Positive")
+    
+    def test_state_round_trip(self):
+        """Test that the JSON state of the accumulators continues exactly where it left off."""
+        rng = random.Random(7)
+        tracker, overall = MoodTrendTracker(window=3), OverallSentiment()
+        for _ in range(11):
+            compound = rng.uniform(-1, 1)
+            tracker.add(label_from_compound(compound), compound)
+            overall.add("", {'compound': compound})
+        restored_tracker = MoodTrendTracker.from_state(json.loads(json.dumps(tracker.to_state())))
+        restored_overall = OverallSentiment.from_state(json.loads(json.dumps(overall.to_state())))
+        for _ in range(6):
+            compound = rng.uniform(-1, 1)
+            for accumulator in (tracker, restored_tracker):
+                accumulator.add(label_from_compound(compound), compound)
+            for accumulator in (overall, restored_overall):
+                accumulator.add("", {'compound': compound})
+            self.assertEqual(restored_tracker.snapshot(), tracker.snapshot())
+            self.assertEqual(restored_overall.compound(), overall.compound())
+        
+        state = tracker.to_state()
+        for field, value in [('count', "17"), ('second', state['second'][:-1] + [2]), ('first_count', 3), ('ema', None)]:
+            with self.assertRaises(ValueError):
+                MoodTrendTracker.from_state(dict(state, **{field: value}))
+        with self.assertRaises(ValueError):
+            OverallSentiment.from_state({'mode': "incremental", 'count': True, 'valence': 0.0, 'messages': []})
+
 
 if __name__ == '__main__':
     unittest.main()
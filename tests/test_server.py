@@ -0,0 +1,219 @@
+import unittest
+import sys
+import os
+import asyncio
+import json
+import socket
+import tempfile
+import threading
+from unittest.mock import patch
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import sentiment
+from chatbot import Chatbot
+from server import ChatServer
+from metrics import Metrics
+
+
+class TestChatServer(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the line-delimited JSON chat server."""
+
+    async def asyncSetUp(self):
+        """Start a server on a free local port."""
+        self.server = ChatServer()
+        await self.server.start(host="127.0.0.1", port=0)
+        self.host, self.port = self.server.addresses()[0][:2]
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for _, writer in self.clients:
+            writer.close()
+        await self.server.close()
+
+    async def connect(self):
+        client = await asyncio.open_connection(self.host, self.port)
+        self.clients.append(client)
+        return client
+
+    async def request(self, client, payload):
+        reader, writer = client
+        writer.write((payload if isinstance(payload, str) else json.dumps(payload)).encode('utf-8') + b"\n")
+        await writer.drain()
+        return json.loads(await asyncio.wait_for(reader.readline(), timeout=10))
+
+    async def test_message_turn(self):
+        """Test that a message gets a reply with its sentiment."""
+        client = await self.connect()
+        reply = await self.request(client, {"session": "alice", "message": "I'm feeling great today!", "id": 7})
+
+        self.assertEqual(reply["session"], "alice")
+        self.assertEqual(reply["sentiment"], "Positive")
+        self.assertIn("great", reply["bot"])
+        self.assertEqual(reply["id"], 7)
+
+    async def test_sessions_are_independent(self):
+        """Test that each session keeps its own Chatbot state across connections."""
+        first, second = await self.connect(), await self.connect()
+        await self.request(first, {"session": "alice", "message": "My name is Alice"})
+        await self.request(second, {"session": "bob", "message": "I hate this so much"})
+        await self.request(second, {"session": "alice", "message": "What a lovely day"})
+
+        alice = await self.request(first, {"session": "alice", "command": "summary"})
+        self.assertEqual(alice["messages"], 2)
+        self.assertEqual(self.server.sessions.peek("alice").user_info.get("name"), "Alice")
+
+        bob = await self.request(first, {"session": "bob", "command": "end"})
+        self.assertEqual(bob["overall_sentiment"], "Negative")
+        self.assertNotIn("bob", self.server.sessions)
+
+    async def test_invalid_requests(self):
+        """Test that bad requests get an error reply and the connection stays usable."""
+        client = await self.connect()
+        self.assertIn("error", await self.request(client, "not json"))
+        self.assertIn("error", await self.request(client, [1, 2]))
+        self.assertIn("error", await self.request(client, {"message": 3}))
+        self.assertIn("error", await self.request(client, {"command": "dance"}))
+        self.assertIn("error", await self.request(client, {"session": "ghost", "command": "summary"}))
+
+        reply = await self.request(client, {"message": "hello"})
+        self.assertTrue(reply["session"].startswith("connection-"))
+
+    async def test_idle_connections_do_not_block(self):
+        """Test that an active session is served while many connections sit idle."""
+        idle = [await self.connect() for _ in range(200)]
+        active = await self.connect()
+        for turn in range(3):
+            reply = await self.request(active, {"session": "busy", "message": f"What is {turn} + 2?"})
+            self.assertEqual(reply["bot"], f"The answer is {turn + 2}.")
+        self.assertEqual(len(idle), 200)
+
+    async def test_metrics_command(self):
+        """Test that the metrics command reports the shared pipeline metrics."""
+        client = await self.connect()
+        self.assertIn("error", await self.request(client, {"command": "metrics"}))
+
+        # A fresh shared analyzer, so it is instrumented with this server's metrics
+        with patch.object(sentiment, '_analyzer', None):
+            server = ChatServer(metrics=Metrics())
+            await server.start(host="127.0.0.1", port=0)
+            try:
+                client = await asyncio.open_connection(*server.addresses()[0][:2])
+                self.clients.append(client)
+                await self.request(client, {"session": "a", "message": "hello"})
+                await self.request(client, {"session": "b", "message": "What is 2 + 2?"})
+                reply = await self.request(client, {"command": "metrics"})
+                self.assertEqual(reply["metrics"]["stages"]["turn"]["count"], 2)
+                self.assertEqual(reply["metrics"]["stages"]["polarity_scores"]["count"], 2)
+                self.assertEqual(reply["metrics"]["counters"]["responses"], {"greeting": 1, "calc": 1})
+                text = (await self.request(client, {"command": "metrics", "format": "prometheus"}))["prometheus"]
+                self.assertIn('chatbot_responses_total{intent="calc"} 1', text)
+            finally:
+                await server.close()
+
+    async def test_running_turns_keep_their_session(self):
+        """Test that eviction and "end" never drop a session under a running or queued turn."""
+        gate = threading.Event()
+        process_turn = Chatbot.process_turn
+
+        def slow_turn(chatbot, message):
+            if message == "wait for me":
+                gate.wait(10)
+            return process_turn(chatbot, message)
+
+        server = ChatServer(max_sessions=1)
+        await server.start(host="127.0.0.1", port=0)
+        try:
+            clients = []
+            for _ in range(4):
+                clients.append(await asyncio.open_connection(*server.addresses()[0][:2]))
+            self.clients.extend(clients)
+            with patch.object(Chatbot, 'process_turn', slow_turn):
+                slow = asyncio.create_task(self.request(clients[0], {"session": "alice", "message": "wait for me"}))
+                await asyncio.sleep(0.1)
+                # Would evict alice (max_sessions=1) while her turn runs
+                await self.request(clients[1], {"session": "bob", "message": "hello"})
+                queued = asyncio.create_task(
+                    self.request(clients[2], {"session": "alice", "message": "My name is Alice"}))
+                await asyncio.sleep(0.1)
+                end = asyncio.create_task(self.request(clients[3], {"session": "alice", "command": "end"}))
+                await asyncio.sleep(0.1)
+                after_end = asyncio.create_task(self.request(clients[1], {"session": "alice", "message": "hi again"}))
+                await asyncio.sleep(0.1)
+                gate.set()
+                await asyncio.gather(slow, queued, after_end)
+
+            self.assertEqual((await end)["messages"], 2)
+            self.assertEqual(server.sessions.peek("alice").turn_count, 1)
+            self.assertNotIn("bob", server.sessions)
+        finally:
+            gate.set()
+            await server.close()
+
+    async def test_worker_processes(self):
+        """Test that sessions served from worker processes keep their state per session."""
+        server = ChatServer(workers=2)
+        await server.start(host="127.0.0.1", port=0)
+        try:
+            client = await asyncio.open_connection(*server.addresses()[0][:2])
+            self.clients.append(client)
+            await self.request(client, {"session": "alice", "message": "My name is Alice"})
+            await self.request(client, {"session": "bob", "message": "I hate this so much"})
+            reply = await self.request(client, {"session": "alice", "message": "What is my name?", "id": 3})
+            self.assertIn("Alice", reply["bot"])
+            self.assertEqual((reply["session"], reply["id"]), ("alice", 3))
+
+            bob = await self.request(client, {"session": "bob", "command": "end"})
+            self.assertEqual((bob["messages"], bob["overall_sentiment"]), (1, "Negative"))
+            self.assertIn("error", await self.request(client, {"session": "bob", "command": "summary"}))
+            self.assertIn("error", await self.request(client, {"command": "metrics"}))
+        finally:
+            await server.close()
+
+    async def test_worker_routing_leaves_the_loop_free(self):
+        """Test that the event loop keeps serving while routing to the workers waits for a rebalance."""
+        server = ChatServer(workers=1)
+        await server.start(host="127.0.0.1", port=0)
+        held, release = threading.Event(), threading.Event()
+
+        def rebalance():
+            # Holds the routing lock the way add_worker/remove_worker do while sessions move
+            with server.pool._route_lock:
+                held.set()
+                release.wait(10)
+
+        thread = threading.Thread(target=rebalance)
+        thread.start()
+        try:
+            held.wait(10)
+            client = await asyncio.open_connection(*server.addresses()[0][:2])
+            self.clients.append(client)
+            turn = asyncio.create_task(self.request(client, {"session": "alice", "message": "What is 2 + 2?"}))
+            await asyncio.sleep(0.2)
+            self.assertFalse(turn.done())
+            release.set()
+            self.assertEqual((await turn)["bot"], "The answer is 4.")
+        finally:
+            release.set()
+            thread.join()
+            await server.close()
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets not available")
+    async def test_unix_socket(self):
+        """Test serving on a Unix socket."""
+        path = os.path.join(tempfile.mkdtemp(), "chat.sock")
+        server = ChatServer()
+        await server.start(unix_path=path)
+        try:
+            client = await asyncio.open_unix_connection(path)
+            self.clients.append(client)
+            reply = await self.request(client, {"session": "unix", "message": "hello"})
+            self.assertEqual(reply["session"], "unix")
+        finally:
+            client[1].close()
+            await server.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
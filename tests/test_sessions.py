@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import sessions module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chatbot import Chatbot
+from sessions import SessionManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionManager(unittest.TestCase):
+    """Test cases for session eviction and bounded per-session state."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+        self.evictions = []
+        self.manager = SessionManager(
+            max_sessions=3, idle_ttl=60, history_limit=4, memory_limit=2, clock=self.clock,
+            on_evict=lambda session_id, chatbot, reason: self.evictions.append((session_id, reason))
+        )
+
+    def test_lru_eviction(self):
+        """Test that the least recently used session is evicted past max_sessions."""
+        alice = self.manager.get("alice")
+        self.manager.get("bob")
+        self.manager.get("carol")
+        self.assertIs(self.manager.get("alice"), alice)
+
+        self.manager.get("dave")
+        self.assertEqual(len(self.manager), 3)
+        self.assertNotIn("bob", self.manager)
+        self.assertIn("alice", self.manager)
+        self.assertEqual(self.evictions, [("bob", "lru")])
+
+    def test_idle_ttl(self):
+        """Test that only sessions idle longer than the TTL expire."""
+        self.manager.get("alice")
+        self.clock.now = 30
+        self.manager.get("bob")
+        self.clock.now = 61
+        self.assertEqual(self.manager.expire(), 1)
+        self.assertNotIn("alice", self.manager)
+        self.assertIn("bob", self.manager)
+
+        self.clock.now = 100
+        self.manager.get("bob")
+        self.clock.now = 150
+        self.assertEqual(self.manager.expire(), 0)
+        self.assertEqual(self.manager.stats()["expired"], 1)
+
+    def test_pinned_sessions_are_kept(self):
+        """Test that sessions in use are skipped by eviction and expiry until unpinned."""
+        self.manager.get("alice", pin=True)
+        self.manager.get("bob", pin=True)
+        self.manager.get("bob", pin=True)
+        self.manager.get("carol")
+        self.manager.get("dave")
+        self.manager.get("erin", pin=True)
+        self.assertEqual(self.evictions, [("carol", "lru"), ("dave", "lru")])
+
+        # Every session is pinned: the cap is exceeded until one is unpinned
+        self.manager.get("frank")
+        self.assertEqual(len(self.manager), 4)
+        self.manager.unpin("erin")
+        self.assertEqual(self.manager.ids(), ["alice", "bob", "frank"])
+        self.assertEqual(self.evictions[-1], ("erin", "lru"))
+
+        self.clock.now = 100
+        self.assertEqual(self.manager.expire(), 1)
+        self.assertEqual(self.manager.ids(), ["alice", "bob"])
+        self.manager.unpin("alice")
+        self.manager.unpin("bob")
+        self.assertEqual(self.manager.expire(), 1)
+        self.assertEqual(self.manager.ids(), ["bob"])
+        self.manager.unpin("bob")
+        self.assertEqual(self.manager.expire(), 1)
+        self.assertEqual(len(self.manager), 0)
+
+    def test_get_without_create(self):
+        """Test that peek/get(create=False) never create sessions."""
+        self.assertIsNone(self.manager.get("ghost", create=False))
+        self.assertIsNone(self.manager.peek("ghost"))
+        self.assertEqual(len(self.manager), 0)
+        self.assertIsNone(self.manager.remove("ghost"))
+
+    def test_history_ring_buffer_keeps_aggregates(self):
+        """Test that evicting old turns leaves counts, overall sentiment and trend intact."""
+        messages = [
+            "I love this so much!", "This is wonderful", "Great job, thanks!",
+            "This is terrible", "I hate waiting", "Awful, just awful", "What time is it?",
+        ]
+        bounded = self.manager.get("alice")
+        unbounded = Chatbot()
+        for message in messages:
+            bounded.process_turn(message)
+            unbounded.process_turn(message)
+
+        self.assertEqual(len(bounded.conversation_history), 4)
+        self.assertEqual(bounded.conversation_history[0]["user"], messages[3])
+        self.assertEqual(bounded.summary(), unbounded.summary())
+        self.assertEqual(bounded.summary()["messages"], len(messages))
+        self.assertEqual(bounded.summary()["mood_trend"], "declining")
+
+    def test_memory_lists_are_bounded(self):
+        """Test that likes and topics stay bounded, dropping the least mentioned items first."""
+        chatbot = self.manager.get("alice")
+        for item in ("pizza", "music", "hiking", "music"):
+            chatbot.process_turn(f"I like {item}")
+
+        self.assertEqual(chatbot.conversation_memory["likes"], ["music", "hiking"])
+        self.assertLessEqual(len(chatbot.discussed_topics), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import pickle
+import shutil
+import tempfile
+
+# Add parent directory to path to import shards module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shards import HashRing, ShardedSessions
+from chatbot import Chatbot
+from turnlog import TurnLog
+
+
+class TestHashRing(unittest.TestCase):
+    """Test cases for consistent-hash routing."""
+
+    def test_adding_a_node_moves_its_share(self):
+        """Test that routing is stable and a fifth node only takes about a fifth of the keys."""
+        keys = [f"session-{i}" for i in range(2000)]
+        ring = HashRing(range(4))
+        before = {key: ring.node_for(key) for key in keys}
+        self.assertEqual(before, {key: HashRing(range(4)).node_for(key) for key in keys})
+        self.assertEqual(set(before.values()), {0, 1, 2, 3})
+
+        ring.add(4)
+        after = {key: ring.node_for(key) for key in keys}
+        moved = [key for key in keys if after[key] != before[key]]
+        self.assertTrue(all(after[key] == 4 for key in moved))
+        self.assertTrue(0.1 < len(moved) / len(keys) < 0.3, len(moved))
+
+        ring.remove(4)
+        self.assertEqual({key: ring.node_for(key) for key in keys}, before)
+        with self.assertRaises(ValueError):
+            ring.add(0)
+        with self.assertRaises(ValueError):
+            HashRing().node_for("alice")
+
+
+class TestChatbotSnapshot(unittest.TestCase):
+    """Test cases for handing a session over as a snapshot."""
+
+    def test_round_trip(self):
+        """Test that a restored session picks up where the original left off."""
+        chatbot = Chatbot(response_cache=False)
+        for message in ("Hello there", "My name is Alice", "I like tea", "I love hiking in the mountains"):
+            chatbot.process_turn(message)
+
+        restored = Chatbot.from_snapshot(pickle.loads(pickle.dumps(chatbot.snapshot())))
+        self.assertEqual(restored.summary(), chatbot.summary())
+        self.assertEqual(restored.user_info, {"name": "Alice"})
+        self.assertEqual(restored.conversation_memory['likes'], ["tea", "hiking in the mountains"])
+        self.assertEqual(restored.process_turn("What is my name?")["bot"],
+                         chatbot.process_turn("What is my name?")["bot"])
+
+    def test_logged_session_refuses(self):
+        """Test that a session with a turn log cannot be snapshotted."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with TurnLog(os.path.join(temp_dir, "chat.jsonl")) as log:
+                chatbot = Chatbot(log=log)
+                with self.assertRaises(ValueError):
+                    chatbot.snapshot()
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestShardedSessions(unittest.TestCase):
+    """Test cases for sessions spread over worker processes."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ShardedSessions(workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_sessions_survive_rebalancing(self):
+        """Test that sessions keep their state when workers join and leave."""
+        names = {f"user-{i}": f"{chr(65 + i)}lex" for i in range(20)}
+        for session_id, name in names.items():
+            self.pool.process_turn(session_id, f"My name is {name}")
+        owners = {session_id: self.pool.worker_for(session_id) for session_id in names}
+
+        moved_before = self.pool.moved
+        new_worker = self.pool.add_worker()
+        moved = [session_id for session_id in names if self.pool.worker_for(session_id) != owners[session_id]]
+        self.assertTrue(all(self.pool.worker_for(session_id) == new_worker for session_id in moved))
+        self.assertGreaterEqual(self.pool.moved - moved_before, len(moved))
+
+        self.assertGreater(self.pool.remove_worker(owners["user-0"]), 0)
+        self.assertEqual(len(self.pool), 2)
+        for session_id, name in names.items():
+            self.assertIn(name, self.pool.process_turn(session_id, "What is my name?")["bot"])
+            self.assertEqual(self.pool.summary(session_id)["messages"], 2)
+        self.assertEqual(sum(stats["sessions"] for stats in self.pool.stats()), len(names))
+
+    def test_summary_and_end(self):
+        """Test turns and summaries through the pool, and that end forgets the session."""
+        reply = self.pool.process_turn("carol", "I'm feeling great today!")
+        self.assertEqual(reply["sentiment"], "Positive")
+        self.assertEqual(set(reply), {"bot", "sentiment", "scores"})
+
+        self.assertEqual(self.pool.summary("carol", end=True)["messages"], 1)
+        self.assertIsNone(self.pool.summary("carol"))
+        self.assertIsNone(self.pool.summary("never-seen"))
+
+        with self.assertRaises(ValueError):
+            self.pool.remove_worker(99)
+
+    def test_last_worker_stays(self):
+        """Test that the only worker cannot be removed and a closed pool refuses turns."""
+        with ShardedSessions(workers=1) as pool:
+            with self.assertRaises(ValueError):
+                pool.remove_worker(pool.ring.nodes[0])
+        with self.assertRaises(RuntimeError):
+            pool.process_turn("dave", "hello")
+
+
+if __name__ == '__main__':
+    unittest.main()
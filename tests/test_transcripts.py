@@ -0,0 +1,191 @@
+import unittest
+import sys
+import os
+import csv
+import json
+import random
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import transcripts module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import transcripts
+from sentiment import SentimentAnalyzer, OverallSentiment, MoodTrendTracker
+from utils import clean_input
+
+
+MESSAGES = ["hi", "I love this!", "This is terrible", "What time is it?", "thanks  so much ",
+            "I hate waiting", "ok", "great job", "Not bad at all", "", "Über cool 😁"]
+
+
+class TestTranscriptScoring(unittest.TestCase):
+    """Test cases for offline transcript scoring."""
+
+    def setUp(self):
+        """Write a small transcript in JSONL and CSV form."""
+        self.temp_dir = tempfile.mkdtemp()
+        rng = random.Random(5)
+        self.records = []
+        for conversation in range(40):
+            for _ in range(rng.randint(1, 12)):
+                self.records.append((str(conversation), rng.choice(MESSAGES)))
+
+        self.jsonl_path = os.path.join(self.temp_dir, "in.jsonl")
+        with open(self.jsonl_path, "w", encoding="utf-8") as f:
+            for conversation, message in self.records:
+                f.write(json.dumps({"conversation_id": conversation, "message": message}) + "\n")
+        self.csv_path = os.path.join(self.temp_dir, "in.csv")
+        with open(self.csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["conversation_id", "message"])
+            writer.writerows(self.records)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def path(self, name):
+        return os.path.join(self.temp_dir, name)
+
+    def read_jsonl(self, path):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def expected(self):
+        """Score the records one by one the way the chatbot does."""
+        analyzer = SentimentAnalyzer(cache_entries=0)
+        rows, conversations = [], {}
+        for number, (conversation, message) in enumerate(self.records, 1):
+            label, scores = analyzer.score_message(clean_input(message))
+            rows.append({"record": number, "conversation": conversation, "label": label,
+                         "compound": scores["compound"], "pos": scores["pos"],
+                         "neu": scores["neu"], "neg": scores["neg"]})
+            overall, tracker = conversations.setdefault(conversation, (OverallSentiment(), MoodTrendTracker()))
+            overall.add(message, scores)
+            tracker.add(label, scores["compound"])
+        summaries = [{"conversation": conversation, "messages": overall.count,
+                      "overall_sentiment": overall.label(), "mood_trend": tracker.trend()}
+                     for conversation, (overall, tracker) in conversations.items()]
+        return rows, summaries
+
+    def test_scores_match_score_message(self):
+        """Test per-message and per-conversation output against direct scoring."""
+        rows, summaries = self.expected()
+        stats = transcripts.score_transcripts(self.jsonl_path, self.path("out.jsonl"), workers=1, chunk_size=7)
+
+        self.assertEqual(self.read_jsonl(self.path("out.jsonl")), rows)
+        self.assertEqual(self.read_jsonl(self.path("out.conversations.jsonl")), summaries)
+        self.assertEqual(stats["messages"], len(rows))
+        self.assertLessEqual(stats["scored"], len(MESSAGES))
+        self.assertFalse(os.path.exists(self.path("out.jsonl.checkpoint")))
+
+    def test_csv_grouped_and_parallel(self):
+        """Test CSV in and out, grouped conversations and the process pool."""
+        rows, summaries = self.expected()
+        transcripts.score_transcripts(self.csv_path, self.path("out.csv"), workers=2, chunk_size=5,
+                                      grouped=True, dedupe_entries=0)
+
+        with open(self.path("out.csv"), encoding="utf-8") as f:
+            output = list(csv.DictReader(f))
+        self.assertEqual([row["label"] for row in output], [row["label"] for row in rows])
+        self.assertEqual([float(row["compound"]) for row in output], [row["compound"] for row in rows])
+        with open(self.path("out.conversations.csv"), encoding="utf-8") as f:
+            self.assertEqual([row["overall_sentiment"] for row in csv.DictReader(f)],
+                             [summary["overall_sentiment"] for summary in summaries])
+
+    def test_resume_after_interruption(self):
+        """Test that a run interrupted mid-way resumes to the same output."""
+        rows, summaries = self.expected()
+        output = self.path("out.jsonl")
+        self.interrupted_run(output)
+        self.assertTrue(os.path.exists(output + ".checkpoint"))
+
+        stats = transcripts.score_transcripts(self.jsonl_path, output, workers=1, chunk_size=4, resume=True)
+        self.assertEqual(self.read_jsonl(output), rows)
+        self.assertEqual(self.read_jsonl(self.path("out.conversations.jsonl")), summaries)
+        self.assertGreater(stats["resumed_at"], 0)
+        self.assertEqual(stats["messages"], len(rows))
+
+    def test_open_conversations_are_capped(self):
+        """Test that interleaved conversations never keep more than the cap open."""
+        records = self.records[:]
+        random.Random(9).shuffle(records)
+        with open(self.jsonl_path, "w", encoding="utf-8") as f:
+            for conversation, message in records:
+                f.write(json.dumps({"conversation_id": conversation, "message": message}) + "\n")
+
+        open_counts = []
+        finish_idle = transcripts.ConversationAggregates.finish_idle
+
+        def counting_finish_idle(aggregates, max_open):
+            rows = finish_idle(aggregates, max_open)
+            open_counts.append(len(aggregates.open))
+            return rows
+
+        with patch.object(transcripts.ConversationAggregates, "finish_idle", counting_finish_idle):
+            stats = transcripts.score_transcripts(self.jsonl_path, self.path("out.jsonl"), workers=1,
+                                                  chunk_size=7, max_open_conversations=5)
+        summaries = self.read_jsonl(self.path("out.conversations.jsonl"))
+        self.assertEqual(max(open_counts), 5)
+        self.assertEqual(stats["conversations"], len(summaries))
+        self.assertGreater(len(summaries), 40)  # Conversations that came back after being written
+        self.assertEqual(sum(summary["messages"] for summary in summaries), len(records))
+        self.assertEqual({summary["conversation"] for summary in summaries}, {c for c, _ in records})
+
+    def interrupted_run(self, output, after=60):
+        """Run until the after-th message digest, leaving a checkpoint behind."""
+        real_digest = transcripts.message_digest
+        calls = []
+
+        def failing_digest(text):
+            calls.append(text)
+            if len(calls) == after:
+                raise KeyboardInterrupt
+            return real_digest(text)
+
+        with patch.object(transcripts, "message_digest", failing_digest):
+            with self.assertRaises(KeyboardInterrupt):
+                transcripts.score_transcripts(self.jsonl_path, output, workers=1, chunk_size=4,
+                                              checkpoint_every=1, dedupe_entries=0)
+
+    def test_resume_rejects_other_input(self):
+        """Test that a checkpoint is not applied to a different input."""
+        output = self.path("out.jsonl")
+        self.interrupted_run(output)
+        with open(self.jsonl_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"conversation_id": "late", "message": "hi"}) + "\n")
+        with self.assertRaises(ValueError):
+            transcripts.score_transcripts(self.jsonl_path, output, resume=True)
+
+    def test_checkpoint_is_plain_json(self):
+        """Test that checkpoints are JSON and that malformed ones are rejected."""
+        output = self.path("out.jsonl")
+        checkpoint = output + ".checkpoint"
+        self.interrupted_run(output)
+        with open(checkpoint, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["version"], transcripts.CHECKPOINT_VERSION)
+        self.assertTrue(data["open"])
+        transcripts.load_checkpoint(checkpoint)
+
+        bad = [b"\x80\x04K\x01.", b"[]",
+               json.dumps(dict(data, records="12")).encode("utf-8"),
+               json.dumps(dict(data, open=[[None, {"mode": "incremental"}, {}]])).encode("utf-8")]
+        for content in bad:
+            with open(checkpoint, "wb") as f:
+                f.write(content)
+            with self.assertRaises(ValueError):
+                transcripts.score_transcripts(self.jsonl_path, output, resume=True)
+
+    def test_bad_records_are_skipped(self):
+        """Test that unparseable lines and missing fields are counted, not fatal."""
+        with open(self.jsonl_path, "a", encoding="utf-8") as f:
+            f.write("not json\n[1, 2]\n{\"conversation_id\": \"x\"}\n\n")
+        stats = transcripts.score_transcripts(self.jsonl_path, self.path("out.jsonl"), workers=1)
+        self.assertEqual(stats["skipped"], 3)
+        self.assertEqual(stats["messages"], len(self.records))
+
+
+if __name__ == '__main__':
+    unittest.main()
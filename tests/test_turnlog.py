@@ -0,0 +1,138 @@
+import unittest
+import sys
+import os
+import io
+import random
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import turnlog module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chatbot import Chatbot
+from turnlog import TurnLog, INDEX_STRIDE
+from sentiment import score_message
+
+
+MESSAGES = ["hello", "My name is Alice", "I like long walks by the sea", "I am a teacher at the school",
+            "What is 12 plus 7?", "the sea was lovely today", "I'm feeling great", "thanks", "walks again?",
+            "Über cool 😁", "my dog likes the sea too", "ok"]
+
+
+class TestTurnLog(unittest.TestCase):
+    """Test cases for the append-only turn log."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "turns.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_turns(self, count, **options):
+        with TurnLog(self.path, **options) as log:
+            for i in range(count):
+                message = MESSAGES[i % len(MESSAGES)]
+                label, scores = score_message(message)
+                self.assertEqual(log.append(f"{i} {message}", f"reply {i}", label, scores), i)
+
+    def test_round_trip(self):
+        """Test every fsync policy and batch size, and reads across index strides."""
+        count = 2 * INDEX_STRIDE + 5
+        for fsync in ("none", "batch", "turn"):
+            for batch_size in (1, 7):
+                self.write_turns(count, fsync=fsync, batch_size=batch_size)
+                log = TurnLog(self.path)
+                self.assertEqual(len(log), count)
+                self.assertEqual([entry['bot'] for entry in log], [f"reply {i}" for i in range(count)])
+                self.assertEqual(log[INDEX_STRIDE + 3]['user'], f"{INDEX_STRIDE + 3} {MESSAGES[(INDEX_STRIDE + 3) % len(MESSAGES)]}")
+                self.assertEqual([entry['bot'] for entry in log[-3:]], [f"reply {i}" for i in range(count - 3, count)])
+                self.assertEqual(log[1]['scores'], score_message(MESSAGES[1])[1])
+                log.close()
+                os.remove(self.path)
+
+        with self.assertRaises(ValueError):
+            TurnLog(self.path, fsync="sometimes")
+
+    def test_reads_see_queued_turns(self):
+        """Test that reading waits for turns still queued for the writer."""
+        with TurnLog(self.path, fsync="none") as log:
+            for i in range(50):
+                log.append(str(i), "ok", "Neutral", score_message("ok")[1])
+                self.assertEqual(log[-1]['user'], str(i))
+
+    def test_recovers_torn_tail(self):
+        """Test that a torn last record is cut off and damage before it is refused."""
+        self.write_turns(10)
+        with open(self.path, "ab") as f:
+            f.write(b'{"user":"half a rec')
+        log = TurnLog(self.path)
+        self.assertEqual(len(log), 10)
+        log.append("next", "ok", "Neutral", score_message("ok")[1])
+        log.close()
+        with TurnLog(self.path) as log:
+            self.assertEqual([entry['user'] for entry in log][-2:], ["9 Über cool 😁", "next"])
+
+        with open(self.path, "rb") as f:
+            lines = f.readlines()
+        lines[3] = b'{"user": broken\n'
+        with open(self.path, "wb") as f:
+            f.writelines(lines)
+        with self.assertRaises(ValueError):
+            TurnLog(self.path)
+
+
+class TestLoggedChatbot(unittest.TestCase):
+    """Test cases for a chatbot session written to a turn log."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "session.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_restart_continues_session(self):
+        """Test that a restarted chatbot has the state of one that never stopped."""
+        rng = random.Random(3)
+        script = [rng.choice(MESSAGES) for _ in range(60)]
+        reference = Chatbot(response_cache=False)
+
+        log = TurnLog(self.path)
+        chatbot = Chatbot(response_cache=False, log=log, history_limit=8)
+        for number, message in enumerate(script):
+            if number == 40:
+                log.close()
+                log = TurnLog(self.path)
+                chatbot = Chatbot(response_cache=False, log=log, history_limit=8)
+            self.assertEqual(chatbot.process_turn(message)["bot"], reference.process_turn(message)["bot"])
+            self.assertLessEqual(len(chatbot.conversation_history), 8)
+
+        for name in ("turn_count", "sentiment_counts", "greeting_count", "user_info", "discussed_topics",
+                     "conversation_memory"):
+            self.assertEqual(getattr(chatbot, name), getattr(reference, name), name)
+        self.assertEqual(chatbot.summary(), reference.summary())
+
+        logged, unlogged = io.StringIO(), io.StringIO()
+        chatbot._display_final_summary(out=logged)
+        reference._display_final_summary(out=unlogged)
+        self.assertEqual(logged.getvalue(), unlogged.getvalue())
+        log.close()
+
+    def test_restore_reads_logged_name(self):
+        """Test that the captured name is logged with its turn and restored without parsing the message."""
+        with TurnLog(self.path) as log:
+            chatbot = Chatbot(response_cache=False, log=log)
+            for message in ("hello", "My name is Alice", "I like tea"):
+                chatbot.process_turn(message)
+        with TurnLog(self.path) as log:
+            self.assertEqual([record.get('name') for record in log.records()], [None, "Alice", None])
+            with patch.object(Chatbot, '_match_intents', side_effect=AssertionError("message parsed again")):
+                restored = Chatbot(response_cache=False, log=log)
+        self.assertEqual(restored.user_info, {"name": "Alice"})
+        self.assertEqual(restored.greeting_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import sys
+import os
+import io
+import random
+
+# Add parent directory to path to import utils module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import format_conversation_summary, write_conversation_summary
+from history import ConversationHistory
+
+
+def legacy_format_conversation_summary(conversation_history, overall_sentiment, mood_trend=None, total_messages=None):
+    """The list-and-join implementation the streaming writer replaced."""
+    if total_messages is None:
+        total_messages = len(conversation_history)
+    first_number = total_messages - len(conversation_history) + 1
+    summary_lines = ["\n" + "="*60, "CONVERSATION SUMMARY", "="*60,
+                     f"\nTotal messages: {total_messages}", f"Overall sentiment: {overall_sentiment}"]
+    if mood_trend:
+        summary_lines.append(f"Mood trend: {mood_trend}")
+    summary_lines.append("\n" + "-"*60)
+    if first_number > 1:
+        summary_lines.append(f"Message-by-Message Sentiment (Tier 2, last {len(conversation_history)}):")
+    else:
+        summary_lines.append("Message-by-Message Sentiment (Tier 2):")
+    summary_lines.append("-"*60)
+    for i, entry in enumerate(conversation_history, first_number):
+        user_msg = entry.get('user', '')
+        display_msg = user_msg[:50] + "..." if len(user_msg) > 50 else user_msg
+        summary_lines.append(f"{i}. [{entry.get('sentiment', 'Unknown')}] {display_msg}")
+    summary_lines.append("="*60 + "\n")
+    return "\n".join(summary_lines)
+
+
+SCORES = {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0}
+
+
+class TestConversationSummary(unittest.TestCase):
+    """Test cases for the streaming conversation summary writer."""
+
+    def setUp(self):
+        """Set up a history of turns with mixed labels and message lengths."""
+        rng = random.Random(7)
+        self.history = ConversationHistory()
+        for i in range(40):
+            message = f"turn {i} " + "x" * rng.randint(0, 70)
+            self.history.append(message, "reply", rng.choice(["Positive", "Negative", "Neutral"]), SCORES)
+        self.turns = [dict(entry) for entry in self.history]
+
+    def write(self, history, **options):
+        out = io.StringIO()
+        counts = write_conversation_summary(out, history, "Neutral", "stable", **options)
+        return out.getvalue(), counts
+
+    def listed_numbers(self, text):
+        return [int(line.split(".")[0]) for line in text.splitlines() if line[:1].isdigit()]
+
+    def test_default_layout_unchanged(self):
+        """Test that the default text equals the original implementation."""
+        for args in [(self.turns, "Positive", "improving"), (self.turns, "Neutral", None), ([], "Neutral", None)]:
+            self.assertEqual(format_conversation_summary(*args), legacy_format_conversation_summary(*args))
+        self.assertEqual(format_conversation_summary(self.history[30:], "Negative", "declining", total_messages=40),
+                         legacy_format_conversation_summary(self.turns[30:], "Negative", "declining", total_messages=40))
+
+    def test_distribution_counted_in_same_pass(self):
+        """Test that the distribution matches counting the turns, with or without limits."""
+        expected = {}
+        for turn in self.turns:
+            expected[turn["sentiment"]] = expected.get(turn["sentiment"], 0) + 1
+
+        text, counts = self.write(self.history)
+        self.assertEqual(counts, expected)
+        self.assertEqual(text, self.write(self.history, sentiment_counts=expected)[0])
+        self.assertTrue(text.startswith(legacy_format_conversation_summary(self.turns, "Neutral", "stable") + "\n"))
+        self.assertIn("Sentiment Distribution:\n", text)
+        self.assertEqual(self.write(self.history, head=2, tail=2)[1], expected)
+
+    def test_head_and_tail(self):
+        """Test that head/tail list only the first and last turns."""
+        text, _ = self.write(self.history, head=3, tail=2)
+        self.assertEqual(self.listed_numbers(text), [1, 2, 3, 39, 40])
+        self.assertIn("... 35 messages not shown ...", text)
+
+        self.assertEqual(self.listed_numbers(self.write(self.history, tail=4)[0]), [37, 38, 39, 40])
+        self.assertEqual(self.listed_numbers(self.write(self.history, head=2)[0]), [1, 2])
+        self.assertEqual(self.listed_numbers(self.write(self.history, head=30, tail=30)[0]), list(range(1, 41)))
+        # Numbers continue from the evicted turns
+        bounded = self.write(self.history[30:], total_messages=40, head=1, tail=1, sentiment_counts={})[0]
+        self.assertEqual(self.listed_numbers(bounded), [31, 40])
+
+    def test_pagination(self):
+        """Test that more() is asked between pages and can stop the listing."""
+        pages = []
+        text, counts = self.write(self.history, page_size=15, more=lambda: pages.append(1) or True)
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(self.listed_numbers(text), list(range(1, 41)))
+
+        text, counts = self.write(self.history, page_size=15, more=lambda: False)
+        self.assertEqual(self.listed_numbers(text), list(range(1, 16)))
+        self.assertIn("... 25 more messages not shown ...", text)
+        self.assertEqual(sum(counts.values()), 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import random
+import string
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import vader_numpy module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from sentiment import SentimentAnalyzer
+from vader_numpy import VectorizedVader, np
+
+
+WORDS = [
+    'good', 'BAD', 'not', 'very', 'VERY', 'but', 'BUT', '😁', '💘', ':)', '!', '?', 'kind', 'of',
+    'the', 'shit', 'bomb', 'no', 'least', 'at', 'never', 'so', 'this', 'without', 'doubt',
+    "isn't", 'HAPPY', 'sad', 'kinda', 'sort', 'bad', 'ass', 'yeah', 'right', 'or', 'nor',
+    'great', 'love', 'hate', 'to', 'die', 'for', 'just', 'enough', 'horrible', "don't", 'book',
+]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestVectorizedVader(unittest.TestCase):
+    """The vectorized engine must agree with stock VADER."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stock = SentimentIntensityAnalyzer()
+
+    def make_corpus(self, count=3000):
+        rng = random.Random(7)
+        corpus = ["", "   ", "VADER is VERY SMART, uber handsome, and FRIGGIN FUNNY!!!",
+                  "At least it isn't a horrible book.", "Not bad at all", "Why?? Why???"]
+        for _ in range(count):
+            words = rng.choices(WORDS, k=rng.randint(1, 14))
+            corpus.append(''.join(word + rng.choice([' ', ' ', '\t', '']) for word in words))
+        return corpus
+
+    def test_matches_stock_vader(self):
+        """Test that the default (exact_but) engine reproduces polarity_scores exactly."""
+        engine = VectorizedVader(self.stock.lexicon, self.stock.emojis)
+        corpus = self.make_corpus()
+        for message, scores in zip(corpus, engine.polarity_scores_batch(corpus)):
+            self.assertEqual(scores, self.stock.polarity_scores(message), f"Mismatch for: '{message}'")
+
+    def test_fast_but_only_differs_on_but(self):
+        """Test that the vectorized "but" rule is the only source of differences."""
+        engine = VectorizedVader(self.stock.lexicon, self.stock.emojis, exact_but=False)
+        corpus = self.make_corpus()
+        for message, scores in zip(corpus, engine.polarity_scores_batch(corpus)):
+            expected = self.stock.polarity_scores(message)
+            if 'but' not in [word.strip(string.punctuation) for word in message.lower().split()]:
+                self.assertEqual(scores, expected, f"Mismatch for: '{message}'")
+
+    def test_analyzer_numpy_engine(self):
+        """Test analyze_batch with the numpy engine against the VADER engine."""
+        analyzer = SentimentAnalyzer()
+        messages = ["I am so happy and excited!", "", "This is terrible and awful!", "The cat sat on the mat."]
+        self.assertEqual(analyzer.analyze_batch(messages, engine="numpy"), analyzer.analyze_batch(messages))
+        with self.assertRaises(ValueError):
+            analyzer.analyze_batch(messages, engine="gpu")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,566 @@
+# Offline scoring of exported transcripts (python chatbot.py score ...)
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+from sentiment import (
+    SentimentAnalyzer, OverallSentiment, MoodTrendTracker, ENGINES,
+    _init_batch_worker, _score_chunk_in_worker
+)
+from utils import clean_input
+
+
+FORMATS = ("jsonl", "csv")
+
+# Messages scored per chunk (the unit of work for the pool and of checkpoints)
+DEFAULT_CHUNK_SIZE = 2000
+
+# Distinct message hashes remembered for deduplication; bounds memory
+# (roughly 250 bytes per entry)
+DEFAULT_DEDUPE_ENTRIES = 200000
+
+# Conversations whose aggregates are kept at once (roughly 1.5 KB each plus
+# half a byte per message); the least recently active is written beyond that
+DEFAULT_MAX_OPEN_CONVERSATIONS = 10000
+
+# Chunks written between checkpoints
+DEFAULT_CHECKPOINT_EVERY = 10
+
+# Seconds between progress lines
+PROGRESS_INTERVAL = 2.0
+
+CHECKPOINT_VERSION = 2
+
+# Checkpoint fields besides the open conversations, with their JSON types
+# (the input signature and the options are compared against this run's)
+_CHECKPOINT_FIELDS = {
+    "input": list,
+    "options": list,
+    "input_offset": int,
+    "output_offset": (int, type(None)),
+    "conversations_offset": (int, type(None)),
+    "position": int,
+    "records": int,
+    "skipped": int,
+    "conversations": int,
+}
+
+SCORE_FIELDS = ("compound", "pos", "neu", "neg")
+MESSAGE_COLUMNS = ("record", "conversation", "label") + SCORE_FIELDS
+CONVERSATION_COLUMNS = ("conversation", "messages", "overall_sentiment", "mood_trend")
+
+
+def detect_format(path, fmt=None):
+    """Return "jsonl" or "csv" from an explicit format or the file extension."""
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt!r} (expected one of {FORMATS})")
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    raise ValueError(f"Cannot tell the format of {path!r}; pass --format")
+
+
+def _binary_lines(f, offsets):
+    """Yield decoded lines of a binary file, recording the offset after each one."""
+    for raw in f:
+        offsets[0] += len(raw)
+        yield raw.decode('utf-8')
+
+
+def read_records(path, fmt, text_field="message", conversation_field="conversation_id", start_offset=0):
+    """Stream (offset, conversation id, message) from a JSONL or CSV transcript.
+
+    offset is the byte position just after the record, so reading can
+    resume there. Records that cannot be parsed, or have no text field,
+    yield a message of None.
+    """
+    with open(path, 'rb') as f:
+        offsets = [0]
+        if fmt == "csv":
+            header = next(csv.reader(_binary_lines(f, offsets)), None)
+            if header is None:
+                return
+            if header and header[0].startswith('\ufeff'):
+                header[0] = header[0][1:]
+            if start_offset > offsets[0]:
+                f.seek(start_offset)
+                offsets[0] = start_offset
+            for row in csv.reader(_binary_lines(f, offsets)):
+                if not row:
+                    continue
+                record = dict(zip(header, row))
+                yield offsets[0], record.get(conversation_field), record.get(text_field)
+            return
+
+        f.seek(start_offset)
+        offsets[0] = start_offset
+        for line in _binary_lines(f, offsets):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield offsets[0], None, None
+                continue
+            if not isinstance(record, dict):
+                yield offsets[0], None, None
+                continue
+            message = record.get(text_field)
+            conversation = record.get(conversation_field)
+            yield offsets[0], None if conversation is None else str(conversation), message if isinstance(message, str) else None
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def message_digest(text):
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class DedupeCache:
+    """Bounded LRU of message hash -> (label, scores) for messages already scored.
+
+    Entries are stored as flat tuples (label plus the four scores) to keep
+    the per-message cost low.
+    """
+
+    def __init__(self, max_entries=DEFAULT_DEDUPE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, digest):
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        self._entries.move_to_end(digest)
+        return entry[0], dict(zip(SCORE_FIELDS, entry[1:]))
+
+    def put(self, digest, result):
+        if self.max_entries <= 0:
+            return
+        label, scores = result
+        self._entries[digest] = (label,) + tuple(scores[field] for field in SCORE_FIELDS)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class ConversationAggregates:
+    """Overall sentiment and mood trend per open conversation, updated per message.
+
+    Conversations are kept in order of their last message, so the least
+    recently active ones can be finished first (finish_idle).
+    """
+
+    def __init__(self, overall_mode="incremental"):
+        self.overall_mode = overall_mode
+        self.open = OrderedDict()  # conversation id -> (OverallSentiment, MoodTrendTracker)
+
+    def add(self, conversation, message, label, scores):
+        state = self.open.get(conversation)
+        if state is None:
+            state = self.open[conversation] = (OverallSentiment(mode=self.overall_mode), MoodTrendTracker())
+        else:
+            self.open.move_to_end(conversation)
+        overall, tracker = state
+        overall.add(message, scores)
+        tracker.add(label, scores['compound'])
+
+    def finish(self, conversation):
+        overall, tracker = self.open.pop(conversation)
+        return {
+            "conversation": conversation,
+            "messages": overall.count,
+            "overall_sentiment": overall.label(),
+            "mood_trend": tracker.trend(),
+        }
+
+    def finish_idle(self, max_open):
+        """Finish the least recently active conversations beyond max_open."""
+        rows = []
+        while len(self.open) > max_open:
+            rows.append(self.finish(next(iter(self.open))))
+        return rows
+
+    def finish_all(self):
+        return [self.finish(conversation) for conversation in list(self.open)]
+
+    def to_state(self):
+        """Open conversations as JSON-safe [conversation, overall, tracker] triples."""
+        return [[conversation, overall.to_state(), tracker.to_state()]
+                for conversation, (overall, tracker) in self.open.items()]
+
+    @classmethod
+    def from_state(cls, rows, overall_mode="incremental"):
+        """Rebuild from to_state(); raises ValueError if rows are malformed."""
+        aggregates = cls(overall_mode)
+        if not isinstance(rows, list):
+            raise ValueError("Malformed conversation aggregates")
+        for row in rows:
+            if not (isinstance(row, list) and len(row) == 3 and isinstance(row[0], (str, type(None)))):
+                raise ValueError("Malformed conversation aggregates")
+            overall = OverallSentiment.from_state(row[1])
+            if overall.mode != overall_mode:
+                raise ValueError("Malformed conversation aggregates")
+            aggregates.open[row[0]] = (overall, MoodTrendTracker.from_state(row[2]))
+        return aggregates
+
+
+class _RowWriter:
+    """Append rows to a JSONL or CSV file opened in binary mode (so offsets are exact)."""
+
+    def __init__(self, path, columns, resume_offset=None):
+        self.fmt = detect_format(path)
+        self.columns = columns
+        if resume_offset is None:
+            self.file = open(path, 'wb')
+            if self.fmt == "csv":
+                self._write_csv(columns)
+        else:
+            self.file = open(path, 'r+b')
+            self.file.truncate(resume_offset)
+            self.file.seek(resume_offset)
+
+    def _write_csv(self, values):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(values)
+        self.file.write(buffer.getvalue().encode('utf-8'))
+
+    def write(self, row):
+        if self.fmt == "csv":
+            self._write_csv([row[column] for column in self.columns])
+        else:
+            self.file.write(json.dumps(row, ensure_ascii=False).encode('utf-8') + b"\n")
+
+    def flush(self):
+        self.file.flush()
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def input_signature(path):
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def load_checkpoint(path):
+    """Read a checkpoint written by save_checkpoint; raises ValueError if it is not one.
+
+    Checkpoints are plain JSON and every field is type-checked, so a planted
+    or corrupted file is rejected instead of running code or resuming from
+    nonsense.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except ValueError:
+        raise ValueError(f"Checkpoint {path} is not valid JSON") from None
+    if not isinstance(data, dict) or data.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint {path} is not a version {CHECKPOINT_VERSION} checkpoint")
+
+    state = {"version": CHECKPOINT_VERSION}
+    for field, types in _CHECKPOINT_FIELDS.items():
+        value = data.get(field)
+        if not isinstance(value, types) or isinstance(value, bool) or (isinstance(value, int) and value < 0):
+            raise ValueError(f"Checkpoint {path} has a bad {field!r} field")
+        state[field] = value
+    try:
+        state["aggregates"] = ConversationAggregates.from_state(data.get("open"))
+    except ValueError as e:
+        raise ValueError(f"Checkpoint {path}: {e}") from None
+    return state
+
+
+def save_checkpoint(path, state):
+    """Write state atomically as JSON, with each open conversation's aggregates field by field."""
+    data = {"version": CHECKPOINT_VERSION}
+    data.update((field, state[field]) for field in _CHECKPOINT_FIELDS)
+    data["open"] = state["aggregates"].to_state()
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def default_conversations_path(output_path):
+    root, extension = os.path.splitext(output_path)
+    return f"{root}.conversations{extension}"
+
+
+def score_transcripts(input_path, output_path, conversations_path=None, fmt=None,
+                      text_field="message", conversation_field="conversation_id",
+                      workers=1, engine="vader", chunk_size=DEFAULT_CHUNK_SIZE,
+                      dedupe_entries=DEFAULT_DEDUPE_ENTRIES, grouped=False,
+                      max_open_conversations=DEFAULT_MAX_OPEN_CONVERSATIONS,
+                      checkpoint_path=None, checkpoint_every=DEFAULT_CHECKPOINT_EVERY,
+                      resume=False, progress=None):
+    """Score every message of a transcript file; returns run statistics.
+
+    Writes one row per message (label and VADER scores, same as
+    SentimentAnalyzer.score_message on the cleaned text) to output_path
+    and one row per conversation (overall label and mood trend) to
+    conversations_path. Input is streamed in chunks. At most
+    max_open_conversations conversations are kept open; beyond that the
+    least recently active one is written, and if it continues later it
+    gets another row. grouped=True means conversations are contiguous, so
+    each is written as soon as the next one starts (one open at a time).
+
+    Memory does not grow with the input size. It is bounded by the
+    chunks in flight (2 * workers chunks of chunk_size messages), the
+    dedupe cache (about 250 bytes per entry) and the open conversations
+    (about 1.5 KB each plus half a byte per message of that conversation,
+    for its mood trend). Checkpoints hold the same open conversations.
+
+    Messages whose cleaned text was already scored are served from a
+    bounded hash-keyed cache. workers > 1 (None: one per CPU) scores
+    chunks in a process pool. A checkpoint is saved every
+    checkpoint_every chunks; resume=True continues from it.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown scoring engine: {engine!r} (expected one of {ENGINES})")
+    fmt = detect_format(input_path, fmt)
+    conversations_path = conversations_path or default_conversations_path(output_path)
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_open_conversations < 1:
+        raise ValueError("max_open_conversations must be at least 1")
+    max_open = 1 if grouped else max_open_conversations
+
+    options = [fmt, text_field, conversation_field, engine, max_open]
+    state = None
+    if resume and os.path.exists(checkpoint_path):
+        state = load_checkpoint(checkpoint_path)
+        if state["input"] != input_signature(input_path) or state["options"] != options:
+            raise ValueError(f"Checkpoint {checkpoint_path} was made for a different input or options")
+
+    if state is None:
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "input": input_signature(input_path),
+            "options": options,
+            "input_offset": 0,
+            "output_offset": None,
+            "conversations_offset": None,
+            "position": 0,  # Input records read, including skipped ones
+            "records": 0,
+            "skipped": 0,
+            "conversations": 0,
+            "aggregates": ConversationAggregates(),
+        }
+    aggregates = state["aggregates"]
+
+    messages_out = _RowWriter(output_path, MESSAGE_COLUMNS, state["output_offset"])
+    conversations_out = _RowWriter(conversations_path, CONVERSATION_COLUMNS, state["conversations_offset"])
+    dedupe = DedupeCache(dedupe_entries)
+    analyzer = SentimentAnalyzer(cache_entries=0)
+    executor = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker)
+
+    total_bytes = state["input"][1]
+    started = time.perf_counter()
+    last_report = started
+    records_at_start = state["records"]
+    scored = 0
+
+    def prepare(chunk):
+        """Clean a chunk and split its distinct messages into known and still to score."""
+        texts = []
+        known = {}
+        pending = {}
+        for _, _, message in chunk:
+            text = clean_input(message) if message is not None else None
+            texts.append(text)
+            if text is None or text in known or text in pending:
+                continue
+            digest = message_digest(text)
+            result = dedupe.get(digest)
+            if result is None:
+                pending[text] = digest
+            else:
+                known[text] = result
+        return chunk, texts, known, pending
+
+    def submit(prepared):
+        to_score = list(prepared[3])
+        if executor is not None and to_score:
+            return prepared, executor.submit(_score_chunk_in_worker, to_score, engine)
+        future = Future()
+        future.set_result(analyzer._score_chunk(to_score, engine))
+        return prepared, future
+
+    def write_chunk(prepared, results):
+        nonlocal scored
+        chunk, texts, known, pending = prepared
+        for (text, digest), result in zip(pending.items(), results):
+            dedupe.put(digest, result)
+            known[text] = result
+        scored += len(pending)
+
+        for (offset, conversation, _), text in zip(chunk, texts):
+            state["position"] += 1
+            if text is None:
+                state["skipped"] += 1
+                continue
+            label, scores = known[text]
+            state["records"] += 1
+
+            row = {"record": state["position"], "conversation": conversation, "label": label}
+            for field in SCORE_FIELDS:
+                row[field] = scores[field]
+            messages_out.write(row)
+            aggregates.add(conversation, text, label, scores)
+            for finished in aggregates.finish_idle(max_open):
+                conversations_out.write(finished)
+                state["conversations"] += 1
+        state["input_offset"] = chunk[-1][0]
+
+    def checkpoint():
+        state["output_offset"] = messages_out.flush()
+        state["conversations_offset"] = conversations_out.flush()
+        save_checkpoint(checkpoint_path, state)
+
+    def report(final=False):
+        elapsed = time.perf_counter() - started
+        done = state["records"] - records_at_start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        percent = 100.0 * state["input_offset"] / total_bytes if total_bytes else 100.0
+        duplicates = 100.0 * (done - scored) / done if done else 0.0
+        progress.write(
+            f"{'done' if final else 'progress'}: {state['records']} messages ({percent:.1f}% of input), "
+            f"{rate:,.0f} msg/s, {scored} scored, {duplicates:.1f}% duplicates, "
+            f"{state['skipped']} skipped\n"
+        )
+        progress.flush()
+
+    completed = False
+    try:
+        records = read_records(input_path, fmt, text_field, conversation_field, state["input_offset"])
+        in_flight = deque()
+        chunks_written = 0
+        for chunk in chunked(records, chunk_size):
+            in_flight.append(submit(prepare(chunk)))
+            # Keep a bounded number of chunks queued so memory stays constant
+            while in_flight and (in_flight[0][1].done() or len(in_flight) > 2 * workers):
+                prepared, future = in_flight.popleft()
+                write_chunk(prepared, future.result())
+                chunks_written += 1
+                if chunks_written % checkpoint_every == 0:
+                    checkpoint()
+            if progress is not None and time.perf_counter() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.perf_counter()
+                report()
+
+        while in_flight:
+            prepared, future = in_flight.popleft()
+            write_chunk(prepared, future.result())
+
+        for row in aggregates.finish_all():
+            conversations_out.write(row)
+            state["conversations"] += 1
+        messages_out.flush()
+        conversations_out.flush()
+        completed = True
+    finally:
+        messages_out.close()
+        conversations_out.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    # An interrupted run leaves its last checkpoint in place for resume=True
+    if completed and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    if progress is not None:
+        report(final=True)
+
+    return {
+        "messages": state["records"],
+        "resumed_at": records_at_start,  # Messages already written by the interrupted run
+        "scored": scored,
+        "duplicates": state["records"] - records_at_start - scored,
+        "skipped": state["skipped"],
+        "conversations": state["conversations"],
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def main(argv=None):
+    """Entry point for `python chatbot.py score`."""
+    parser = argparse.ArgumentParser(
+        prog="chatbot.py score",
+        description="Score exported transcripts (JSONL or CSV) message by message and per conversation."
+    )
+    parser.add_argument("input", help="transcript file (.jsonl/.ndjson or .csv)")
+    parser.add_argument("-o", "--output", required=True, help="per-message output (.jsonl or .csv)")
+    parser.add_argument("--conversations", help="per-conversation output (default: OUTPUT with .conversations before the extension)")
+    parser.add_argument("--format", choices=FORMATS, help="input format (default: from the extension)")
+    parser.add_argument("--text-field", default="message", help="field holding the message text (default: message)")
+    parser.add_argument("--conversation-field", default="conversation_id", help="field holding the conversation id (default: conversation_id)")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: one per CPU)")
+    parser.add_argument("--engine", choices=ENGINES, default="vader", help="scoring engine: vader, or numpy for the same scores vectorized (needs numpy; default: vader)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="messages per work chunk")
+    parser.add_argument("--dedupe-entries", type=int, default=DEFAULT_DEDUPE_ENTRIES, help="distinct messages remembered for deduplication (0 disables)")
+    parser.add_argument("--grouped", action="store_true", help="conversations are contiguous; write each as soon as it ends")
+    parser.add_argument("--max-open-conversations", type=int, default=DEFAULT_MAX_OPEN_CONVERSATIONS,
+                        help="conversations kept open at once; the least recently active is written beyond that")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: OUTPUT.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY, help="chunks between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run from its checkpoint")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = score_transcripts(
+            args.input, args.output,
+            conversations_path=args.conversations,
+            fmt=args.format,
+            text_field=args.text_field,
+            conversation_field=args.conversation_field,
+            workers=args.workers,
+            engine=args.engine,
+            chunk_size=args.chunk_size,
+            dedupe_entries=args.dedupe_entries,
+            grouped=args.grouped,
+            max_open_conversations=args.max_open_conversations,
+            checkpoint_path=args.checkpoint,
+            checkpoint_every=args.checkpoint_every,
+            resume=args.resume,
+            progress=None if args.quiet else sys.stderr
+        )
+    except KeyboardInterrupt:
+        sys.stderr.write("\nInterrupted; run again with --resume to continue from the last checkpoint.\n")
+        return 130
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"Error: {e}\n")
+        return 1
+
+    if args.quiet:
+        return 0
+    print(f"Scored {stats['messages']} messages from {stats['conversations']} conversations "
+          f"({stats['scored']} distinct, {stats['skipped']} skipped) in {stats['seconds']:.1f}s")
+    return 0
@@ -0,0 +1,47 @@
+# Parse-once view of one user message, shared by the stages of a turn
+from keywords import keywords_from_scan
+
+
+class Turn:
+    """One user message, lowercased and split once for the whole reply path.
+
+    text is the message as given (process_turn passes clean_input output),
+    lower its lowercase form without surrounding whitespace, tokens the
+    whitespace-separated words of text and lower_tokens the same words
+    lowercased; the token lists are only built when a stage asks for them.
+    intents, feeling and name are the result of the keyword scan
+    (Chatbot._match_intents), filled in by generate_response; a reply served
+    from the reply cache never needs them. The keyword dict is only built
+    if something asks for it.
+    """
+
+    __slots__ = ('text', 'lower', 'intents', 'feeling', 'name', '_tokens', '_lower_tokens')
+
+    def __init__(self, text):
+        self.text = text
+        self.lower = text.lower().strip()
+        self.intents = 0
+        self.feeling = None
+        self.name = None
+        self._tokens = None
+        self._lower_tokens = None
+
+    @property
+    def keywords(self):
+        """The keyword dict of the scan (same shape as Chatbot._extract_keywords)."""
+        return keywords_from_scan(self.intents, self.feeling, self.name)
+
+    @property
+    def tokens(self):
+        if self._tokens is None:
+            self._tokens = self.text.split()
+        return self._tokens
+
+    @property
+    def lower_tokens(self):
+        if self._lower_tokens is None:
+            self._lower_tokens = self.lower.split()
+        return self._lower_tokens
+
+    def __repr__(self):
+        return f"Turn({self.text!r})"
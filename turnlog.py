@@ -0,0 +1,242 @@
+# Append-only on-disk log of conversation turns with write-behind batching
+import json
+import os
+import queue
+import threading
+from array import array
+
+from history import HistoryEntry, _SCORE_KEYS
+
+
+# When the log file is fsynced: never (the OS decides), once per written
+# batch, or after every turn
+FSYNC_POLICIES = ("none", "batch", "turn")
+
+DEFAULT_FSYNC = "batch"
+
+# Most turns the writer thread writes (and fsyncs) in one go
+DEFAULT_BATCH_SIZE = 256
+
+# Every Nth turn's byte offset is kept in memory; reading turn i seeks to
+# the nearest kept offset and skips at most N - 1 lines
+INDEX_STRIDE = 64
+
+_STOP = object()
+
+
+class TurnLog:
+    """Conversation turns appended to a JSONL file, one record per line.
+
+    append() only queues the turn: a writer thread encodes queued turns and
+    writes them in batches, so the response path never waits for the disk.
+    fsync is "none" (written turns survive a crash of the process, not of
+    the machine), "batch" (one fsync per written batch) or "turn" (one per
+    turn). Turns still queued when the process dies are lost; flush() waits
+    until everything appended so far is written (and fsynced, unless the
+    policy is "none").
+
+    Opening an existing log counts its records and cuts off a torn last
+    line left by a crash; a damaged record before the last line raises
+    ValueError. The log reads like a sequence of HistoryEntry (len,
+    indexing, slicing, iteration), streamed from disk; only one byte
+    offset per INDEX_STRIDE turns stays in memory.
+    """
+
+    def __init__(self, path, fsync=DEFAULT_FSYNC, batch_size=DEFAULT_BATCH_SIZE):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync!r} (expected one of {FSYNC_POLICIES})")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.path = path
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self._offsets = array('q')  # Byte offset of turns 0, INDEX_STRIDE, 2 * INDEX_STRIDE, ...
+        self._written = 0           # Turns on disk
+        self._size = 0              # Bytes on disk
+        self._recover()
+        self._appended = self._written
+        self._error = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._file = open(path, 'ab')
+        self._writer = threading.Thread(target=self._write_loop, name="turn-log-writer", daemon=True)
+        self._writer.start()
+
+    def _recover(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            offset = 0
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("Unterminated record")
+                    _check_record(json.loads(line))
+                except ValueError:
+                    if f.read(1):
+                        raise ValueError(f"Damaged record at byte {offset} of {self.path}") from None
+                    # Torn last line of an interrupted write
+                    f.truncate(offset)
+                    break
+                self._index(offset)
+                offset += len(line)
+        self._size = offset
+
+    def _index(self, offset):
+        if self._written % INDEX_STRIDE == 0:
+            self._offsets.append(offset)
+        self._written += 1
+
+    def append(self, user, bot, sentiment, scores, intent=None, name=None):
+        """Queue one turn for writing; returns its turn id (0 for the first turn of the log).
+
+        name is the user's name when the turn captured it, so a restored
+        session does not parse the message again.
+        """
+        if self._error is not None:
+            raise self._error
+        if self._file is None:
+            raise ValueError("Turn log is closed")
+        with self._lock:
+            turn_id = self._appended
+            self._appended += 1
+        self._queue.put((user, bot, sentiment, [scores[key] for key in _SCORE_KEYS], intent, name))
+        return turn_id
+
+    def _write_loop(self):
+        file = self._file
+        per_turn = self.fsync == "turn"
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
+            try:
+                if self._error is None:
+                    self._write(file, batch, per_turn)
+            except OSError as e:
+                self._error = e
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, file, batch, per_turn):
+        if per_turn:
+            for turn in batch:
+                line = _encode(turn)
+                file.write(line)
+                file.flush()
+                os.fsync(file.fileno())
+                self._wrote(line)
+            return
+        lines = [_encode(turn) for turn in batch]
+        file.writelines(lines)
+        file.flush()
+        if self.fsync == "batch":
+            os.fsync(file.fileno())
+        for line in lines:
+            self._wrote(line)
+
+    def _wrote(self, line):
+        with self._lock:
+            self._index(self._size)
+            self._size += len(line)
+
+    def flush(self):
+        """Wait until every appended turn is written; raises the writer's error if it failed."""
+        if self._file is not None:
+            self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """Write the queued turns, fsync (unless the policy is "none") and close the file."""
+        if self._file is None:
+            return
+        self._queue.put(_STOP)
+        self._writer.join()
+        try:
+            if self._error is None and self.fsync != "none":
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            self._file = None
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def records(self, start=0, stop=None):
+        """Stream the records of turns start..stop-1 as dicts ("user", "bot", "sentiment", "scores", "intent", "name")."""
+        self.flush()
+        with self._lock:
+            written = self._written
+            if stop is None or stop > written:
+                stop = written
+            if start >= stop:
+                return
+            block = start // INDEX_STRIDE
+            offset = self._offsets[block]
+        skip = start - block * INDEX_STRIDE
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for turn_id, line in enumerate(f, block * INDEX_STRIDE):
+                if turn_id >= stop:
+                    break
+                if turn_id - block * INDEX_STRIDE >= skip:
+                    yield json.loads(line)
+
+    def entries(self, start=0, stop=None):
+        """Stream turns start..stop-1 as HistoryEntry."""
+        for record in self.records(start, stop):
+            yield _entry(record)
+
+    def __len__(self):
+        return self._appended
+
+    def __getitem__(self, index):
+        length = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(length)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return list(self.entries(start, stop))
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("turn log index out of range")
+        return next(self.entries(index, index + 1))
+
+    def __iter__(self):
+        return self.entries()
+
+
+def _encode(turn):
+    user, bot, sentiment, scores, intent, name = turn
+    record = {'user': user, 'bot': bot, 'sentiment': sentiment, 'scores': dict(zip(_SCORE_KEYS, scores))}
+    if intent is not None:
+        record['intent'] = intent
+    if name is not None:
+        record['name'] = name
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def _check_record(record):
+    if not isinstance(record, dict) or not all(key in record for key in ('user', 'bot', 'sentiment', 'scores')):
+        raise ValueError("Not a turn record")
+
+
+def _entry(record):
+    scores = record['scores']
+    return HistoryEntry(record['user'], record['bot'], record['sentiment'], [scores[key] for key in _SCORE_KEYS])
@@ -1,5 +1,7 @@
 
-import re
+import io
+import itertools
+import zlib
 
 
 def clean_input(text):
@@ -7,39 +9,126 @@ def clean_input(text):
     if not text:
         return ""
     
-    # Strip whitespace
-    text = text.strip()
-    
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
+    # Strip whitespace and collapse runs of it to single spaces (str.split
+    # splits on the same characters as \s)
+    return " ".join(text.split())
+
+
+def stable_hash(text):
     
-    return text
+    # CRC-32 of the UTF-8 bytes: the same in every process, unlike hash()
+    return zlib.crc32(text.encode('utf-8'))
+
+
+def format_conversation_summary(conversation_history, overall_sentiment, mood_trend=None, total_messages=None, **limits):
+    # total_messages counts every turn when conversation_history only keeps the latest ones
+    out = io.StringIO()
+    write_conversation_summary(out, conversation_history, overall_sentiment, mood_trend,
+                               total_messages=total_messages, distribution=False, **limits)
+    # Same text as joining the lines with "\n" (no trailing newline)
+    return out.getvalue()[:-1]
+
+
+# Turn lines buffered per write call
+_SUMMARY_BATCH = 1000
+
 
+def _summary_line(number, entry):
+    user_msg = entry.get('user', '')
+    sentiment = entry.get('sentiment', 'Unknown')
+    # Truncate long messages for display
+    display_msg = user_msg[:50] + "..." if len(user_msg) > 50 else user_msg
+    return f"{number}. [{sentiment}] {display_msg}\n"
 
-def format_conversation_summary(conversation_history, overall_sentiment, mood_trend=None):
-    summary_lines = []
-    summary_lines.append("\n" + "="*60)
-    summary_lines.append("CONVERSATION SUMMARY")
-    summary_lines.append("="*60)
-    summary_lines.append(f"\nTotal messages: {len(conversation_history)}")
-    summary_lines.append(f"Overall sentiment: {overall_sentiment}")
+
+def write_conversation_summary(out, conversation_history, overall_sentiment, mood_trend=None,
+                               total_messages=None, sentiment_counts=None, distribution=True,
+                               head=None, tail=None, page_size=None, more=None):
+    # Streams the summary to out (any object with write) one line at a time and
+    # returns the sentiment distribution (label -> messages).
+    # sentiment_counts is printed as given (e.g. counts kept over every turn);
+    # without it the distribution is counted from conversation_history in the
+    # same pass that lists the turns.
+    # head/tail list only the first/last N stored turns (both may be set).
+    # page_size calls more() after every N listed turns; a false result stops
+    # the listing, the rest of the summary is still written.
+    stored = len(conversation_history)
+    if total_messages is None:
+        total_messages = stored
+    first_number = total_messages - stored + 1
+    write = out.write
+    
+    write("\n" + "="*60 + "\n")
+    write("CONVERSATION SUMMARY\n")
+    write("="*60 + "\n")
+    write(f"\nTotal messages: {total_messages}\n")
+    write(f"Overall sentiment: {overall_sentiment}\n")
     
     if mood_trend:
-        summary_lines.append(f"Mood trend: {mood_trend}")
+        write(f"Mood trend: {mood_trend}\n")
     
-    summary_lines.append("\n" + "-"*60)
-    summary_lines.append("Message-by-Message Sentiment (Tier 2):")
-    summary_lines.append("-"*60)
+    write("\n" + "-"*60 + "\n")
+    if first_number > 1:
+        write(f"Message-by-Message Sentiment (Tier 2, last {stored}):\n")
+    else:
+        write("Message-by-Message Sentiment (Tier 2):\n")
+    write("-"*60 + "\n")
     
-    for i, entry in enumerate(conversation_history, 1):
-        user_msg = entry.get('user', '')
-        sentiment = entry.get('sentiment', 'Unknown')
-        # Truncate long messages for display
-        display_msg = user_msg[:50] + "..." if len(user_msg) > 50 else user_msg
-        summary_lines.append(f"{i}. [{sentiment}] {display_msg}")
+    # Stored positions [0, head) and [tail_start, stored) are listed
+    if head is None and tail is None:
+        head = stored
+    head = min(head or 0, stored)
+    tail_start = max(stored - (tail or 0), head)
+    shown = head + stored - tail_start
     
-    summary_lines.append("="*60 + "\n")
+    counting = distribution and sentiment_counts is None
+    counts = {} if counting else sentiment_counts
+    if counting:
+        # Every turn is visited for the counts; list the selected ones on the way
+        turns = enumerate(conversation_history)
+    else:
+        turns = itertools.chain(
+            enumerate(itertools.islice(conversation_history, head)),
+            zip(range(tail_start, stored), conversation_history[tail_start:])
+        )
     
-    return "\n".join(summary_lines)
-
-
+    lines = []  # Turn lines are written in batches
+    listed = 0
+    listing = shown > 0
+    for position, entry in turns:
+        if counting:
+            sentiment = entry.get('sentiment', 'Unknown')
+            counts[sentiment] = counts.get(sentiment, 0) + 1
+        if not listing or head <= position < tail_start:
+            continue
+        if position == tail_start and tail_start > head:
+            lines.append(f"... {tail_start - head} messages not shown ...\n")
+        lines.append(_summary_line(first_number + position, entry))
+        listed += 1
+        if len(lines) >= _SUMMARY_BATCH:
+            out.writelines(lines)
+            lines.clear()
+        if page_size and listed % page_size == 0 and listed < shown:
+            out.writelines(lines)
+            lines.clear()
+            if hasattr(out, "flush"):
+                out.flush()
+            if more is not None and not more():
+                write(f"... {shown - listed} more messages not shown ...\n")
+                listing = False
+                if not counting:
+                    break
+    
+    out.writelines(lines)
+    if listing and shown == head < stored:
+        write(f"... {stored - head} messages not shown ...\n")
+    write("="*60 + "\n\n")
+    
+    if distribution:
+        write("Sentiment Distribution:\n")
+        for sentiment, count in counts.items():
+            percentage = (count / total_messages) * 100
+            write(f"  {sentiment}: {count} messages ({percentage:.1f}%)\n")
+        write("\n")
+    
+    return counts
@@ -0,0 +1,375 @@
+# NumPy-vectorized re-implementation of VADER polarity scoring for bulk workloads
+import string
+
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT, C_INCR, N_SCALAR, NEGATE, SPECIAL_CASES,
+)
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - only needed for this engine
+    np = None
+
+
+# Words the rules look up by identity; they always get a vocabulary id
+_RULE_WORDS = ['no', 'or', 'nor', 'kind', 'of', 'never', 'so', 'this', 'without',
+               'doubt', 'least', 'at', 'very', 'but']
+
+_EMPTY_SCORES = {'neg': 0.0, 'neu': 0.0, 'pos': 0.0, 'compound': 0.0}
+
+
+def _strip_punc_if_word(token):
+    # Same as vaderSentiment.SentiText._strip_punc_if_word
+    stripped = token.strip(string.punctuation)
+    if len(stripped) <= 2:
+        return token
+    return stripped
+
+
+def _is_negation(word_lower):
+    # vaderSentiment.negated() for a single word
+    return word_lower in NEGATE or "n't" in word_lower
+
+
+class _TokenTable(dict):
+    """Maps a raw whitespace token to (vocabulary id, is ALL CAPS), filled on demand."""
+
+    def __init__(self, vocab):
+        super().__init__()
+        self.vocab = vocab
+        self.extra_words = {}
+
+    def __missing__(self, raw_token):
+        token = _strip_punc_if_word(raw_token)
+        lower = token.lower()
+        index = self.vocab.get(lower)
+        if index is None:
+            # Out-of-vocabulary words only matter for "n't" negation
+            index = self.extra_words.setdefault(lower, len(self.vocab) + len(self.extra_words))
+        entry = self[raw_token] = (index, token.isupper())
+        return entry
+
+
+class VectorizedVader:
+    """Batch VADER scorer that applies the valence rules as NumPy array operations.
+
+    Each batch is tokenized once. Tokens are mapped to ids in a vocabulary
+    whose lexicon valence, booster value and negation flag are precomputed
+    arrays. Every rule (no/negation, ALL-CAPS emphasis, boosters with
+    distance damping, special idioms, "least", "but") is then evaluated for
+    all tokens of the batch at once using shifted views of the id array.
+
+    Outputs match vaderSentiment.SentimentIntensityAnalyzer.polarity_scores
+    exactly. VADER's "but" rule finds each sentiment with list.index(), so
+    when a word's valence equals that of an earlier word, or an earlier
+    word's already-scaled value, the earlier word is scaled again and this
+    one is left as is. exact_but=True (the default) replays that loop for
+    the messages that contain "but". exact_but=False scales every word
+    before the first "but" by 0.5 and every word after it by 1.5 instead,
+    which is not exact: only messages with "but" can differ, but their
+    labels can flip.
+    """
+
+    # Largest compound difference of exact_but=False on the reference corpus
+    # of benchmarks/bench_vectorized.py only. Not a bound: fuzzed messages
+    # with repeated valences around "but" differed by up to 0.30
+    COMPOUND_TOLERANCE = 0.05
+
+    def __init__(self, lexicon, emojis, exact_but=True):
+        if np is None:
+            raise ImportError("The vectorized VADER engine requires numpy (pip install numpy)")
+
+        words = set(lexicon) | set(BOOSTER_DICT) | set(_RULE_WORDS) | set(NEGATE)
+        for phrase in list(SPECIAL_CASES) + list(BOOSTER_DICT):
+            words.update(phrase.split(' '))
+        self.vocab = {word: index for index, word in enumerate(sorted(words))}
+
+        size = len(self.vocab)
+        self.lex_valence = np.zeros(size)
+        self.in_lexicon = np.zeros(size, dtype=bool)
+        self.booster = np.zeros(size)
+        self.is_booster = np.zeros(size, dtype=bool)
+        self.is_negation = np.zeros(size, dtype=bool)
+        for word, index in self.vocab.items():
+            if word in lexicon:
+                self.lex_valence[index] = lexicon[word]
+                self.in_lexicon[index] = True
+            if word in BOOSTER_DICT:
+                self.booster[index] = BOOSTER_DICT[word]
+                self.is_booster[index] = True
+            self.is_negation[index] = _is_negation(word)
+
+        self.exact_but = exact_but
+        self._ids = {word: self.vocab[word] for word in _RULE_WORDS}
+        self._special_phrases = [
+            (tuple(self.vocab[word] for word in phrase.split(' ')), value)
+            for phrase, value in SPECIAL_CASES.items()
+        ]
+        self._booster_phrases = [
+            (tuple(self.vocab[word] for word in phrase.split(' ')), value)
+            for phrase, value in BOOSTER_DICT.items() if ' ' in phrase
+        ]
+
+        # VADER only replaces single-character emojis
+        self.emojis = {key: value for key, value in emojis.items() if len(key) == 1}
+        self._emoji_chars = frozenset(self.emojis)
+
+    def _replace_emojis(self, text):
+        # Same spacing rules as SentimentIntensityAnalyzer.polarity_scores
+        pieces = []
+        prev_space = True
+        for char in text:
+            description = self.emojis.get(char)
+            if description is not None:
+                if not prev_space:
+                    pieces.append(' ')
+                pieces.append(description)
+                prev_space = False
+            else:
+                pieces.append(char)
+                prev_space = char == ' '
+        return ''.join(pieces)
+
+    def _tokenize(self, texts):
+        """Tokenize the batch once into flat per-token lists."""
+        clean_texts = []
+        raw_tokens = []
+        lengths = []
+        for text in texts:
+            if not text.isascii() and not self._emoji_chars.isdisjoint(text):
+                text = self._replace_emojis(text)
+            text = text.strip()
+            clean_texts.append(text)
+
+            tokens = text.split()
+            lengths.append(len(tokens))
+            raw_tokens.extend(tokens)
+
+        # Each distinct raw token is stripped, lowercased and looked up once per batch
+        table = _TokenTable(self.vocab)
+        entries = list(map(table.__getitem__, raw_tokens))
+        return clean_texts, entries, lengths, table.extra_words
+
+    def polarity_scores_batch(self, texts):
+        """Return VADER polarity score dicts for texts, in order."""
+        texts = list(texts)
+        if not texts:
+            return []
+
+        clean_texts, entries, lengths, extra_words = self._tokenize(texts)
+        if not entries:
+            return [dict(_EMPTY_SCORES) for _ in texts]
+
+        # Feature tables for this batch: base vocabulary plus its unseen words
+        lex_valence, in_lexicon = self.lex_valence, self.in_lexicon
+        booster, is_booster, is_negation = self.booster, self.is_booster, self.is_negation
+        if extra_words:
+            extra = len(extra_words)
+            lex_valence = np.concatenate([lex_valence, np.zeros(extra)])
+            in_lexicon = np.concatenate([in_lexicon, np.zeros(extra, dtype=bool)])
+            booster = np.concatenate([booster, np.zeros(extra)])
+            is_booster = np.concatenate([is_booster, np.zeros(extra, dtype=bool)])
+            is_negation = np.concatenate([is_negation, [_is_negation(word) for word in extra_words]])
+
+        token_ids, token_upper = zip(*entries)
+        ids = np.array(token_ids, dtype=np.int64)
+        upper = np.array(token_upper, dtype=bool)
+        lengths = np.array(lengths, dtype=np.int64)
+        count = len(ids)
+
+        message = np.repeat(np.arange(len(texts)), lengths)
+        starts = np.cumsum(lengths) - lengths
+        pos = np.arange(count) - starts[message]
+        remaining = lengths[message] - pos - 1
+
+        # Some but not all words in ALL CAPS
+        upper_count = np.bincount(message, weights=upper, minlength=len(texts))
+        cap_diff = ((lengths - upper_count) > 0) & (upper_count > 0)
+        cap_diff = cap_diff[message]
+
+        def shifted(values, offset, fill):
+            # values of the token `offset` positions earlier (negative: later)
+            out = np.full(count, fill, dtype=values.dtype)
+            if offset > 0:
+                out[offset:] = values[:-offset]
+            else:
+                out[:offset] = values[-offset:]
+            return out
+
+        # Out-of-message neighbours get id -1 and never match anything
+        prev_ids = [ids] + [np.where(pos >= k, shifted(ids, k, -1), -1) for k in (1, 2, 3)]
+        next_ids = [ids] + [np.where(remaining >= k, shifted(ids, -k, -1), -1) for k in (1, 2)]
+        prev_upper = [upper] + [shifted(upper, k, False) for k in (1, 2, 3)]
+
+        def feature(table, token_ids, fill):
+            return np.where(token_ids >= 0, table[np.maximum(token_ids, 0)], fill)
+
+        ID = self._ids
+        word_in_lexicon = in_lexicon[ids]
+        kind_of = (ids == ID['kind']) & (next_ids[1] == ID['of'])
+        active = word_in_lexicon & ~is_booster[ids] & ~kind_of
+
+        # Lexicon valence, with "no" as a negator of nearby lexicon words
+        base = lex_valence[ids]
+        valence = base.copy()
+        valence[(ids == ID['no']) & feature(in_lexicon, next_ids[1], False)] = 0.0
+        negated_by_no = ((prev_ids[1] == ID['no']) | (prev_ids[2] == ID['no']) |
+                         ((prev_ids[3] == ID['no']) & ((prev_ids[1] == ID['or']) | (prev_ids[1] == ID['nor']))))
+        valence = np.where(negated_by_no, base * N_SCALAR, valence)
+
+        # ALL-CAPS emphasis when only some words are capitalized
+        caps = upper & cap_diff
+        valence = np.where(caps, np.where(valence > 0, valence + C_INCR, valence - C_INCR), valence)
+
+        for start_i in range(3):
+            prev = prev_ids[start_i + 1]
+            cond = active & (pos > start_i) & ~feature(in_lexicon, prev, True)
+
+            # scalar_inc_dec for the preceding word
+            scalar = feature(booster, prev, 0.0)
+            scalar = np.where(valence < 0, -scalar, scalar)
+            boosted_caps = feature(is_booster, prev, False) & prev_upper[start_i + 1] & cap_diff
+            scalar = np.where(boosted_caps, np.where(valence > 0, scalar + C_INCR, scalar - C_INCR), scalar)
+            if start_i == 1:
+                scalar = np.where(scalar != 0, scalar * 0.95, scalar)
+            elif start_i == 2:
+                scalar = np.where(scalar != 0, scalar * 0.9, scalar)
+            valence = np.where(cond, valence + scalar, valence)
+
+            valence = np.where(cond, self._negation_check(valence, prev_ids, is_negation, start_i), valence)
+            if start_i == 2:
+                valence = np.where(cond, self._special_idioms_check(valence, prev_ids, next_ids), valence)
+
+        # "least" as negation unless preceded by "at"/"very"
+        least_prev = (prev_ids[1] == ID['least']) & ~feature(in_lexicon, prev_ids[1], True)
+        far = least_prev & (pos > 1)
+        least = (far & (prev_ids[2] != ID['at']) & (prev_ids[2] != ID['very'])) | (least_prev & (pos == 1))
+        valence = np.where(least, valence * N_SCALAR, valence)
+
+        sentiments = np.where(active, valence, 0.0)
+
+        # Contrastive "but": words before the first "but" count half, words after count 1.5x
+        but_positions = np.flatnonzero(ids == ID['but'])
+        if len(but_positions):
+            first_but = np.full(len(texts), -1)
+            but_messages, first_index = np.unique(message[but_positions], return_index=True)
+            first_but[but_messages] = pos[but_positions[first_index]]
+            if self.exact_but:
+                sentiments = self._exact_but_check(sentiments, starts, lengths, but_messages, first_but)
+            else:
+                bi = first_but[message]
+                has_but = bi >= 0
+                sentiments = np.where(has_but & (pos < bi), sentiments * 0.5, sentiments)
+                sentiments = np.where(has_but & (pos > bi), sentiments * 1.5, sentiments)
+
+        # bincount adds weights in token order, the same order as VADER's sum()
+        total = np.bincount(message, weights=sentiments, minlength=len(texts))
+        pos_sum = np.bincount(message, weights=np.where(sentiments > 0, sentiments + 1, 0.0), minlength=len(texts))
+        neg_sum = np.bincount(message, weights=np.where(sentiments < 0, sentiments - 1, 0.0), minlength=len(texts))
+        neu_count = np.bincount(message, weights=(sentiments == 0), minlength=len(texts))
+
+        return self._scores(clean_texts, lengths, total, pos_sum, neg_sum, neu_count)
+
+    def polarity_scores(self, text):
+        return self.polarity_scores_batch([text])[0]
+
+    @staticmethod
+    def _exact_but_check(sentiments, starts, lengths, but_messages, first_but):
+        # Replays SentimentIntensityAnalyzer._but_check, list.index() quirk included
+        sentiments = sentiments.copy()
+        for index in but_messages.tolist():
+            start = starts[index]
+            bi = first_but[index]
+            values = sentiments[start:start + lengths[index]].tolist()
+            for sentiment in values:
+                si = values.index(sentiment)
+                if si < bi:
+                    values[si] = sentiment * 0.5
+                elif si > bi:
+                    values[si] = sentiment * 1.5
+            sentiments[start:start + lengths[index]] = values
+        return sentiments
+
+    def _negation_check(self, valence, prev_ids, is_negation, start_i):
+        ID = self._ids
+
+        def negated(token_ids):
+            return np.where(token_ids >= 0, is_negation[np.maximum(token_ids, 0)], False)
+
+        if start_i == 0:
+            return np.where(negated(prev_ids[1]), valence * N_SCALAR, valence)
+
+        so_this_1 = (prev_ids[1] == ID['so']) | (prev_ids[1] == ID['this'])
+        if start_i == 1:
+            never = (prev_ids[2] == ID['never']) & so_this_1
+            doubt = (prev_ids[2] == ID['without']) & (prev_ids[1] == ID['doubt'])
+            return np.where(never, valence * 1.25,
+                            np.where(~doubt & negated(prev_ids[2]), valence * N_SCALAR, valence))
+
+        so_this_2 = (prev_ids[2] == ID['so']) | (prev_ids[2] == ID['this'])
+        never = ((prev_ids[3] == ID['never']) & so_this_2) | so_this_1
+        doubt = (prev_ids[3] == ID['without']) & ((prev_ids[2] == ID['doubt']) | (prev_ids[1] == ID['doubt']))
+        return np.where(never, valence * 1.25,
+                        np.where(~doubt & negated(prev_ids[3]), valence * N_SCALAR, valence))
+
+    def _special_idioms_check(self, valence, prev_ids, next_ids):
+        def matches(sequence, phrase):
+            if len(sequence) != len(phrase):
+                return None
+            hit = sequence[0] == phrase[0]
+            for token_ids, word_id in zip(sequence[1:], phrase[1:]):
+                hit = hit & (token_ids == word_id)
+            return hit
+
+        i, p1, p2, p3 = prev_ids
+        n1, n2 = next_ids[1], next_ids[2]
+
+        # The first matching preceding sequence wins, so apply them last-to-first
+        sequences = [(p1, i), (p2, p1, i), (p2, p1), (p3, p2, p1), (p3, p2)]
+        for sequence in list(reversed(sequences)) + [(i, n1), (i, n1, n2)]:
+            for phrase, value in self._special_phrases:
+                hit = matches(sequence, phrase)
+                if hit is not None:
+                    valence = np.where(hit, value, valence)
+
+        for sequence in [(p3, p2, p1), (p3, p2), (p2, p1)]:
+            for phrase, value in self._booster_phrases:
+                hit = matches(sequence, phrase)
+                if hit is not None:
+                    valence = np.where(hit, valence + value, valence)
+        return valence
+
+    @staticmethod
+    def _scores(texts, lengths, sum_s, pos_sum, neg_sum, neu_count):
+        # Same arithmetic as SentimentIntensityAnalyzer.score_valence, per message
+        ep_count = np.minimum([text.count("!") for text in texts], 4)
+        qm_count = np.array([text.count("?") for text in texts])
+        qm_amplifier = np.where(qm_count > 1, np.where(qm_count <= 3, qm_count * 0.18, 0.96), 0.0)
+        punct_emph_amplifier = ep_count * 0.292 + qm_amplifier
+
+        sum_s = np.where(sum_s > 0, sum_s + punct_emph_amplifier,
+                         np.where(sum_s < 0, sum_s - punct_emph_amplifier, sum_s))
+        compound = np.clip(sum_s / np.sqrt((sum_s * sum_s) + 15), -1.0, 1.0)
+
+        neg_abs = np.fabs(neg_sum)
+        more_positive = pos_sum > neg_abs
+        more_negative = pos_sum < neg_abs
+        pos_sum = np.where(more_positive, pos_sum + punct_emph_amplifier, pos_sum)
+        neg_sum = np.where(more_negative, neg_sum - punct_emph_amplifier, neg_sum)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            total = pos_sum + np.fabs(neg_sum) + neu_count
+            neg = np.fabs(neg_sum / total)
+            neu = np.fabs(neu_count / total)
+            pos = np.fabs(pos_sum / total)
+
+        # Python's round() (not np.round) to reproduce VADER's rounding exactly
+        results = []
+        for length, neg_v, neu_v, pos_v, compound_v in zip(
+                lengths.tolist(), neg.tolist(), neu.tolist(), pos.tolist(), compound.tolist()):
+            if not length:
+                results.append(dict(_EMPTY_SCORES))
+            else:
+                results.append({"neg": round(neg_v, 3), "neu": round(neu_v, 3),
+                                "pos": round(pos_v, 3), "compound": round(compound_v, 4)})
+        return results